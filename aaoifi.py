@@ -0,0 +1,323 @@
+"""Historical AAOIFI financial-ratio screening for Ghost Office Hunter.
+
+AAOIFI screens compare interest-bearing debt and cash against a trailing
+average market capitalization rather than a single day's value. This module
+pulls a ticker's quarterly balance sheets and daily price history once, builds a
+daily market-cap series from the reported share count, and computes the
+rolling-average ratios for every reporting period with vectorized pandas
+operations. Results are cached per ticker in memory and on disk, so repeat
+checks are instant and a portfolio costs one fetch per ticker.
+"""
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+import yfinance as yf
+
+import circuit_breaker
+import deadlines
+import metrics
+import tracing
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+# AAOIFI Shariah Standard 21 threshold for both ratios (percent)
+RATIO_THRESHOLD = 33.0
+
+# Status of a period whose debt or cash figure was not reported
+UNKNOWN = "UNKNOWN"
+
+# Balance sheet rows to use, in order of preference
+_DEBT_ROWS = ("Total Debt", "Long Term Debt And Capital Lease Obligation", "Long Term Debt")
+_CASH_ROWS = (
+    "Cash Cash Equivalents And Short Term Investments",
+    "Cash And Cash Equivalents",
+    "Cash Financial",
+)
+_SHARES_ROWS = ("Ordinary Shares Number", "Share Issued")
+
+RESULT_COLUMNS = [
+    "total_debt", "total_cash", "shares", "avg_market_cap",
+    "debt_ratio", "cash_ratio", "debt_pass", "cash_pass", "status",
+]
+
+
+class AAOIFIDataError(Exception):
+    """Raised when a ticker lacks the balance sheet or price data needed for the ratios."""
+
+
+def _first_row(frame: pd.DataFrame, names: Sequence[str]) -> Optional[pd.Series]:
+    for name in names:
+        if name in frame.columns:
+            series = frame[name].astype("float64")
+            if series.notna().any():
+                return series
+    return None
+
+
+def _naive_index(index: pd.Index) -> pd.DatetimeIndex:
+    index = pd.DatetimeIndex(index)
+    return index.tz_localize(None) if index.tz is not None else index
+
+
+def compute_ratio_history(
+    balance_sheet: pd.DataFrame,
+    prices: pd.Series,
+    window_days: int
+) -> pd.DataFrame:
+    """
+    Compute AAOIFI debt and cash ratios for every balance sheet period.
+
+    Args:
+        balance_sheet: yfinance quarterly balance sheet (line items x period end dates)
+        prices: Daily closing prices indexed by date
+        window_days: Length of the trailing market-cap average in calendar days
+
+    Returns:
+        DataFrame indexed by period end with debt, cash, average market cap,
+        both ratios (percent), pass flags and a PASS/FAIL/UNKNOWN status, oldest
+        first. A period without a reported debt or cash figure has no ratio and
+        no pass flag for it; it is FAIL if its other ratio fails, else UNKNOWN.
+
+    Raises:
+        AAOIFIDataError: If debt, share count or prices are unavailable
+    """
+    if balance_sheet is None or balance_sheet.empty:
+        raise AAOIFIDataError("no quarterly balance sheet available")
+    if prices is None or prices.dropna().empty:
+        raise AAOIFIDataError("no price history available")
+
+    periods = balance_sheet.T
+    periods.index = _naive_index(periods.index)
+    periods = periods.sort_index()
+
+    debt = _first_row(periods, _DEBT_ROWS)
+    shares = _first_row(periods, _SHARES_ROWS)
+    if debt is None or shares is None:
+        raise AAOIFIDataError("balance sheet lacks total debt or share count")
+    cash = _first_row(periods, _CASH_ROWS)
+    if cash is None:
+        cash = pd.Series(float("nan"), index=periods.index)
+
+    close = prices.dropna().astype("float64")
+    close.index = _naive_index(close.index)
+    close = close[~close.index.duplicated(keep="last")].sort_index()
+
+    # Daily share count: the latest reported figure, back-filled before the first report
+    daily_shares = shares.dropna().reindex(close.index.union(shares.dropna().index)).ffill().bfill()
+    market_cap = close * daily_shares.reindex(close.index)
+    avg_market_cap = market_cap.rolling(f"{window_days}D", min_periods=1).mean()
+
+    # Trailing average as of each period end (last trading day on or before it)
+    avg_at_period = avg_market_cap.reindex(periods.index, method="ffill")
+
+    # yfinance often leaves older quarters empty; a missing figure is unknown, not zero
+    result = pd.DataFrame({
+        "total_debt": debt,
+        "total_cash": cash,
+        "shares": shares,
+        "avg_market_cap": avg_at_period,
+    })
+    result = result[result["avg_market_cap"] > 0]
+    result["debt_ratio"] = result["total_debt"] / result["avg_market_cap"] * 100
+    result["cash_ratio"] = result["total_cash"] / result["avg_market_cap"] * 100
+    for ratio in ("debt", "cash"):
+        known = result[f"{ratio}_ratio"].notna()
+        below = result[f"{ratio}_ratio"] < RATIO_THRESHOLD
+        result[f"{ratio}_pass"] = below.astype("boolean").where(known)
+    # Comparisons with a missing ratio are False, so a single known failing ratio is enough to FAIL
+    failed = (result["debt_ratio"] >= RATIO_THRESHOLD) | (result["cash_ratio"] >= RATIO_THRESHOLD)
+    passed = (result["debt_ratio"] < RATIO_THRESHOLD) & (result["cash_ratio"] < RATIO_THRESHOLD)
+    status = pd.Series(UNKNOWN, index=result.index)
+    result["status"] = status.mask(passed, "PASS").mask(failed, "FAIL")
+    result.index.name = "period_end"
+    return result[RESULT_COLUMNS]
+
+
+class RatioHistoryCache:
+    """Per-ticker cache of computed ratio histories, in memory and as CSV on disk."""
+
+    def __init__(self, root: Optional[str], ttl_seconds: int):
+        """
+        Args:
+            root: Directory for cached CSV files (None keeps the cache in memory only)
+            ttl_seconds: Age after which a cached history is recomputed
+        """
+        self.root = Path(root) if root else None
+        self.ttl_seconds = ttl_seconds
+        self._memory: Dict[str, Tuple[float, pd.DataFrame]] = {}
+        self._lock = threading.Lock()
+
+    def _path(self, key: str) -> Optional[Path]:
+        return self.root / f"{key}.csv" if self.root else None
+
+    def get(self, key: str) -> Optional[pd.DataFrame]:
+        """Return a fresh cached history, if any."""
+        now = time.time()
+        with self._lock:
+            cached = self._memory.get(key)
+        if cached and now - cached[0] < self.ttl_seconds:
+            return cached[1]
+
+        path = self._path(key)
+        if path is None or not path.exists() or now - path.stat().st_mtime >= self.ttl_seconds:
+            return None
+        try:
+            history = pd.read_csv(path, index_col="period_end", parse_dates=["period_end"])
+        except (OSError, ValueError) as e:
+            logger.warning("Ignoring unreadable AAOIFI cache %s: %s", path, e)
+            return None
+        with self._lock:
+            self._memory[key] = (path.stat().st_mtime, history)
+        return history
+
+    def put(self, key: str, history: pd.DataFrame) -> None:
+        """Store a computed history."""
+        with self._lock:
+            self._memory[key] = (time.time(), history)
+        path = self._path(key)
+        if path is None:
+            return
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+            history.to_csv(tmp_path)
+            tmp_path.replace(path)
+        except OSError as e:
+            logger.warning("Could not cache AAOIFI history for %s: %s", key, e)
+
+
+_cache = RatioHistoryCache(Config.AAOIFI_CACHE_DIR or None, Config.AAOIFI_CACHE_TTL)
+
+
+def fetch_inputs(ticker_symbol: str, window_days: int) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Fetch the quarterly balance sheet and enough daily prices to cover every period.
+
+    Returns:
+        Tuple of (balance_sheet, close_prices)
+    """
+    with metrics.current().timer("upstream_latency_seconds", upstream="yfinance"), \
+            tracing.span("yfinance.history", ticker=ticker_symbol):
+        ticker = yf.Ticker(ticker_symbol)
+        balance_sheet = circuit_breaker.call(
+            circuit_breaker.YFINANCE,
+            lambda: deadlines.call(
+                lambda: ticker.quarterly_balance_sheet, "yfinance.balance_sheet"
+            ),
+            ignore=(deadlines.DeadlineExceeded,)
+        )
+        start = None
+        if balance_sheet is not None and not balance_sheet.empty:
+            earliest = _naive_index(balance_sheet.columns).min()
+            start = (earliest - pd.Timedelta(days=window_days)).strftime("%Y-%m-%d")
+        history = circuit_breaker.call(
+            circuit_breaker.YFINANCE,
+            lambda: deadlines.call(
+                lambda: ticker.history(
+                    start=start, period=None if start else "5y", interval="1d",
+                    auto_adjust=False
+                ),
+                "yfinance.history"
+            ),
+            ignore=(deadlines.DeadlineExceeded,)
+        )
+    if history is not None and "Close" in history:
+        prices = history["Close"]
+    else:
+        prices = pd.Series(dtype="float64")
+    return balance_sheet, prices
+
+
+def ratio_history(ticker_symbol: str, window_days: Optional[int] = None) -> pd.DataFrame:
+    """
+    Return the AAOIFI ratio time series for a ticker, using the cache when fresh.
+
+    Args:
+        ticker_symbol: Stock ticker symbol
+        window_days: Trailing market-cap window (default ``Config.AAOIFI_MARKET_CAP_WINDOW_DAYS``)
+
+    Returns:
+        DataFrame as produced by ``compute_ratio_history``
+
+    Raises:
+        AAOIFIDataError: If the required data is unavailable
+        DeadlineExceeded: If the investigation deadline passes during the fetch
+    """
+    window_days = window_days or Config.AAOIFI_MARKET_CAP_WINDOW_DAYS
+    key = f"{ticker_symbol.upper()}_{window_days}d"
+    cached = _cache.get(key)
+    metrics.current().record_cache("aaoifi", cached is not None)
+    if cached is not None:
+        return cached
+
+    balance_sheet, prices = fetch_inputs(ticker_symbol, window_days)
+    history = compute_ratio_history(balance_sheet, prices, window_days)
+    _cache.put(key, history)
+    return history
+
+
+def bulk_ratio_history(
+    tickers: List[str],
+    window_days: Optional[int] = None,
+    max_workers: int = 8
+) -> Dict[str, pd.DataFrame]:
+    """
+    Compute ratio histories for a portfolio concurrently (one fetch per uncached ticker).
+
+    Returns:
+        Mapping of ticker to its history; tickers without usable data are omitted
+    """
+    def compute(ticker: str) -> Optional[pd.DataFrame]:
+        try:
+            return ratio_history(ticker, window_days)
+        except (AAOIFIDataError, circuit_breaker.CircuitOpenError) as e:
+            logger.warning("No AAOIFI history for %s: %s", ticker, e)
+            return None
+
+    unique = list(dict.fromkeys(t.upper() for t in tickers))
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="aaoifi") as pool:
+        results = dict(zip(unique, pool.map(compute, unique)))
+    return {ticker: history for ticker, history in results.items() if history is not None}
+
+
+def format_ratio_history(history: pd.DataFrame, window_days: int, periods: int = 8) -> str:
+    """
+    Format the most recent periods of a ratio history for the agent.
+
+    Args:
+        history: Result of ``ratio_history``
+        window_days: Trailing market-cap window used
+        periods: Number of most recent periods to list
+
+    Returns:
+        Human-readable table, newest period first
+    """
+    recent = history.tail(periods).iloc[::-1]
+    lines = [
+        f"Historical AAOIFI Ratios (trailing {window_days}-day average market cap):",
+        f"  {'Period':<12}{'Debt':>9}{'Cash':>9}  Status",
+    ]
+    for period_end, row in recent.iterrows():
+        lines.append(
+            f"  {pd.Timestamp(period_end):%Y-%m-%d}  {format_ratio(row['debt_ratio']):>8} "
+            f"{format_ratio(row['cash_ratio']):>8}  {row['status']}"
+        )
+    failing = int((history["status"] == "FAIL").sum())
+    unknown = int((history["status"] == UNKNOWN).sum())
+    summary = f"  Periods failing: {failing} of {len(history)}"
+    if unknown:
+        summary += f" ({unknown} without reported debt or cash: {UNKNOWN})"
+    lines.append(summary)
+    return "\n".join(lines)
+
+
+def format_ratio(value: float) -> str:
+    """Format a ratio in percent, or ``n/a`` when its input was not reported."""
+    return "n/a" if pd.isna(value) else f"{value:.2f}%"
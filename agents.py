@@ -1,12 +1,78 @@
 """Agent definitions for Ghost Office Hunter."""
-from typing import List, Optional
-from crewai import Agent
+import threading
+from typing import Dict, List, Optional, Tuple
+from crewai import Agent, LLM
 from crewai.tools import BaseTool
 
+from config import RunSettings
+from metrics import instrument_llm
+
+# Model routes (see RunSettings.model_for)
+ROUTE_RESEARCH = "research"
+ROUTE_SHARIAH = "shariah"
+ROUTE_SYNTHESIS = "synthesis"
+ROUTE_FUNCTION_CALLING = "function_calling"
+
+# LLM clients by (model, temperature, route), filled only when reuse is enabled
+_llm_cache: Dict[Tuple[str, float, str], LLM] = {}
+_llm_cache_lock = threading.Lock()
+_reuse_clients = False
+
+
+def enable_client_reuse() -> None:
+    """
+    Reuse LLM clients across runs instead of building new ones per agent.
+    
+    Meant for pool worker processes, which run one investigation at a time; a
+    client shared by concurrent runs in one process would mix their token usage.
+    """
+    global _reuse_clients
+    _reuse_clients = True
+
+
+def build_llm(settings: Optional[RunSettings] = None, route: str = ROUTE_RESEARCH) -> LLM:
+    """
+    Create the LLM client serving one model route of an investigation run.
+    
+    Args:
+        settings: Per-run settings; defaults are taken from Config
+        route: Model route, e.g. ``research`` for ReAct steps or ``synthesis``
+            for final report writing
+        
+    Returns:
+        Configured LLM instance, instrumented with per-route latency metrics
+    """
+    settings = settings or RunSettings()
+    if not _reuse_clients:
+        return instrument_llm(
+            LLM(model=settings.model_for(route), temperature=settings.temperature), route
+        )
+    key = (settings.model_for(route), settings.temperature, route)
+    with _llm_cache_lock:
+        llm = _llm_cache.get(key)
+        if llm is None:
+            llm = _llm_cache[key] = instrument_llm(LLM(model=key[0], temperature=key[1]), route)
+        return llm
+
+
+def build_function_calling_llm(settings: Optional[RunSettings] = None) -> Optional[LLM]:
+    """
+    Create the dedicated function-calling LLM, if one is configured.
+    
+    Returns:
+        LLM instance, or None to let agents structure tool calls with their own model
+    """
+    settings = settings or RunSettings()
+    if not settings.model_for(ROUTE_FUNCTION_CALLING):
+        return None
+    return build_llm(settings, ROUTE_FUNCTION_CALLING)
+
 
 def registry_researcher_agent(
     tools: Optional[List[BaseTool]] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    settings: Optional[RunSettings] = None,
+    route: str = ROUTE_RESEARCH
 ) -> Agent:
     """
     Create a Corporate Registry Investigator agent.
@@ -14,6 +80,8 @@ def registry_researcher_agent(
     Args:
         tools: List of tools to assign to the agent
         verbose: Whether to enable verbose output
+        settings: Per-run settings used to configure the agent's LLM
+        route: Model route for the agent's LLM (``synthesis`` for tool-less writing tasks)
         
     Returns:
         Configured Agent instance
@@ -26,13 +94,45 @@ def registry_researcher_agent(
         You scrutinize corporate registry data for red flags.""",
         verbose=verbose,
         allow_delegation=False,
-        tools=tools or []
+        tools=tools or [],
+        llm=build_llm(settings, route),
+        function_calling_llm=build_function_calling_llm(settings) if tools else None
+    )
+
+
+def report_writer_agent(verbose: bool = True, settings: Optional[RunSettings] = None) -> Agent:
+    """
+    Create a Forensic Report Writer agent for the final synthesis step.
+    
+    Used when the synthesis route has its own (typically stronger) model: the
+    investigator gathers evidence with a fast model, and this agent turns its
+    findings into the final report in a single tool-less step.
+    
+    Args:
+        verbose: Whether to enable verbose output
+        settings: Per-run settings used to configure the agent's LLM
+        
+    Returns:
+        Configured Agent instance
+    """
+    return Agent(
+        role='Forensic Report Writer',
+        goal='Turn investigation findings into a precise, well-supported forensic risk report',
+        backstory="""You are the senior reviewer at a Singapore compliance firm who signs off
+        every forensic report. You weigh the evidence gathered by investigators, never overlook a
+        red flag, and state the risk rating and its justification clearly, citing sources for every
+        finding.""",
+        verbose=verbose,
+        allow_delegation=False,
+        tools=[],
+        llm=build_llm(settings, ROUTE_SYNTHESIS)
     )
 
 
 def shariah_compliance_agent(
     tools: Optional[List[BaseTool]] = None,
-    verbose: bool = True
+    verbose: bool = True,
+    settings: Optional[RunSettings] = None
 ) -> Agent:
     """
     Create a Shariah Compliance Analyst agent.
@@ -40,6 +140,7 @@ def shariah_compliance_agent(
     Args:
         tools: List of tools to assign to the agent
         verbose: Whether to enable verbose output
+        settings: Per-run settings used to configure the agent's LLM
         
     Returns:
         Configured Agent instance
@@ -63,5 +164,7 @@ def shariah_compliance_agent(
         mention or implication of prohibited activities that would make a company non-compliant.""",
         verbose=verbose,
         allow_delegation=False,
-        tools=tools or []
+        tools=tools or [],
+        llm=build_llm(settings, ROUTE_SHARIAH),
+        function_calling_llm=build_function_calling_llm(settings) if tools else None
     )
\ No newline at end of file
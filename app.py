@@ -1,14 +1,19 @@
 """Streamlit UI for Ghost Office Hunter."""
 import streamlit as st
 import sys
+import threading
+from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
 # Add parent directory to path for imports
 sys.path.insert(0, str(Path(__file__).parent))
 
 from main import run_investigation
-from config import Config
+from config import Config, RunSettings
+from report_store import get_report_store
 
 # Page configuration
 st.set_page_config(
@@ -146,6 +151,22 @@ def main():
                 help="Enable detailed logging output"
             )
             
+            incremental_mode = st.checkbox(
+                "Delta Re-investigation",
+                value=False,
+                help="Re-run the previous searches and only analyze new or changed evidence, "
+                     "appending a delta section to the last report"
+            )
+            
+            deadline_seconds = st.number_input(
+                "Deadline (seconds)",
+                min_value=0,
+                value=Config.INVESTIGATION_DEADLINE_SECONDS,
+                step=60,
+                help="Time budget for the investigation; a partial report marked TIMED OUT is "
+                     "produced when it runs out (0 = no limit)"
+            )
+            
             st.divider()
             
             # Shariah compliance options
@@ -214,17 +235,13 @@ def main():
         if not company_name or not company_name.strip():
             st.error("❌ Please enter a company name to investigate")
         else:
-            # Store original config values
-            original_max_results = Config.SEARCH_MAX_RESULTS
-            original_region = Config.SEARCH_REGION
+            # Per-run settings; Config only provides the defaults
+            settings = RunSettings(
+                search_max_results=search_max_results,
+                search_region=search_region
+            )
             
             try:
-                # Temporarily update config for this investigation
-                # Note: This modifies class attributes, which affects all instances
-                # In production, consider using a context manager or passing params directly
-                Config.SEARCH_MAX_RESULTS = search_max_results
-                Config.SEARCH_REGION = search_region
-                
                 # Show progress
                 with st.spinner("🔍 Investigating company... This may take a few minutes."):
                     progress_bar = st.progress(0)
@@ -251,12 +268,32 @@ def main():
                     if include_shariah and not ticker:
                         st.warning("⚠️ Shariah compliance requested but no ticker symbol provided. Proceeding without Shariah check.")
                     
+                    # Show each report section as soon as its task completes
+                    live_report = st.empty()
+                    live_sections = []
+                    script_ctx = get_script_run_ctx()
+                    
+                    def show_section(title: str, content: str) -> None:
+                        # With a deadline the crew runs on a worker thread, which needs the
+                        # script's context for st.* calls to reach this session
+                        add_script_run_ctx(threading.current_thread(), script_ctx)
+                        live_sections.append((title, content))
+                        with live_report.container():
+                            for section_title, section_content in live_sections:
+                                with st.expander(f"📄 {section_title}", expanded=True):
+                                    st.markdown(section_content)
+                    
                     report_path = run_investigation(
                         company_name.strip(), 
                         output_path,
                         include_shariah=shariah_enabled,
-                        ticker_symbol=ticker
+                        ticker_symbol=ticker,
+                        settings=settings,
+                        on_section=show_section,
+                        incremental=incremental_mode,
+                        deadline=deadline_seconds
                     )
+                    live_report.empty()
                     
                     progress_bar.progress(80)
                     status_text.text("Generating report...")
@@ -288,10 +325,6 @@ def main():
             except Exception as e:
                 st.error(f"❌ Unexpected Error: {e}")
                 st.session_state.investigation_result = "error"
-            finally:
-                # Restore original config
-                Config.SEARCH_MAX_RESULTS = original_max_results
-                Config.SEARCH_REGION = original_region
     
     # Display results
     if st.session_state.investigation_result == "success" and st.session_state.report_content:
@@ -322,6 +355,53 @@ def main():
         # Report preview in code block
         with st.expander("📋 Raw Markdown"):
             st.code(st.session_state.report_content, language="markdown")
+    
+    render_report_history()
+
+
+def render_report_history():
+    """Searchable history of previously stored reports."""
+    store = get_report_store()
+    if store is None:
+        return
+    
+    st.divider()
+    st.header("📚 Report History")
+    
+    search_query = st.text_input(
+        "Search Reports",
+        placeholder="e.g., liquidators, \"MAS penalty\", company name",
+        help="Full-text search over all stored reports (leave empty for the most recent)"
+    )
+    results = store.search(search_query, limit=50)
+    
+    if not results:
+        st.info("No stored reports match this search.")
+        return
+    
+    labels = {
+        f"{r.company} · v{r.version} · "
+        f"{datetime.fromtimestamp(r.created_at):%Y-%m-%d %H:%M} · "
+        f"risk {r.risk_rating or 'n/a'}"
+        + (f" · Shariah {r.shariah_status}" if r.shariah_status else ""): r
+        for r in results
+    }
+    selected_label = st.selectbox("Stored Reports", options=list(labels.keys()))
+    selected = labels[selected_label]
+    
+    if selected.snippet:
+        st.caption(selected.snippet)
+    
+    versions = store.history(selected.company)
+    if len(versions) > 1:
+        st.caption(
+            "Versions: " + ", ".join(
+                f"v{v.version} ({v.risk_rating or 'n/a'})" for v in versions
+            )
+        )
+    
+    with st.expander("📖 View Stored Report", expanded=False):
+        st.markdown(store.get_body(selected.id) or "")
 
 
 if __name__ == "__main__":
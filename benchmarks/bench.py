@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Offline benchmark suite for Ghost Office Hunter.
+
+DDGS, yfinance and the LLM are replaced by deterministic stubs, so results
+depend only on our own code and can be compared across commits::
+
+    python benchmarks/bench.py                      # all benchmarks
+    python benchmarks/bench.py --only formatting    # a subset
+    python benchmarks/bench.py --compare benchmarks/results/abc1234.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import stubs  # noqa: E402
+
+# Bind the application modules to the offline stubs before importing them
+stubs.install()
+os.environ.setdefault("OPENAI_API_KEY", "benchmark-offline-key")
+
+import metrics  # noqa: E402
+from config import RunSettings  # noqa: E402
+from main import run_batch, run_investigation  # noqa: E402
+from tools import GhostHunterSearchTool  # noqa: E402
+
+stubs.use_fake_llm()
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    """Summary statistics for a list of durations in seconds."""
+    ordered = sorted(samples)
+    return {
+        "n": len(ordered),
+        "mean_s": round(statistics.fmean(ordered), 6),
+        "p50_s": round(ordered[len(ordered) // 2], 6),
+        "p95_s": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 6),
+        "min_s": round(ordered[0], 6),
+    }
+
+
+@contextlib.contextmanager
+def quiet() -> Any:
+    """Silence CrewAI's verbose console output while measuring."""
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
+
+
+def bench_formatting(iterations: int) -> Dict[str, Any]:
+    """Search-result formatting throughput with a zero-latency DDGS stub."""
+    stubs.Latency.search = 0.0
+    tool = GhostHunterSearchTool(settings=RunSettings(search_max_results=10))
+    start = time.perf_counter()
+    for i in range(iterations):
+        tool._run(f"formatting company {i}")
+    elapsed = time.perf_counter() - start
+    return {
+        "iterations": iterations,
+        "ops_per_s": round(iterations / elapsed, 1),
+        "elapsed_s": round(elapsed, 4),
+    }
+
+
+def bench_cache(iterations: int, latency: float) -> Dict[str, Any]:
+    """Cold (distinct queries) versus warm (repeated queries) search latency."""
+    stubs.Latency.search = latency
+    tool = GhostHunterSearchTool()
+    queries = [f"cache company {i} fraud" for i in range(iterations)]
+    run_metrics = metrics.RunMetrics(run_id="bench-cache")
+
+    with metrics.activate(run_metrics):
+        upstream_before = stubs.FakeDDGS.calls
+        cold = []
+        for query in queries:
+            start = time.perf_counter()
+            tool._run(query)
+            cold.append(time.perf_counter() - start)
+        warm = []
+        for query in queries:
+            start = time.perf_counter()
+            tool._run(query)
+            warm.append(time.perf_counter() - start)
+        upstream_calls = stubs.FakeDDGS.calls - upstream_before
+
+    stubs.Latency.search = 0.0
+    return {
+        "simulated_latency_s": latency,
+        "cold": summarize(cold),
+        "warm": summarize(warm),
+        "upstream_calls": upstream_calls,
+        "cache_hit_rate": run_metrics.to_dict()["cache_hit_rate"],
+    }
+
+
+def bench_investigation(iterations: int, output_dir: str) -> Dict[str, Any]:
+    """End-to-end run_investigation overhead with instant upstreams and LLM."""
+    settings = RunSettings(output_dir=output_dir)
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        with quiet():
+            run_investigation(f"Benchmark Company {i}", settings=settings)
+        samples.append(time.perf_counter() - start)
+    return summarize(samples)
+
+
+def bench_batch(companies: int, concurrency_levels: List[int], output_dir: str,
+                search_latency: float, llm_latency: float) -> Dict[str, Any]:
+    """Batch throughput as concurrency grows, with simulated upstream latency."""
+    stubs.Latency.search = search_latency
+    stubs.Latency.llm = llm_latency
+    settings = RunSettings(output_dir=output_dir)
+    results = {}
+    for workers in concurrency_levels:
+        names = [f"Batch Company {workers}-{i}" for i in range(companies)]
+        start = time.perf_counter()
+        with quiet():
+            outcome = run_batch(names, max_workers=workers, settings=settings)
+        elapsed = time.perf_counter() - start
+        results[str(workers)] = {
+            "elapsed_s": round(elapsed, 4),
+            "investigations_per_s": round(companies / elapsed, 3),
+            "failures": sum(isinstance(r, Exception) for r in outcome.values()),
+        }
+    stubs.Latency.search = 0.0
+    stubs.Latency.llm = 0.0
+    baseline = results[str(concurrency_levels[0])]["elapsed_s"]
+    for entry in results.values():
+        entry["speedup"] = round(baseline / entry["elapsed_s"], 2)
+    return {
+        "companies": companies,
+        "simulated_search_latency_s": search_latency,
+        "simulated_llm_latency_s": llm_latency,
+        "by_concurrency": results,
+    }
+
+
+def bench_cli_startup(iterations: int) -> Dict[str, Any]:
+    """Wall time of ``python main.py --help`` (imports crewai and all tools)."""
+    samples = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        proc = subprocess.run(
+            [sys.executable, "main.py", "--help"],
+            cwd=REPO_ROOT, capture_output=True, text=True
+        )
+        samples.append(time.perf_counter() - start)
+        if proc.returncode != 0:
+            error = proc.stderr.strip().splitlines()[-1] if proc.stderr else "non-zero exit"
+            return {"error": error}
+    return summarize(samples)
+
+
+def git_commit() -> str:
+    """Short hash of the checked-out commit, or 'unknown'."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(current: Dict[str, Any], previous_path: str) -> None:
+    """Print headline numbers next to a previous results file."""
+    previous = json.loads(Path(previous_path).read_text(encoding="utf-8"))
+
+    def headline(results: Dict[str, Any]) -> Dict[str, Optional[float]]:
+        r = results.get("results", {})
+        batch = r.get("batch", {}).get("by_concurrency", {})
+        return {
+            "formatting ops/s": r.get("formatting", {}).get("ops_per_s"),
+            "warm search p50 s": r.get("cache", {}).get("warm", {}).get("p50_s"),
+            "investigation p50 s": r.get("investigation", {}).get("p50_s"),
+            "batch best inv/s": max(
+                (v["investigations_per_s"] for v in batch.values()), default=None
+            ),
+            "cli startup p50 s": r.get("cli_startup", {}).get("p50_s"),
+        }
+
+    before, after = headline(previous), headline(current)
+    print(
+        f"\n{'metric':<22}{previous.get('commit', '?'):>12}"
+        f"{current.get('commit', '?'):>12}{'change':>10}"
+    )
+    for key in after:
+        old, new = before.get(key), after.get(key)
+        change = f"{(new - old) / old * 100:+.1f}%" if old and new is not None else "n/a"
+        print(f"{key:<22}{str(old):>12}{str(new):>12}{change:>10}")
+
+
+def main() -> int:
+    """Run the selected benchmarks and write a JSON results file."""
+    parser = argparse.ArgumentParser(description="Offline Ghost Office Hunter benchmarks")
+    parser.add_argument("--only", nargs="+", default=None,
+                        choices=["formatting", "cache", "investigation", "batch", "cli_startup"],
+                        help="Run only these benchmarks")
+    parser.add_argument("--iterations", type=int, default=20,
+                        help="Iterations for per-call benchmarks")
+    parser.add_argument("--companies", type=int, default=8, help="Companies per batch-scaling step")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 2, 4, 8],
+                        help="Concurrency levels for batch scaling")
+    parser.add_argument("--search-latency", type=float, default=0.02,
+                        help="Simulated DDGS latency (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Simulated LLM latency (s)")
+    parser.add_argument("--output", "-o", default=None,
+                        help="Results file (default: benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", default=None, help="Previous results file to compare against")
+    args = parser.parse_args()
+
+    selected = set(args.only or ["formatting", "cache", "investigation", "batch", "cli_startup"])
+    benchmarks: Dict[str, Callable[[str], Dict[str, Any]]] = {
+        "formatting": lambda d: bench_formatting(args.iterations * 50),
+        "cache": lambda d: bench_cache(args.iterations, args.search_latency),
+        "investigation": lambda d: bench_investigation(args.iterations, d),
+        "batch": lambda d: bench_batch(args.companies, args.concurrency, d,
+                                       args.search_latency, args.llm_latency),
+        "cli_startup": lambda d: bench_cli_startup(max(3, args.iterations // 4)),
+    }
+
+    commit = git_commit()
+    report: Dict[str, Any] = {
+        "commit": commit,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="ghost-hunter-bench-") as output_dir:
+        # Keep reports, indexes, the portfolio dataset and caches of benchmark runs
+        # out of the real stores
+        stubs.isolate_state(output_dir)
+        for name, bench in benchmarks.items():
+            if name not in selected:
+                continue
+            print(f"Running {name}...", file=sys.stderr)
+            try:
+                report["results"][name] = bench(output_dir)
+            except Exception as e:
+                report["results"][name] = {"error": f"{type(e).__name__}: {e}"}
+
+    output = Path(args.output or REPO_ROOT / "benchmarks" / "results" / f"{commit}.json")
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(json.dumps(report["results"], indent=2))
+    print(f"\nResults written to {output}", file=sys.stderr)
+
+    if args.compare:
+        compare(report, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,184 @@
+"""Deterministic offline stand-ins for DDGS, yfinance and the LLM.
+
+``install()`` must run before ``tools``/``main`` are imported so they bind to
+the stubs instead of the real upstream clients. ``use_fake_llm()`` then makes
+every agent use the scripted LLM, and ``isolate_state()`` keeps reports,
+indexes and caches written by stubbed runs out of the real stores. The
+benchmarks and ``service.py --stub`` both use them.
+"""
+import hashlib
+import json
+import os
+import re
+import sys
+import time
+import types
+from typing import Any, Dict, List, Optional
+
+
+class Latency:
+    """Simulated upstream latencies in seconds (all zero by default)."""
+
+    search: float = 0.0
+    finance: float = 0.0
+    llm: float = 0.0
+
+
+def _digest(text: str) -> int:
+    """Stable integer derived from ``text``."""
+    return int(hashlib.sha256(text.encode("utf-8")).hexdigest()[:8], 16)
+
+
+class FakeDDGSException(Exception):
+    """Stand-in for ``ddgs.exceptions.DDGSException``."""
+
+
+class FakeDDGS:
+    """Stand-in for ``ddgs.DDGS`` returning deterministic results per query."""
+
+    calls = 0
+
+    def __init__(self, *args: Any, **kwargs: Any):
+        pass
+
+    def text(self, query: str, region: str = "wt-wt", safesearch: str = "moderate",
+             max_results: Optional[int] = 10, **kwargs: Any) -> List[Dict[str, str]]:
+        FakeDDGS.calls += 1
+        if Latency.search:
+            time.sleep(Latency.search)
+        seed = _digest(query)
+        count = min(max_results or 10, 10)
+        return [
+            {
+                "title": f"{query} - result {i} ({seed % 997})",
+                "body": (
+                    f"Coverage of {query}: registered office at {seed % 300} Robinson Road, "
+                    f"Singapore. Liquidators appointed; MAS penalty reported in filing {seed + i}."
+                ),
+                "href": f"https://news.example.com/{seed % 10007}/{i}",
+            }
+            for i in range(count)
+        ]
+
+
+class FakeTicker:
+    """Stand-in for ``yfinance.Ticker`` with a deterministic ``info`` payload."""
+
+    calls = 0
+
+    def __init__(self, symbol: str):
+        self.ticker = symbol
+        seed = _digest(symbol)
+        self._info = {
+            "longName": f"{symbol} Holdings Ltd",
+            "marketCap": 1_000_000_000 + seed % 9_000_000_000,
+            "totalDebt": 50_000_000 + seed % 400_000_000,
+            "totalCash": 20_000_000 + seed % 300_000_000,
+            "industry": "Specialty Industrial Machinery",
+            "sector": "Industrials",
+            "longBusinessSummary": (
+                f"{symbol} Holdings designs and manufactures water flow control products "
+                "for residential, commercial and industrial markets."
+            ),
+        }
+
+    @property
+    def info(self) -> Dict[str, Any]:
+        FakeTicker.calls += 1
+        if Latency.finance:
+            time.sleep(Latency.finance)
+        return dict(self._info)
+
+
+def install() -> None:
+    """Register the stub ``ddgs`` and ``yfinance`` modules in ``sys.modules``."""
+    ddgs_module = types.ModuleType("ddgs")
+    ddgs_module.DDGS = FakeDDGS
+    exceptions_module = types.ModuleType("ddgs.exceptions")
+    exceptions_module.DDGSException = FakeDDGSException
+    ddgs_module.exceptions = exceptions_module
+    yfinance_module = types.ModuleType("yfinance")
+    yfinance_module.Ticker = FakeTicker
+    sys.modules["ddgs"] = ddgs_module
+    sys.modules["ddgs.exceptions"] = exceptions_module
+    sys.modules["yfinance"] = yfinance_module
+
+
+def make_fake_llm(tool_steps: int = 2) -> Any:
+    """
+    Build a scripted CrewAI LLM that performs ``tool_steps`` tool calls, then answers.
+
+    The LLM reads the tool names and argument names from the agent's prompt, so
+    it drives the real ReAct loop and real tools without any network access.
+    """
+    from crewai import BaseLLM
+
+    class FakeLLM(BaseLLM):
+        """Scripted ReAct LLM."""
+
+        def __init__(self) -> None:
+            super().__init__(model="fake-benchmark-llm", temperature=0.0)
+            self.calls = 0
+
+        def call(self, messages: Any, tools: Any = None, callbacks: Any = None,
+                 available_functions: Any = None, **kwargs: Any) -> str:
+            self.calls += 1
+            if Latency.llm:
+                time.sleep(Latency.llm)
+            text = messages if isinstance(messages, str) else "\n".join(
+                str(m.get("content", "")) for m in messages
+            )
+            observations = text.count("Observation:")
+            tool_match = re.search(r"Tool Name: (.+)", text)
+            if tool_match and observations < tool_steps:
+                args_match = re.search(r"Tool Arguments: \{'(\w+)'", text)
+                arg = args_match.group(1) if args_match else "query"
+                value = "WTS" if arg == "ticker_symbol" else f"benchmark query {observations}"
+                return (
+                    "Thought: I need more evidence.\n"
+                    f"Action: {tool_match.group(1).strip()}\n"
+                    f"Action Input: {json.dumps({arg: value})}"
+                )
+            return (
+                "Thought: I now know the final answer\n"
+                "Final Answer: # Forensic Risk Report\n\n"
+                "**Risk Rating: HIGH**\n\n"
+                "- Adverse media: liquidators appointed, MAS penalty\n"
+                "- Ghost office: shared registered address\n"
+                "- Sources: https://news.example.com/1/1"
+            )
+
+        def supports_function_calling(self) -> bool:
+            return False
+
+        def supports_stop_words(self) -> bool:
+            return False
+
+        def get_context_window_size(self) -> int:
+            return 128_000
+
+    return FakeLLM()
+
+
+def use_fake_llm(tool_steps: int = 2) -> None:
+    """Make ``agents.build_llm`` return an instrumented scripted LLM for every route."""
+    import agents
+    import metrics
+
+    agents.build_llm = lambda settings=None, route=agents.ROUTE_RESEARCH: metrics.instrument_llm(
+        make_fake_llm(tool_steps), route
+    )
+
+
+def isolate_state(directory: str) -> None:
+    """Point every report, index and cache location in ``Config`` into ``directory``."""
+    from config import Config
+
+    Config.OUTPUT_DIR = directory
+    Config.REPORT_DB = os.path.join(directory, "reports.db")
+    Config.EVIDENCE_DIR = os.path.join(directory, "evidence")
+    Config.PORTFOLIO_DIR = os.path.join(directory, "portfolio")
+    Config.WATCHLIST_DB = os.path.join(directory, "watchlist.db")
+    Config.SHARED_CACHE_DB = os.path.join(directory, "shared.db")
+    Config.FETCH_CACHE_DIR = os.path.join(directory, "pages")
+    Config.AAOIFI_CACHE_DIR = os.path.join(directory, "aaoifi")
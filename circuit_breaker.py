@@ -0,0 +1,251 @@
+"""Per-upstream circuit breakers for Ghost Office Hunter.
+
+When DuckDuckGo or Yahoo Finance is degraded, every tool call would otherwise
+go through its full retry cycle, in every concurrent investigation. A
+``CircuitBreaker`` watches the failure rate of one upstream over a sliding
+window and moves through three states:
+
+* **closed**: calls go through; outcomes are recorded in the window.
+* **open**: the failure rate crossed the threshold, so calls fail immediately
+  with ``CircuitOpenError`` until the cool-down has passed.
+* **half-open**: after the cool-down, a single trial call is let through. If it
+  succeeds the circuit closes; if it fails the circuit opens again.
+
+Breakers are shared process-wide through ``get_breaker`` and their state is
+exported as the ``circuit_breaker_state`` gauge on the metrics registry.
+"""
+import threading
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Tuple, Type, TypeVar
+
+import metrics
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+# Gauge values for circuit_breaker_state
+STATE_VALUES: Dict[str, int] = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+# Upstream names used by the tools
+DDGS = "ddgs"
+YFINANCE = "yfinance"
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose circuit is open."""
+
+    def __init__(self, upstream: str, retry_after: float):
+        super().__init__(
+            f"{upstream} is currently unavailable (circuit open after repeated failures); "
+            f"not retrying for another {max(1.0, retry_after):.0f}s. "
+            "Continue with the information you already have."
+        )
+        self.upstream = upstream
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    """Failure-rate circuit breaker for one upstream service."""
+
+    def __init__(
+        self,
+        name: str,
+        failure_rate: Optional[float] = None,
+        min_calls: Optional[int] = None,
+        window_seconds: Optional[float] = None,
+        open_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            name: Upstream name, used in messages and metric labels
+            failure_rate: Fraction of failed calls in the window that opens the circuit
+            min_calls: Calls needed in the window before the rate is evaluated
+            window_seconds: Length of the sliding window of recorded outcomes
+            open_seconds: Cool-down before a trial call is allowed
+        """
+        self.name = name
+        self.failure_rate = failure_rate or Config.CIRCUIT_FAILURE_RATE
+        self.min_calls = min_calls or Config.CIRCUIT_MIN_CALLS
+        self.window_seconds = window_seconds or Config.CIRCUIT_WINDOW_SECONDS
+        self.open_seconds = open_seconds or Config.CIRCUIT_OPEN_SECONDS
+        self.state = CLOSED
+        self.opened_at = 0.0
+        self._outcomes: Deque[Tuple[float, bool]] = deque()
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+        self._publish()
+
+    def _publish(self) -> None:
+        metrics.REGISTRY.set_gauge(
+            "circuit_breaker_state", STATE_VALUES[self.state], upstream=self.name
+        )
+
+    def _transition(self, state: str) -> None:
+        # Caller holds the lock
+        if state == self.state:
+            return
+        logger.warning("Circuit for %s: %s -> %s", self.name, self.state, state)
+        metrics.current().increment(
+            "circuit_breaker_transitions_total", upstream=self.name, state=state
+        )
+        self.state = state
+        if state == OPEN:
+            self.opened_at = time.monotonic()
+        if state != HALF_OPEN:
+            self._trial_in_flight = False
+        if state == CLOSED:
+            self._outcomes.clear()
+        self._publish()
+
+    def _prune(self, now: float) -> None:
+        while self._outcomes and now - self._outcomes[0][0] > self.window_seconds:
+            self._outcomes.popleft()
+
+    def retry_after(self) -> float:
+        """Seconds until an open circuit lets a trial call through (0 unless open)."""
+        with self._lock:
+            if self.state != OPEN:
+                return 0.0
+            return max(0.0, self.opened_at + self.open_seconds - time.monotonic())
+
+    def is_open(self) -> bool:
+        """Whether calls would currently be rejected."""
+        with self._lock:
+            if self.state == OPEN:
+                return time.monotonic() < self.opened_at + self.open_seconds
+            return self.state == HALF_OPEN and self._trial_in_flight
+
+    def allow(self) -> None:
+        """
+        Admit one call or raise.
+
+        Raises:
+            CircuitOpenError: If the circuit is open, or half-open with a trial already running
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self.opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    metrics.current().increment(
+                        "circuit_breaker_rejections_total", upstream=self.name
+                    )
+                    raise CircuitOpenError(self.name, remaining)
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._trial_in_flight:
+                    metrics.current().increment(
+                        "circuit_breaker_rejections_total", upstream=self.name
+                    )
+                    raise CircuitOpenError(self.name, self.open_seconds)
+                self._trial_in_flight = True
+
+    def record_success(self) -> None:
+        """Record a successful call."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(CLOSED)
+                return
+            now = time.monotonic()
+            self._outcomes.append((now, True))
+            self._prune(now)
+
+    def record_failure(self) -> None:
+        """Record a failed call, opening the circuit if the failure rate is too high."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            if self.state == OPEN:
+                return
+            now = time.monotonic()
+            self._outcomes.append((now, False))
+            self._prune(now)
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and failures / calls >= self.failure_rate:
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Give up a half-open trial slot without recording an outcome."""
+        with self._lock:
+            if self.state == HALF_OPEN:
+                self._trial_in_flight = False
+
+    def call(self, func: Callable[[], T], ignore: Tuple[Type[BaseException], ...] = ()) -> T:
+        """
+        Call ``func`` through the breaker.
+
+        Args:
+            func: Zero-argument upstream call
+            ignore: Exception types that propagate without counting as upstream
+                failures (e.g. the caller's own deadline)
+
+        Raises:
+            CircuitOpenError: If the circuit is open
+        """
+        self.allow()
+        try:
+            result = func()
+        except ignore:
+            self.release()
+            raise
+        except Exception:
+            self.record_failure()
+            raise
+        except BaseException:
+            self.release()
+            raise
+        self.record_success()
+        return result
+
+    def snapshot(self) -> Dict[str, object]:
+        """Current state and window statistics, for status pages and logs."""
+        with self._lock:
+            self._prune(time.monotonic())
+            failures = sum(1 for _, ok in self._outcomes if not ok)
+            return {
+                "upstream": self.name,
+                "state": self.state,
+                "calls_in_window": len(self._outcomes),
+                "failures_in_window": failures,
+            }
+
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(name: str) -> CircuitBreaker:
+    """Return the process-wide breaker for an upstream, creating it on first use."""
+    with _breakers_lock:
+        breaker = _breakers.get(name)
+        if breaker is None:
+            breaker = _breakers[name] = CircuitBreaker(name)
+        return breaker
+
+
+def call(name: str, func: Callable[[], T], ignore: Tuple[Type[BaseException], ...] = ()) -> T:
+    """Call ``func`` through the named upstream's breaker (pass-through when disabled)."""
+    if not Config.CIRCUIT_BREAKER_ENABLED:
+        return func()
+    return get_breaker(name).call(func, ignore=ignore)
+
+
+def open_circuits() -> List[CircuitBreaker]:
+    """Breakers that are currently rejecting calls."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [b for b in breakers if b.is_open()]
+
+
+def is_open(name: str) -> bool:
+    """Whether the named upstream's calls are currently being rejected."""
+    return Config.CIRCUIT_BREAKER_ENABLED and get_breaker(name).is_open()
@@ -1,5 +1,6 @@
 """Configuration management for Ghost Office Hunter."""
 import os
+from dataclasses import dataclass, field
 from typing import Optional
 from dotenv import load_dotenv
 
@@ -14,18 +15,160 @@ class Config:
     OPENAI_API_KEY: Optional[str] = os.getenv("OPENAI_API_KEY")
     OPENAI_MODEL_NAME: str = os.getenv("OPENAI_MODEL_NAME", "gpt-4")
     OPENAI_TEMPERATURE: float = float(os.getenv("OPENAI_TEMPERATURE", "0.7"))
+    # Model routing per step; empty routes fall back to OPENAI_MODEL_NAME
+    # Investigator ReAct steps (choosing the next search, reading results)
+    MODEL_ROUTE_RESEARCH: str = os.getenv("MODEL_ROUTE_RESEARCH", "")
+    # Shariah analyst steps (ticker lookup, ratio and business checks)
+    MODEL_ROUTE_SHARIAH: str = os.getenv("MODEL_ROUTE_SHARIAH", "")
+    # Final report writing; a model different from the research route adds a separate synthesis task
+    MODEL_ROUTE_SYNTHESIS: str = os.getenv("MODEL_ROUTE_SYNTHESIS", "")
+    # Optional dedicated model for structuring tool calls (empty = the agent's own model)
+    MODEL_ROUTE_FUNCTION_CALLING: str = os.getenv("MODEL_ROUTE_FUNCTION_CALLING", "")
     
     # Search Configuration
     SEARCH_MAX_RESULTS: int = int(os.getenv("SEARCH_MAX_RESULTS", "10"))
     SEARCH_REGION: str = os.getenv("SEARCH_REGION", "wt-wt")
     SEARCH_SAFESEARCH: str = os.getenv("SEARCH_SAFESEARCH", "moderate")
+    # Upstream searches allowed per agent per investigation (0 = unlimited)
+    SEARCH_BUDGET: int = int(os.getenv("SEARCH_BUDGET", "15"))
+    # Queries at least this similar (Jaccard over normalized terms) are served from earlier results
+    SEARCH_DUPLICATE_THRESHOLD: float = float(os.getenv("SEARCH_DUPLICATE_THRESHOLD", "0.75"))
+    # Merge same-subject queries into one OR-query (DuckDuckGo supports OR)
+    SEARCH_SUPPORTS_OR: bool = (
+        os.getenv("SEARCH_SUPPORTS_OR", "true").lower() in ("1", "true", "yes")
+    )
     
     # Logging Configuration
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     LOG_FILE: Optional[str] = os.getenv("LOG_FILE")
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")  # "text" or "json"
+    LOG_ROTATION: str = os.getenv("LOG_ROTATION", "size")  # "size", "time" or "none"
+    LOG_MAX_BYTES: int = int(os.getenv("LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+    LOG_BACKUP_COUNT: int = int(os.getenv("LOG_BACKUP_COUNT", "5"))
+    LOG_ROTATION_WHEN: str = os.getenv("LOG_ROTATION_WHEN", "midnight")
+    
+    # Shared Cache Configuration (SQLite file shared by local worker processes; empty disables)
+    SHARED_CACHE_DB: str = os.getenv("SHARED_CACHE_DB", os.path.join(".cache", "shared.db"))
+    SHARED_CACHE_MAX_MB: int = int(os.getenv("SHARED_CACHE_MAX_MB", "256"))
+    SHARED_CACHE_SEARCH_TTL: int = int(os.getenv("SHARED_CACHE_SEARCH_TTL", str(6 * 3600)))
+    SHARED_CACHE_FUNDAMENTALS_TTL: int = int(
+        os.getenv("SHARED_CACHE_FUNDAMENTALS_TTL", str(12 * 3600))
+    )
+    SHARED_CACHE_LEASE_SECONDS: float = float(os.getenv("SHARED_CACHE_LEASE_SECONDS", "60"))
+    
+    # AAOIFI Ratio History Configuration
+    # Trailing market-cap window for the debt/cash ratios (AAOIFI practice: 24-36 months)
+    AAOIFI_MARKET_CAP_WINDOW_DAYS: int = int(os.getenv("AAOIFI_MARKET_CAP_WINDOW_DAYS", "730"))
+    # Computed ratio histories cached per ticker (empty keeps the cache in memory only)
+    AAOIFI_CACHE_DIR: str = os.getenv("AAOIFI_CACHE_DIR", os.path.join(".cache", "aaoifi"))
+    AAOIFI_CACHE_TTL: int = int(os.getenv("AAOIFI_CACHE_TTL", "86400"))
+    
+    # Page Fetch Configuration
+    FETCH_TIMEOUT: float = float(os.getenv("FETCH_TIMEOUT", "15"))
+    FETCH_MAX_CONCURRENCY: int = int(os.getenv("FETCH_MAX_CONCURRENCY", "8"))
+    FETCH_PER_HOST_LIMIT: int = int(os.getenv("FETCH_PER_HOST_LIMIT", "2"))
+    FETCH_MAX_BYTES: int = int(os.getenv("FETCH_MAX_BYTES", str(2 * 1024 * 1024)))
+    FETCH_TOKEN_BUDGET: int = int(os.getenv("FETCH_TOKEN_BUDGET", "1500"))
+    FETCH_MAX_URLS: int = int(os.getenv("FETCH_MAX_URLS", "5"))
+    # Extracted pages cached by URL and revalidated via ETag (empty disables)
+    FETCH_CACHE_DIR: str = os.getenv("FETCH_CACHE_DIR", os.path.join(".cache", "pages"))
+    FETCH_CACHE_TTL: int = int(os.getenv("FETCH_CACHE_TTL", "86400"))
+    # Allow fetching hosts on loopback, private or link-local addresses (off: agent-supplied URLs
+    # must not reach internal services)
+    FETCH_ALLOW_PRIVATE_HOSTS: bool = (
+        os.getenv("FETCH_ALLOW_PRIVATE_HOSTS", "false").lower() in ("1", "true", "yes")
+    )
     
     # Output Configuration
     OUTPUT_DIR: str = os.getenv("OUTPUT_DIR", "reports")
+    # SQLite report index with full-text search and per-company history (empty disables)
+    REPORT_DB: str = os.getenv("REPORT_DB", os.path.join(OUTPUT_DIR, "reports.db"))
+    # Compressed store of raw tool observations (search results, yfinance payloads) per run
+    EVIDENCE_DIR: str = os.getenv("EVIDENCE_DIR", os.path.join(OUTPUT_DIR, "evidence"))
+    # Reuse stored observations from earlier runs younger than this (0 disables cross-run reuse)
+    EVIDENCE_REUSE_SECONDS: int = int(os.getenv("EVIDENCE_REUSE_SECONDS", "0"))
+    # Columnar dataset with one summary row per investigation (empty disables)
+    PORTFOLIO_DIR: str = os.getenv("PORTFOLIO_DIR", os.path.join(OUTPUT_DIR, "portfolio"))
+    # "parquet" or "csv"; empty picks Parquet when pyarrow is installed
+    PORTFOLIO_FORMAT: str = os.getenv("PORTFOLIO_FORMAT", "")
+    # Part files accumulated before they are compacted into one
+    PORTFOLIO_COMPACT_PARTS: int = int(os.getenv("PORTFOLIO_COMPACT_PARTS", "64"))
+    
+    # Upstream Circuit Breaker Configuration (DDGS, yfinance)
+    CIRCUIT_BREAKER_ENABLED: bool = (
+        os.getenv("CIRCUIT_BREAKER_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+    # Failure rate within the window that opens a circuit
+    CIRCUIT_FAILURE_RATE: float = float(os.getenv("CIRCUIT_FAILURE_RATE", "0.5"))
+    # Calls needed in the window before the failure rate is evaluated
+    CIRCUIT_MIN_CALLS: int = int(os.getenv("CIRCUIT_MIN_CALLS", "6"))
+    # Sliding window of recorded call outcomes, in seconds
+    CIRCUIT_WINDOW_SECONDS: float = float(os.getenv("CIRCUIT_WINDOW_SECONDS", "60"))
+    # How long an open circuit fails fast before a trial call is allowed
+    CIRCUIT_OPEN_SECONDS: float = float(os.getenv("CIRCUIT_OPEN_SECONDS", "60"))
+    
+    # HTTP Service Configuration (python service.py)
+    SERVICE_HOST: str = os.getenv("SERVICE_HOST", "127.0.0.1")
+    SERVICE_PORT: int = int(os.getenv("SERVICE_PORT", "8080"))
+    # Concurrent investigations run by the service
+    SERVICE_WORKERS: int = int(os.getenv("SERVICE_WORKERS", "4"))
+    # Jobs allowed to wait for a worker before submissions are rejected with 429
+    SERVICE_MAX_QUEUE: int = int(os.getenv("SERVICE_MAX_QUEUE", "32"))
+    # Retry-After seconds sent with 429 responses
+    SERVICE_RETRY_AFTER: int = int(os.getenv("SERVICE_RETRY_AFTER", "30"))
+    # Finished jobs kept in memory for status and report lookups
+    SERVICE_JOB_RETENTION: int = int(os.getenv("SERVICE_JOB_RETENTION", "1000"))
+    # Bearer token required on every request (empty disables authentication)
+    SERVICE_API_TOKEN: str = os.getenv("SERVICE_API_TOKEN", "")
+    
+    # Sanctions/PEP Screening Configuration
+    # Directory of consolidated list files (OFAC SDN / UN XML, CSV); empty disables screening
+    SANCTIONS_DIR: str = os.getenv("SANCTIONS_DIR", os.path.join("data", "sanctions"))
+    # Minimum name similarity (0-1) reported as a possible match
+    SANCTIONS_MIN_SCORE: float = float(os.getenv("SANCTIONS_MIN_SCORE", "0.75"))
+    # Minimum seconds between checks of the list files for changes
+    SANCTIONS_RELOAD_SECONDS: float = float(os.getenv("SANCTIONS_RELOAD_SECONDS", "30"))
+    
+    # Director Network Configuration
+    # Registry officer dump (CSV: company, officer, optional company_id, officer_id, address)
+    REGISTRY_OFFICERS_PATH: str = os.getenv(
+        "REGISTRY_OFFICERS_PATH", os.path.join("data", "registry", "officers.csv")
+    )
+    # Board seats from which an officer is flagged as a possible nominee director
+    NOMINEE_DIRECTOR_THRESHOLD: int = int(os.getenv("NOMINEE_DIRECTOR_THRESHOLD", "20"))
+    
+    # Pre-warmed Worker Pool Configuration (--pool)
+    # Worker processes when no explicit worker count is given
+    WORKER_POOL_SIZE: int = int(os.getenv("WORKER_POOL_SIZE", "4"))
+    # Investigations per worker process before it is replaced (0 = never)
+    WORKER_MAX_JOBS: int = int(os.getenv("WORKER_MAX_JOBS", "20"))
+    
+    # Investigation Deadline Configuration
+    # Time budget per investigation in seconds; 0 disables the deadline
+    INVESTIGATION_DEADLINE_SECONDS: int = int(os.getenv("INVESTIGATION_DEADLINE_SECONDS", "0"))
+    
+    # Context Compaction Configuration (long ReAct loops)
+    CONTEXT_COMPACTION_ENABLED: bool = (
+        os.getenv("CONTEXT_COMPACTION_ENABLED", "true").lower() in ("1", "true", "yes")
+    )
+    # Estimated prompt tokens above which older tool observations are summarized
+    CONTEXT_MAX_TOKENS: int = int(os.getenv("CONTEXT_MAX_TOKENS", "6000"))
+    # Most recent tool observations always kept verbatim
+    CONTEXT_KEEP_RECENT: int = int(os.getenv("CONTEXT_KEEP_RECENT", "2"))
+    
+    # Watchlist Scheduler Configuration
+    WATCHLIST_DB: str = os.getenv("WATCHLIST_DB", os.path.join(OUTPUT_DIR, "watchlist.db"))
+    SCHEDULER_WORKERS: int = int(os.getenv("SCHEDULER_WORKERS", "2"))
+    SCHEDULER_RUNS_PER_HOUR: float = float(os.getenv("SCHEDULER_RUNS_PER_HOUR", "12"))
+    # Risk-weighted staleness before a company is re-screened (LOW risk waits this long)
+    SCHEDULER_MIN_INTERVAL_HOURS: float = float(os.getenv("SCHEDULER_MIN_INTERVAL_HOURS", "168"))
+    SCHEDULER_POLL_SECONDS: float = float(os.getenv("SCHEDULER_POLL_SECONDS", "30"))
+    
+    # Metrics Configuration
+    METRICS_PROM_FILE: Optional[str] = os.getenv("METRICS_PROM_FILE")
+    
+    # Tracing Configuration (local JSONL span file; disabled when unset)
+    TRACE_FILE: Optional[str] = os.getenv("TRACE_FILE")
     
     @classmethod
     def validate(cls) -> None:
@@ -36,10 +179,50 @@ class Config:
             )
     
     @classmethod
-    def get_output_path(cls, company_name: str) -> str:
+    def get_output_path(cls, company_name: str, output_dir: Optional[str] = None) -> str:
         """Generate output file path for a company report."""
-        os.makedirs(cls.OUTPUT_DIR, exist_ok=True)
+        output_dir = output_dir or cls.OUTPUT_DIR
+        os.makedirs(output_dir, exist_ok=True)
         # Sanitize company name for filename
         safe_name = "".join(c for c in company_name if c.isalnum() or c in (' ', '-', '_')).strip()
         safe_name = safe_name.replace(' ', '_')
-        return os.path.join(cls.OUTPUT_DIR, f"{safe_name}_Forensic_Report.md")
+        return os.path.join(output_dir, f"{safe_name}_Forensic_Report.md")
+
+
+@dataclass(frozen=True)
+class RunSettings:
+    """
+    Immutable settings for a single investigation.
+    
+    ``Config`` only supplies the defaults; each run carries its own copy so
+    concurrent investigations with different settings never see each other's
+    values.
+    """
+    
+    model_name: str = field(default_factory=lambda: Config.OPENAI_MODEL_NAME)
+    temperature: float = field(default_factory=lambda: Config.OPENAI_TEMPERATURE)
+    search_max_results: int = field(default_factory=lambda: Config.SEARCH_MAX_RESULTS)
+    search_region: str = field(default_factory=lambda: Config.SEARCH_REGION)
+    search_safesearch: str = field(default_factory=lambda: Config.SEARCH_SAFESEARCH)
+    output_dir: str = field(default_factory=lambda: Config.OUTPUT_DIR)
+    research_model: str = field(default_factory=lambda: Config.MODEL_ROUTE_RESEARCH)
+    shariah_model: str = field(default_factory=lambda: Config.MODEL_ROUTE_SHARIAH)
+    synthesis_model: str = field(default_factory=lambda: Config.MODEL_ROUTE_SYNTHESIS)
+    function_calling_model: str = field(default_factory=lambda: Config.MODEL_ROUTE_FUNCTION_CALLING)
+    
+    def model_for(self, route: str) -> str:
+        """
+        Model serving a route (``research``, ``shariah``, ``synthesis`` or ``function_calling``).
+        
+        Unset routes fall back to ``model_name``; an unset function-calling
+        route returns an empty string, meaning the agent's own model is used.
+        """
+        routed = getattr(self, f"{route}_model", "")
+        if routed or route == "function_calling":
+            return routed
+        return self.model_name
+    
+    @property
+    def separate_synthesis(self) -> bool:
+        """Whether the final report is written by a different model than the research steps."""
+        return self.model_for("synthesis") != self.model_for("research")
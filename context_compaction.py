@@ -0,0 +1,243 @@
+"""Context compaction for long ReAct loops.
+
+Every step of a CrewAI agent resends the whole conversation, including the raw
+output of every earlier tool call, so prompt size and per-step latency grow
+with the number of iterations and long investigations can overflow the context
+window. Before each LLM call this module checks the estimated prompt size and,
+once it exceeds ``Config.CONTEXT_MAX_TOKENS``, replaces the oldest tool
+observations with compact structured summaries: result titles and URLs,
+red-flag terms, and the snippet sentences that mention the company under
+investigation or a red-flag term (addresses, directors, "shared by 400
+firms"), so the final report can still cite them. The most recent
+observations are always kept verbatim.
+
+Compaction edits the executor's message list in place, so a summarized
+observation stays summarized for the rest of the run.
+"""
+import re
+from typing import Any, Dict, List, Optional
+
+import metrics
+from config import Config
+from logger import current_context, setup_logger
+from red_flags import find_red_flags
+from sanctions import normalize_tokens
+
+logger = setup_logger()
+
+# Rough characters-per-token ratio for English prompts
+CHARS_PER_TOKEN = 4
+
+# Separator CrewAI puts between an agent action and its tool result
+OBSERVATION_MARKER = "\nObservation:"
+
+# Prefix identifying an observation that was already compacted
+COMPACTED_PREFIX = "[Compacted observation"
+
+# Titles/URLs listed per compacted observation
+MAX_SUMMARY_ITEMS = 8
+
+# Key sentences kept per result, and overall when the observation has no results
+MAX_FACTS_PER_ITEM = 2
+MAX_FACTS = 6
+
+# Characters kept of each key sentence
+MAX_FACT_CHARS = 200
+
+_URL_RE = re.compile(r"https?://[^\s)\]>\"']+")
+_SEARCH_HEADER_RE = re.compile(r"^Search:\s*(.+)$", re.MULTILINE)
+# Search results and fetched pages are numbered blocks ("Result 1:", "Page 2:")
+_BLOCK_RE = re.compile(r"^(?=(?:Result|Page) \d+:)", re.MULTILINE)
+_TITLE_RE = re.compile(r"^Title:\s*(.+?)\s*$", re.MULTILINE)
+_BLOCK_URL_RE = re.compile(r"^URL:\s*(\S+)", re.MULTILINE)
+# Lines of a block that carry no facts of their own
+_LABEL_RE = re.compile(
+    r"^(?:(?:Result|Page) \d+:|Title:.*|URL:.*|Description:|Content[^:\n]*:)", re.MULTILINE
+)
+_SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+
+def estimate_tokens(messages: List[Dict[str, Any]]) -> int:
+    """Estimate the prompt size of a message list in tokens."""
+    return sum(len(str(m.get("content") or "")) for m in messages) // CHARS_PER_TOKEN
+
+
+def key_sentences(text: str, subject: Optional[str] = None, limit: int = MAX_FACTS) -> List[str]:
+    """
+    Pick the sentences of a snippet that mention the subject or a red-flag term.
+
+    Args:
+        text: Snippet or page text
+        subject: Company under investigation (matched ignoring case and legal suffixes)
+        limit: Maximum sentences returned
+
+    Returns:
+        Matching sentences in order, each truncated to ``MAX_FACT_CHARS``
+    """
+    subject_tokens = set(normalize_tokens(subject)) if subject else set()
+    facts = []
+    for sentence in _SENTENCE_RE.split(" ".join(text.split())):
+        if len(facts) >= limit:
+            break
+        mentions_subject = (
+            bool(subject_tokens) and subject_tokens <= set(normalize_tokens(sentence))
+        )
+        if mentions_subject or find_red_flags(sentence):
+            if len(sentence) > MAX_FACT_CHARS:
+                sentence = sentence[:MAX_FACT_CHARS].rstrip() + " …"
+            facts.append(sentence)
+    return facts
+
+
+def summarize_observation(text: str, subject: Optional[str] = None) -> str:
+    """
+    Reduce a raw tool observation to its key facts.
+
+    Args:
+        text: Tool output, typically formatted search results or fetched pages
+        subject: Company under investigation, whose mentions are kept
+
+    Returns:
+        Short summary listing the searches, red-flag terms and result titles with
+        URLs, each with its key snippet sentences
+    """
+    lines = [f"{COMPACTED_PREFIX}: {len(text):,} chars summarized]"]
+
+    searches = _SEARCH_HEADER_RE.findall(text)
+    if searches:
+        lines.append("Searches: " + "; ".join(s.strip() for s in searches))
+
+    flags = find_red_flags(text)
+    if flags:
+        lines.append(
+            "Red flags: "
+            + ", ".join(f"{term} ({count})" for term, count in flags.most_common(8))
+        )
+
+    items = []
+    for block in _BLOCK_RE.split(text):
+        title, url = _TITLE_RE.search(block), _BLOCK_URL_RE.search(block)
+        if title and url:
+            items.append((title.group(1), url.group(1), _LABEL_RE.sub(" ", block)))
+    if items:
+        lines.append(f"Results ({len(items)}):")
+        for title, url, body in items[:MAX_SUMMARY_ITEMS]:
+            lines.append(f"- {title} <{url}>")
+            lines.extend(f"  > {fact}" for fact in key_sentences(body, subject, MAX_FACTS_PER_ITEM))
+        if len(items) > MAX_SUMMARY_ITEMS:
+            lines.append(f"- ... {len(items) - MAX_SUMMARY_ITEMS} more")
+    else:
+        urls = list(dict.fromkeys(_URL_RE.findall(text)))
+        facts = key_sentences(text, subject)
+        if urls:
+            lines.append("URLs: " + " ".join(urls[:MAX_SUMMARY_ITEMS]))
+        lines.extend(f"> {fact}" for fact in facts)
+        if not urls and not facts:
+            # Nothing structured to keep (e.g. an error message): keep its start
+            lines.append(" ".join(text.split())[:200])
+    return "\n".join(lines)
+
+
+def _split_observation(message: Dict[str, Any]) -> Optional[tuple]:
+    """Return (prefix, observation) for a message carrying a tool result, else None."""
+    content = message.get("content")
+    if not isinstance(content, str):
+        return None
+    if message.get("role") == "tool":
+        return "", content
+    if message.get("role") != "assistant" or OBSERVATION_MARKER not in content:
+        return None
+    prefix, observation = content.rsplit(OBSERVATION_MARKER, 1)
+    return prefix + OBSERVATION_MARKER + " ", observation.strip()
+
+
+def compact_messages(
+    messages: List[Dict[str, Any]],
+    max_tokens: Optional[int] = None,
+    keep_recent: Optional[int] = None,
+    subject: Optional[str] = None
+) -> int:
+    """
+    Summarize the oldest tool observations in place until the prompt fits.
+
+    Args:
+        messages: Conversation sent to the LLM (modified in place)
+        max_tokens: Estimated prompt size above which to compact
+        keep_recent: Number of most recent observations never compacted
+        subject: Company under investigation, whose mentions are kept
+
+    Returns:
+        Number of observations compacted
+    """
+    max_tokens = max_tokens or Config.CONTEXT_MAX_TOKENS
+    keep_recent = Config.CONTEXT_KEEP_RECENT if keep_recent is None else keep_recent
+    total = estimate_tokens(messages)
+    if total <= max_tokens:
+        return 0
+
+    candidates = [i for i, m in enumerate(messages) if _split_observation(m) is not None]
+    if keep_recent:
+        candidates = candidates[:-keep_recent]
+
+    compacted = 0
+    for index in candidates:
+        prefix, observation = _split_observation(messages[index])
+        if observation.startswith(COMPACTED_PREFIX):
+            continue
+        summary = summarize_observation(observation, subject)
+        if len(summary) >= len(observation):
+            continue
+        before = len(messages[index]["content"])
+        messages[index]["content"] = prefix + summary
+        total -= (before - len(messages[index]["content"])) // CHARS_PER_TOKEN
+        compacted += 1
+        if total <= max_tokens:
+            break
+    return compacted
+
+
+def _before_llm_call(context: Any) -> None:
+    """CrewAI ``before_llm_call`` hook compacting the executor's messages."""
+    if not Config.CONTEXT_COMPACTION_ENABLED:
+        return None
+    messages = getattr(context, "messages", None)
+    if not messages:
+        return None
+    role = getattr(getattr(context, "agent", None), "role", None) or "agent"
+    registry = metrics.current()
+    before = estimate_tokens(messages)
+    # The company of the active run, set by ``run_investigation``'s log context
+    compacted = compact_messages(messages, subject=current_context().get("company"))
+    after = estimate_tokens(messages) if compacted else before
+    if compacted:
+        registry.increment("context_compactions_total", compacted, agent=role)
+        registry.increment("context_tokens_saved_total", before - after, agent=role)
+        logger.debug(
+            "Compacted %d tool observations for %s at iteration %s (~%d -> ~%d tokens)",
+            compacted, role, getattr(context, "iterations", "?"), before, after
+        )
+    registry.set_gauge("context_tokens_estimate", after, agent=role)
+    return None
+
+
+_installed = False
+
+
+def install() -> bool:
+    """
+    Register the compaction hook with CrewAI (idempotent).
+
+    Returns:
+        True if the hook is registered
+    """
+    global _installed
+    if _installed:
+        return True
+    try:
+        from crewai.hooks import register_before_llm_call_hook
+    except ImportError:
+        logger.debug("CrewAI LLM hooks not available; context compaction disabled")
+        return False
+    register_before_llm_call_hook(_before_llm_call)
+    _installed = True
+    return True
@@ -0,0 +1,175 @@
+"""Per-investigation deadlines for Ghost Office Hunter.
+
+A ``Deadline`` is activated for the duration of a run and propagated through a
+context variable into every tool call, so searches, page fetches and yfinance
+lookups see the remaining time budget. Blocking upstream calls are run under
+``call`` so the caller stops waiting once the deadline passes, retry sleeps are
+cut short, and ``run_within`` bounds the whole crew kickoff.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional, TypeVar
+
+import metrics
+from logger import setup_logger
+
+logger = setup_logger()
+
+T = TypeVar("T")
+
+
+class DeadlineExceeded(Exception):
+    """Raised when an operation cannot finish before the investigation deadline."""
+
+    def __init__(self, operation: str, budget: float):
+        super().__init__(f"Investigation deadline of {budget:g}s reached during {operation}")
+        self.operation = operation
+        self.budget = budget
+
+
+class Deadline:
+    """Absolute time limit for one investigation, cancellable early."""
+
+    def __init__(self, seconds: float):
+        """
+        Args:
+            seconds: Time budget from now
+        """
+        self.budget = seconds
+        self.expires_at = time.monotonic() + seconds
+        self._cancelled = threading.Event()
+
+    def remaining(self) -> float:
+        """Seconds left (0 once expired or cancelled)."""
+        if self._cancelled.is_set():
+            return 0.0
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed or the run was cancelled."""
+        return self.remaining() <= 0.0
+
+    def cancel(self) -> None:
+        """Expire the deadline immediately, e.g. once the run has been abandoned."""
+        self._cancelled.set()
+
+    def check(self, operation: str) -> None:
+        """Raise DeadlineExceeded if no time is left for ``operation``."""
+        if self.expired():
+            metrics.current().increment("deadline_exceeded_total", operation=operation)
+            raise DeadlineExceeded(operation, self.budget)
+
+
+_current: contextvars.ContextVar[Optional[Deadline]] = contextvars.ContextVar(
+    "ghost_hunter_deadline", default=None
+)
+
+
+def current() -> Optional[Deadline]:
+    """Return the deadline of the active run, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(deadline: Optional[Deadline]) -> Iterator[Optional[Deadline]]:
+    """Make ``deadline`` (or no deadline) apply to the enclosed block."""
+    token = _current.set(deadline)
+    try:
+        yield deadline
+    finally:
+        _current.reset(token)
+
+
+def remaining(default: Optional[float] = None) -> Optional[float]:
+    """Seconds left in the active deadline, or ``default`` if there is none."""
+    deadline = _current.get()
+    return deadline.remaining() if deadline is not None else default
+
+
+def cap(timeout: float) -> float:
+    """Limit a timeout to the time remaining in the active deadline."""
+    left = remaining()
+    return timeout if left is None else min(timeout, left)
+
+
+def check(operation: str) -> None:
+    """Raise DeadlineExceeded if the active deadline has passed."""
+    deadline = _current.get()
+    if deadline is not None:
+        deadline.check(operation)
+
+
+def sleep(seconds: float, operation: str = "sleep") -> None:
+    """Sleep, but raise DeadlineExceeded instead of sleeping past the deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        time.sleep(seconds)
+        return
+    left = deadline.remaining()
+    if seconds >= left:
+        time.sleep(left)
+        deadline.check(operation)
+        return
+    time.sleep(seconds)
+
+
+def call(func: Callable[[], T], operation: str) -> T:
+    """
+    Run a blocking call, giving up when the active deadline passes.
+
+    Without a deadline ``func`` runs inline. Otherwise it runs in a daemon
+    thread (with the caller's context) and the caller waits at most the
+    remaining time. Python cannot interrupt a blocked socket read, so an
+    abandoned call finishes in the background and its result is discarded.
+
+    Raises:
+        DeadlineExceeded: If the deadline passes before ``func`` returns
+    """
+    deadline = _current.get()
+    if deadline is None:
+        return func()
+    deadline.check(operation)
+
+    outcome: Dict[str, Any] = {}
+    context = contextvars.copy_context()
+
+    def target() -> None:
+        try:
+            outcome["value"] = context.run(func)
+        except BaseException as e:
+            outcome["error"] = e
+
+    worker = threading.Thread(target=target, name=f"deadline-{operation}", daemon=True)
+    worker.start()
+    worker.join(deadline.remaining())
+    if worker.is_alive():
+        # join() can return just before expiry, so do not rely on deadline.check()
+        logger.warning("Abandoning %s: deadline reached", operation)
+        metrics.current().increment("deadline_exceeded_total", operation=operation)
+        raise DeadlineExceeded(operation, deadline.budget)
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
+
+
+def run_within(func: Callable[[], T], operation: str) -> T:
+    """
+    Like ``call``, but also cancel the deadline when it is exceeded.
+
+    Used for the crew kickoff: once the run is abandoned, every later tool call
+    made by the still-running crew fails immediately instead of doing more work.
+    """
+    deadline = _current.get()
+    try:
+        return call(func, operation)
+    except DeadlineExceeded:
+        if deadline is not None:
+            deadline.cancel()
+        raise
+
+
+def from_seconds(seconds: Optional[float]) -> Optional[Deadline]:
+    """Build a deadline from a time budget (None or <= 0 means no deadline)."""
+    return Deadline(seconds) if seconds and seconds > 0 else None
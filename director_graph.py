@@ -0,0 +1,518 @@
+"""Director-company network graph for Ghost Office Hunter.
+
+Built from a local registry officer dump (CSV, one row per officer appointment)
+at ``REGISTRY_OFFICERS_PATH``. Expected columns are ``company`` and ``officer``,
+with optional ``company_id``, ``officer_id``, ``role`` and ``address``. Company,
+officer and address names are interned to integer ids. Appointments are stored
+as compressed sparse rows (CSR: one offsets array and one flat neighbours array
+per direction), and companies linked by a shared officer or registered address
+are merged with union-find. The component of every company and the size of
+every component are precomputed, so these queries are constant time:
+
+* how many companies does this director sit on (nominee-director signal)
+* which cluster is this company in, and how large is it
+
+The built graph is cached next to the dump (``<dump>.graph.pickle``) and
+rebuilt when the dump changes.
+
+Usage:
+    python director_graph.py stats
+    python director_graph.py company "Acme Pte Ltd"
+    python director_graph.py director "John Tan"
+    python director_graph.py batch companies.txt > profiles.csv
+"""
+import argparse
+import csv
+import pickle
+import sys
+import threading
+import time
+from array import array
+from collections import Counter
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from config import Config
+from logger import setup_logger
+from sanctions import normalize_tokens
+
+logger = setup_logger()
+
+# Bump when the pickled layout changes
+CACHE_VERSION = 1
+
+_COMPANY_COLUMNS = ("company", "company_name", "entity_name", "name")
+_COMPANY_ID_COLUMNS = ("company_id", "uen", "registration_number", "company_number")
+_OFFICER_COLUMNS = ("officer", "officer_name", "director", "director_name", "person")
+_OFFICER_ID_COLUMNS = ("officer_id", "id_number", "person_id")
+_ADDRESS_COLUMNS = ("address", "registered_address", "company_address")
+
+
+def name_key(name: str) -> str:
+    """Lookup key for a company or person name.
+
+    Case, accents, punctuation and legal suffixes are ignored.
+    """
+    return " ".join(normalize_tokens(name))
+
+
+class _Interner:
+    """Maps keys to dense integer ids, keeping a display label per id."""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+        self.labels: List[str] = []
+
+    def intern(self, key: str, label: str) -> int:
+        node = self.ids.get(key)
+        if node is None:
+            node = self.ids[key] = len(self.labels)
+            self.labels.append(label)
+        return node
+
+
+def _csr(rows: int, edges: Sequence[Tuple[int, int]]) -> Tuple[array, array]:
+    """Build CSR (offsets, neighbours) for ``rows`` source nodes from (source, target) pairs."""
+    offsets = array("l", [0]) * (rows + 1)
+    for source, _ in edges:
+        offsets[source + 1] += 1
+    for i in range(rows):
+        offsets[i + 1] += offsets[i]
+    neighbours = array("l", [0]) * len(edges)
+    cursor = array("l", offsets[:-1])
+    for source, target in edges:
+        neighbours[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, neighbours
+
+
+class _UnionFind:
+    """Union by size with path halving."""
+
+    def __init__(self, size: int):
+        self.parent = array("l", range(size))
+        self.size = array("l", [1]) * size
+
+    def find(self, node: int) -> int:
+        parent = self.parent
+        while parent[node] != node:
+            parent[node] = parent[parent[node]]
+            node = parent[node]
+        return node
+
+    def union(self, a: int, b: int) -> None:
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+
+
+@dataclass(frozen=True)
+class OfficerSummary:
+    """An officer of a company and the number of companies they sit on."""
+
+    name: str
+    companies: int
+    nominee_suspect: bool
+
+
+@dataclass(frozen=True)
+class CompanyProfile:
+    """Network facts about one company."""
+
+    company: str
+    officers: Tuple[OfficerSummary, ...]
+    address: Optional[str]
+    companies_at_address: int
+    cluster_id: int
+    cluster_size: int
+    cluster_officers: int
+
+    @property
+    def nominee_suspects(self) -> Tuple[OfficerSummary, ...]:
+        return tuple(o for o in self.officers if o.nominee_suspect)
+
+    def to_row(self) -> Dict[str, object]:
+        return {
+            "company": self.company,
+            "officers": len(self.officers),
+            "max_officer_companies": max((o.companies for o in self.officers), default=0),
+            "nominee_suspects": "; ".join(
+                f"{o.name} ({o.companies})" for o in self.nominee_suspects
+            ),
+            "companies_at_address": self.companies_at_address,
+            "cluster_id": self.cluster_id,
+            "cluster_size": self.cluster_size,
+            "cluster_officers": self.cluster_officers,
+        }
+
+
+class DirectorGraph:
+    """Compact bipartite officer-company graph with precomputed company clusters."""
+
+    def __init__(self):
+        self.companies = _Interner()
+        self.officers = _Interner()
+        self.addresses = _Interner()
+        # Company -> officers and officer -> companies (CSR)
+        self.company_offsets = array("l", [0])
+        self.company_officers = array("l")
+        self.officer_offsets = array("l", [0])
+        self.officer_companies = array("l")
+        # Registered address per company (-1 if unknown) and companies per address
+        self.company_address = array("l")
+        self.address_counts = array("l")
+        # Cluster (union-find root) per company, companies and officers per cluster root
+        self.cluster = array("l")
+        self.cluster_size = array("l")
+        self.cluster_officer_count = array("l")
+        self.officer_names: Dict[str, List[int]] = {}
+
+    # --- Building -----------------------------------------------------------------------------
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, str]]) -> "DirectorGraph":
+        """
+        Build the graph from appointment rows.
+
+        Args:
+            rows: Dicts with ``company`` and ``officer`` and optional ``company_id``,
+                ``officer_id`` and ``address`` keys
+
+        Returns:
+            The built graph
+        """
+        graph = cls()
+        edges = set()
+        addresses: Dict[int, int] = {}
+        for row in rows:
+            company = (row.get("company") or "").strip()
+            officer = (row.get("officer") or "").strip()
+            if not company or not officer:
+                continue
+            company_key = row.get("company_id") or name_key(company)
+            officer_key = row.get("officer_id") or name_key(officer)
+            if not company_key or not officer_key:
+                continue
+            company_node = graph.companies.intern(company_key, company)
+            # A company id may be shared by several spellings: also index every spelling
+            graph.companies.ids.setdefault(name_key(company), company_node)
+            officer_node = graph.officers.intern(officer_key, officer)
+            edges.add((company_node, officer_node))
+            address = (row.get("address") or "").strip()
+            if address:
+                addresses[company_node] = graph.addresses.intern(
+                    " ".join(address.lower().split()), address
+                )
+        graph._build(sorted(edges), addresses)
+        return graph
+
+    def _build(self, edges: List[Tuple[int, int]], addresses: Dict[int, int]) -> None:
+        companies, officers = len(self.companies.labels), len(self.officers.labels)
+        self.company_offsets, self.company_officers = _csr(companies, edges)
+        self.officer_offsets, self.officer_companies = _csr(officers, [(o, c) for c, o in edges])
+
+        self.company_address = array("l", [-1]) * companies
+        self.address_counts = array("l", [0]) * len(self.addresses.labels)
+        for company, address in addresses.items():
+            self.company_address[company] = address
+            self.address_counts[address] += 1
+
+        # Companies sharing an officer or a registered address end up in one cluster
+        union_find = _UnionFind(companies)
+        for officer in range(officers):
+            start, end = self.officer_offsets[officer], self.officer_offsets[officer + 1]
+            first = self.officer_companies[start] if end > start else None
+            for i in range(start + 1, end):
+                union_find.union(first, self.officer_companies[i])
+        first_at_address: Dict[int, int] = {}
+        for company, address in addresses.items():
+            union_find.union(first_at_address.setdefault(address, company), company)
+
+        self.cluster = array("l", (union_find.find(c) for c in range(companies)))
+        self.cluster_size = array("l", [0]) * companies
+        for root in self.cluster:
+            self.cluster_size[root] += 1
+        self.cluster_officer_count = array("l", [0]) * companies
+        for officer in range(officers):
+            start = self.officer_offsets[officer]
+            if self.officer_offsets[officer + 1] > start:
+                self.cluster_officer_count[self.cluster[self.officer_companies[start]]] += 1
+
+        # Officers keyed by id can share a name: keep every id per name for lookups
+        self.officer_names = {}
+        for node, label in enumerate(self.officers.labels):
+            self.officer_names.setdefault(name_key(label), []).append(node)
+
+    # --- Queries ------------------------------------------------------------------------------
+
+    def _company(self, name: str) -> Optional[int]:
+        node = self.companies.ids.get(name.strip())
+        return node if node is not None else self.companies.ids.get(name_key(name))
+
+    def _officer_nodes(self, name: str) -> List[int]:
+        node = self.officers.ids.get(name.strip())
+        return [node] if node is not None else self.officer_names.get(name_key(name), [])
+
+    def officer_degree(self, node: int) -> int:
+        """Number of companies an officer sits on."""
+        return self.officer_offsets[node + 1] - self.officer_offsets[node]
+
+    def director_company_count(self, name: str) -> int:
+        """Companies on which a director (by name or officer id) sits; 0 if unknown."""
+        return max((self.officer_degree(node) for node in self._officer_nodes(name)), default=0)
+
+    def director_companies(self, name: str, limit: int = 50) -> List[str]:
+        """Names of the companies of a director (the best-connected officer of that name)."""
+        nodes = self._officer_nodes(name)
+        if not nodes:
+            return []
+        node = max(nodes, key=self.officer_degree)
+        start, end = self.officer_offsets[node], self.officer_offsets[node + 1]
+        return [
+            self.companies.labels[c]
+            for c in self.officer_companies[start:min(end, start + limit)]
+        ]
+
+    def cluster_of(self, company: str) -> Optional[Tuple[int, int]]:
+        """(cluster id, number of companies in it) for a company, or None if unknown."""
+        node = self._company(company)
+        if node is None:
+            return None
+        root = self.cluster[node]
+        return root, self.cluster_size[root]
+
+    def company_profile(
+        self, company: str, nominee_threshold: Optional[int] = None
+    ) -> Optional[CompanyProfile]:
+        """
+        Officers, address sharing and cluster of a company.
+
+        Args:
+            company: Company name or registry id
+            nominee_threshold: Board seats from which an officer is a nominee suspect
+                (default ``Config.NOMINEE_DIRECTOR_THRESHOLD``)
+
+        Returns:
+            The profile, or None if the company is not in the dump
+        """
+        node = self._company(company)
+        if node is None:
+            return None
+        threshold = nominee_threshold or Config.NOMINEE_DIRECTOR_THRESHOLD
+        start, end = self.company_offsets[node], self.company_offsets[node + 1]
+        officers = sorted(
+            (
+                OfficerSummary(
+                    self.officers.labels[o], self.officer_degree(o),
+                    self.officer_degree(o) >= threshold
+                )
+                for o in self.company_officers[start:end]
+            ),
+            key=lambda o: o.companies,
+            reverse=True
+        )
+        address = self.company_address[node]
+        root = self.cluster[node]
+        return CompanyProfile(
+            company=self.companies.labels[node],
+            officers=tuple(officers),
+            address=self.addresses.labels[address] if address >= 0 else None,
+            companies_at_address=self.address_counts[address] if address >= 0 else 0,
+            cluster_id=root,
+            cluster_size=self.cluster_size[root],
+            cluster_officers=self.cluster_officer_count[root],
+        )
+
+    def batch_profiles(self, companies: Iterable[str]) -> Dict[str, Optional[CompanyProfile]]:
+        """Profiles for many companies (None for companies not in the dump)."""
+        return {company: self.company_profile(company) for company in dict.fromkeys(companies)}
+
+    def top_directors(self, limit: int = 20) -> List[Tuple[str, int]]:
+        """Officers with the most board seats."""
+        degrees = Counter(
+            {node: self.officer_degree(node) for node in range(len(self.officers.labels))}
+        )
+        return [(self.officers.labels[node], seats) for node, seats in degrees.most_common(limit)]
+
+    def stats(self) -> Dict[str, int]:
+        """Node, edge and cluster counts."""
+        roots = {root for root in self.cluster}
+        return {
+            "companies": len(self.companies.labels),
+            "officers": len(self.officers.labels),
+            "addresses": len(self.addresses.labels),
+            "appointments": len(self.company_officers),
+            "clusters": len(roots),
+            "largest_cluster": max(self.cluster_size, default=0),
+        }
+
+
+# --- Loading ----------------------------------------------------------------------------------
+
+def _column(header: Dict[str, int], candidates: Tuple[str, ...]) -> Optional[int]:
+    return next((header[c] for c in candidates if c in header), None)
+
+
+def read_officer_dump(path: Path) -> Iterable[Dict[str, str]]:
+    """Yield normalized appointment rows from an officer CSV dump."""
+    with open(path, "r", encoding="utf-8-sig", newline="") as f:
+        reader = csv.reader(f)
+        header = {h.strip().lower(): i for i, h in enumerate(next(reader, []))}
+        columns = {
+            "company": _column(header, _COMPANY_COLUMNS),
+            "company_id": _column(header, _COMPANY_ID_COLUMNS),
+            "officer": _column(header, _OFFICER_COLUMNS),
+            "officer_id": _column(header, _OFFICER_ID_COLUMNS),
+            "address": _column(header, _ADDRESS_COLUMNS),
+        }
+        if columns["company"] is None or columns["officer"] is None:
+            raise ValueError(f"{path} needs 'company' and 'officer' columns")
+        for row in reader:
+            yield {
+                key: row[i].strip() if i is not None and i < len(row) else ""
+                for key, i in columns.items()
+            }
+
+
+def load_graph(path: str) -> DirectorGraph:
+    """
+    Load the graph for an officer dump, using the pickled build if it is current.
+
+    Args:
+        path: Path of the officer CSV dump
+
+    Returns:
+        The built graph
+    """
+    dump = Path(path)
+    stat = dump.stat()
+    signature = (CACHE_VERSION, stat.st_mtime_ns, stat.st_size)
+    cache = dump.with_name(dump.name + ".graph.pickle")
+    try:
+        with open(cache, "rb") as f:
+            cached_signature, graph = pickle.load(f)
+        if cached_signature == signature:
+            return graph
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        pass
+
+    start = time.perf_counter()
+    graph = DirectorGraph.from_rows(read_officer_dump(dump))
+    logger.info(
+        "Built director graph from %s in %.1fs: %s",
+        dump.name, time.perf_counter() - start, graph.stats()
+    )
+    try:
+        tmp = cache.with_name(cache.name + ".tmp")
+        with open(tmp, "wb") as f:
+            pickle.dump((signature, graph), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp.replace(cache)
+    except OSError as e:
+        logger.warning("Could not cache director graph: %s", e)
+    return graph
+
+
+_graphs: Dict[str, Tuple[Tuple[int, int], DirectorGraph]] = {}
+_graphs_lock = threading.Lock()
+
+
+def get_graph(path: Optional[str] = None) -> Optional[DirectorGraph]:
+    """
+    Return the shared graph for ``path`` (default ``Config.REGISTRY_OFFICERS_PATH``).
+
+    The graph is rebuilt when the dump file changes.
+
+    Returns:
+        DirectorGraph, or None if no officer dump is configured or present
+    """
+    path = path or Config.REGISTRY_OFFICERS_PATH
+    if not path or not Path(path).is_file():
+        return None
+    stat = Path(path).stat()
+    signature = (stat.st_mtime_ns, stat.st_size)
+    with _graphs_lock:
+        cached = _graphs.get(path)
+        if cached is None or cached[0] != signature:
+            try:
+                cached = _graphs[path] = (signature, load_graph(path))
+            except (OSError, ValueError, csv.Error) as e:
+                logger.warning("Could not load officer dump %s: %s", path, e)
+                return None
+        return cached[1]
+
+
+def format_profile(profile: CompanyProfile) -> str:
+    """Render a company's network profile for the agent."""
+    lines = [f"Company: {profile.company}"]
+    if profile.address:
+        lines.append(
+            f"Registered address: {profile.address} "
+            f"(shared by {profile.companies_at_address} companies)"
+        )
+    lines.append(f"Officers ({len(profile.officers)}):")
+    for officer in profile.officers[:20]:
+        marker = "  <-- possible nominee director" if officer.nominee_suspect else ""
+        lines.append(f"  - {officer.name}: sits on {officer.companies} companies{marker}")
+    lines.append(
+        f"Network cluster #{profile.cluster_id}: {profile.cluster_size} companies and "
+        f"{profile.cluster_officers} officers linked through shared officers or addresses"
+    )
+    return "\n".join(lines)
+
+
+def main() -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Ghost Office Hunter director-company network")
+    parser.add_argument(
+        "--dump", default=None, help="Officer CSV dump (default: REGISTRY_OFFICERS_PATH)"
+    )
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("stats", help="Show graph size and the best-connected directors")
+    company = sub.add_parser("company", help="Show a company's officers, address and cluster")
+    company.add_argument("name")
+    director = sub.add_parser("director", help="Show the companies of a director")
+    director.add_argument("name")
+    batch = sub.add_parser("batch", help="Write network profiles for one company per line as CSV")
+    batch.add_argument("file", nargs="?", default="-")
+    args = parser.parse_args()
+
+    graph = get_graph(args.dump)
+    if graph is None:
+        print("No officer dump found (set REGISTRY_OFFICERS_PATH)", file=sys.stderr)
+        return 1
+
+    if args.command == "stats":
+        for key, value in graph.stats().items():
+            print(f"{key}: {value}")
+        for name, seats in graph.top_directors(10):
+            print(f"  {name}: {seats} companies")
+    elif args.command == "company":
+        profile = graph.company_profile(args.name)
+        print(format_profile(profile) if profile else f"{args.name} is not in the officer dump")
+        return 0 if profile else 1
+    elif args.command == "director":
+        count = graph.director_company_count(args.name)
+        print(f"{args.name}: {count} companies")
+        for name in graph.director_companies(args.name):
+            print(f"  - {name}")
+    else:
+        source = sys.stdin if args.file == "-" else open(args.file, "r", encoding="utf-8")
+        with source:
+            names = [line.strip() for line in source if line.strip() and not line.startswith("#")]
+        writer = csv.DictWriter(sys.stdout, fieldnames=[
+            "query", "company", "officers", "max_officer_companies", "nominee_suspects",
+            "companies_at_address", "cluster_id", "cluster_size", "cluster_officers"
+        ])
+        writer.writeheader()
+        for name, profile in graph.batch_profiles(names).items():
+            writer.writerow({"query": name, **(profile.to_row() if profile else {})})
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,542 @@
+"""Evidence capture and storage for Ghost Office Hunter.
+
+Every raw tool observation (DDGS result lists, yfinance payloads, fetched pages) gathered
+during a run is persisted in a compact, append-only evidence store:
+
+* payloads are serialized as canonical JSON, deduplicated by SHA-256 content
+  hash and written once as individually compressed frames (zstd when the
+  optional ``zstandard`` package is installed, zlib otherwise) to segment files;
+* an SQLite index maps hashes to (segment, offset, length) and records which
+  run and company observed which payload, through which tool and input.
+
+Stored evidence lets reruns and other agents reuse observations without
+refetching, lets reports be audited without repeating the searches, and is the
+baseline a delta re-investigation diffs against.
+"""
+import contextvars
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import metrics
+from config import Config
+from logger import setup_logger
+from report_store import company_key
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - optional dependency
+    zstandard = None
+
+logger = setup_logger()
+
+SEARCH_TOOL = "ddgs.text"
+FINANCE_TOOL = "yfinance.info"
+PAGE_TOOL = "http.page"
+SANCTIONS_TOOL = "sanctions.screen"
+REGISTRY_TOOL = "registry.network"
+
+# Start a new segment file once the current one reaches this size
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+
+# Query parameters that never change page content
+_TRACKING_PARAMS = re.compile(
+    r"^(utm_.*|fbclid|gclid|mc_cid|mc_eid|ref|ref_src|igshid|spm)$", re.IGNORECASE
+)
+
+
+def canonical_url(url: str) -> str:
+    """
+    Normalize a URL so the same page found via different queries compares equal.
+
+    Lowercases scheme and host, drops ``www.``, default ports, fragments,
+    tracking parameters and trailing slashes, and sorts the query string.
+    """
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or "").lower()
+    if host.startswith("www."):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f"{host}:{parts.port}"
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(k)
+    ))
+    path = parts.path.rstrip("/") or "/"
+    scheme = "https" if parts.scheme.lower() in ("http", "https") else parts.scheme.lower()
+    return urlunsplit((scheme, host, path, query, ""))
+
+
+def content_hash(*parts: str) -> str:
+    """Short hash of whitespace-normalized text, used to detect changed content."""
+    normalized = "\n".join(" ".join(p.split()) for p in parts)
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()[:16]
+
+
+def _canonical_json(payload: Any) -> bytes:
+    return json.dumps(
+        payload, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+@dataclass(frozen=True)
+class EvidenceItem:
+    """One search result observed during an investigation."""
+
+    url: str
+    canonical_url: str
+    title: str
+    snippet: str
+    query: str
+    content_hash: str
+
+    @classmethod
+    def from_search_result(cls, query: str, result: Dict[str, Any]) -> Optional["EvidenceItem"]:
+        """Build an item from a DDGS result dict (None if it has no URL)."""
+        url = str(result.get("href") or result.get("url") or "").strip()
+        if not url:
+            return None
+        title = str(result.get("title") or "")
+        snippet = str(result.get("body") or "")
+        return cls(
+            url=url,
+            canonical_url=canonical_url(url),
+            title=title,
+            snippet=snippet,
+            query=query,
+            content_hash=content_hash(title, snippet)
+        )
+
+
+def items_from_search(query: str, results: List[Any]) -> List[EvidenceItem]:
+    """Convert raw DDGS results into evidence items, skipping results without a URL."""
+    items = (EvidenceItem.from_search_result(query, r) for r in results if isinstance(r, dict))
+    return [item for item in items if item is not None]
+
+
+@dataclass
+class EvidenceSet:
+    """All search evidence gathered by one run."""
+
+    run_id: str
+    company: str
+    created_at: float
+    queries: List[str]
+    items: List[EvidenceItem]
+
+    def by_url(self) -> Dict[str, EvidenceItem]:
+        """Index items by canonical URL (first occurrence wins)."""
+        index: Dict[str, EvidenceItem] = {}
+        for item in self.items:
+            index.setdefault(item.canonical_url, item)
+        return index
+
+
+@dataclass(frozen=True)
+class Observation:
+    """Index entry for one stored tool observation."""
+
+    run_id: str
+    company: str
+    tool: str
+    input: str
+    hash: str
+    observed_at: float
+
+
+_INDEX_SCHEMA = """
+CREATE TABLE IF NOT EXISTS objects (
+    hash TEXT PRIMARY KEY,
+    segment TEXT NOT NULL,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL,
+    raw_size INTEGER NOT NULL,
+    codec TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS observations (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    tool TEXT NOT NULL,
+    input TEXT NOT NULL,
+    hash TEXT NOT NULL REFERENCES objects (hash),
+    observed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_observations_run ON observations (run_id);
+CREATE INDEX IF NOT EXISTS idx_observations_company ON observations (company_key, observed_at DESC);
+CREATE INDEX IF NOT EXISTS idx_observations_lookup ON observations (tool, input, observed_at DESC);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    completed_at REAL NOT NULL,
+    queries_json TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_runs_company ON runs (company_key, created_at DESC);
+"""
+
+
+class EvidenceStore:
+    """Content-addressed, compressed, append-only store of tool observations."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding the segment files and the SQLite index
+        """
+        self.root = Path(root)
+        self.segments_dir = self.root / "segments"
+        self.segments_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.root / "index.db"
+        self._lock = threading.Lock()
+        self._segment: Optional[Path] = None
+        self._compressor = zstandard.ZstdCompressor(level=10) if zstandard else None
+        self._decompressor = zstandard.ZstdDecompressor() if zstandard else None
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_INDEX_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.index_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def _compress(self, data: bytes) -> Tuple[bytes, str]:
+        if self._compressor is not None:
+            return self._compressor.compress(data), "zstd"
+        return zlib.compress(data, 9), "zlib"
+
+    def _decompress(self, data: bytes, codec: str) -> bytes:
+        if codec == "zstd":
+            if self._decompressor is None:
+                raise RuntimeError("Evidence was written with zstd; install 'zstandard' to read it")
+            return self._decompressor.decompress(data)
+        return zlib.decompress(data)
+
+    def _current_segment(self) -> Path:
+        """Segment file owned by this process; rotated once it grows too large."""
+        segment = self._segment
+        if segment is None or (segment.exists() and segment.stat().st_size >= SEGMENT_MAX_BYTES):
+            name = f"{int(time.time())}-{os.getpid()}-{os.urandom(3).hex()}.seg"
+            self._segment = self.segments_dir / name
+        return self._segment
+
+    def put(self, payload: Any) -> str:
+        """
+        Store a payload once and return its content hash.
+
+        Args:
+            payload: JSON-serializable observation
+
+        Returns:
+            SHA-256 hex digest of the payload's canonical JSON
+        """
+        raw = _canonical_json(payload)
+        digest = hashlib.sha256(raw).hexdigest()
+        with self._connect() as conn:
+            if conn.execute("SELECT 1 FROM objects WHERE hash = ?", (digest,)).fetchone():
+                return digest
+            frame, codec = self._compress(raw)
+            with self._lock:
+                segment = self._current_segment()
+                with open(segment, "ab") as f:
+                    offset = f.tell()
+                    f.write(frame)
+                    f.flush()
+            conn.execute(
+                "INSERT OR IGNORE INTO objects (hash, segment, offset, length, raw_size, codec) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, segment.name, offset, len(frame), len(raw), codec)
+            )
+        return digest
+
+    def get(self, digest: str) -> Any:
+        """Load a payload by content hash (KeyError if unknown)."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT segment, offset, length, codec FROM objects WHERE hash = ?", (digest,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(digest)
+        with open(self.segments_dir / row["segment"], "rb") as f:
+            f.seek(row["offset"])
+            frame = f.read(row["length"])
+        return json.loads(self._decompress(frame, row["codec"]))
+
+    def record(self, run_id: str, company: str, tool: str, tool_input: str, payload: Any) -> str:
+        """Store a payload and index it as an observation of ``run_id``."""
+        digest = self.put(payload)
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT INTO observations "
+                "(run_id, company, company_key, tool, input, hash, observed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (run_id, company, company_key(company), tool, tool_input, digest, time.time())
+            )
+        return digest
+
+    def complete_run(
+        self, run_id: str, company: str, created_at: float, queries: List[str]
+    ) -> None:
+        """Mark a run as complete so it can serve as a delta baseline."""
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO runs "
+                "(run_id, company, company_key, created_at, completed_at, queries_json) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_id, company, company_key(company), created_at, time.time(),
+                    json.dumps(queries)
+                )
+            )
+
+    def observations(self, run_id: str, tool: Optional[str] = None) -> List[Observation]:
+        """List a run's observations in the order they were made."""
+        sql = (
+            "SELECT run_id, company, tool, input, hash, observed_at "
+            "FROM observations WHERE run_id = ?"
+        )
+        params: Tuple[Any, ...] = (run_id,)
+        if tool:
+            sql += " AND tool = ?"
+            params += (tool,)
+        with self._connect() as conn:
+            rows = conn.execute(sql + " ORDER BY id", params).fetchall()
+        return [Observation(**dict(row)) for row in rows]
+
+    def company_observations(self, company: str, limit: int = 500) -> List[Observation]:
+        """List the most recent observations made for a company across runs."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT run_id, company, tool, input, hash, observed_at FROM observations "
+                "WHERE company_key = ? ORDER BY observed_at DESC LIMIT ?",
+                (company_key(company), limit)
+            ).fetchall()
+        return [Observation(**dict(row)) for row in rows]
+
+    def latest(self, tool: str, tool_input: str, max_age: float) -> Optional[Any]:
+        """Return the newest payload for (tool, input) observed within ``max_age`` seconds."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT hash FROM observations WHERE tool = ? AND input = ? AND observed_at >= ? "
+                "ORDER BY observed_at DESC LIMIT 1",
+                (tool, tool_input, time.time() - max_age)
+            ).fetchone()
+        return self.get(row["hash"]) if row else None
+
+    def latest_run(self, company: str) -> Optional[EvidenceSet]:
+        """Rebuild the search evidence of a company's most recent completed run."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT run_id, company, created_at, queries_json FROM runs "
+                "WHERE company_key = ? ORDER BY created_at DESC LIMIT 1",
+                (company_key(company),)
+            ).fetchone()
+        if row is None:
+            return None
+        items: List[EvidenceItem] = []
+        for observation in self.observations(row["run_id"], tool=SEARCH_TOOL):
+            items.extend(items_from_search(observation.input, self.get(observation.hash)))
+        return EvidenceSet(
+            row["run_id"], row["company"], row["created_at"], json.loads(row["queries_json"]),
+            items
+        )
+
+    def stats(self) -> Dict[str, Any]:
+        """Object counts and raw vs stored sizes, for monitoring compaction."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT COUNT(*) AS objects, COALESCE(SUM(raw_size), 0) AS raw_bytes, "
+                "COALESCE(SUM(length), 0) AS stored_bytes FROM objects"
+            ).fetchone()
+            observations = conn.execute("SELECT COUNT(*) FROM observations").fetchone()[0]
+        return {**dict(row), "observations": observations}
+
+
+_stores: Dict[str, EvidenceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_evidence_store(root: Optional[str] = None) -> Optional[EvidenceStore]:
+    """
+    Return the shared store for ``root`` (default ``Config.EVIDENCE_DIR``).
+
+    Returns:
+        EvidenceStore instance, or None if evidence storage is disabled
+    """
+    root = root or Config.EVIDENCE_DIR
+    if not root:
+        return None
+    with _stores_lock:
+        store = _stores.get(root)
+        if store is None:
+            store = _stores[root] = EvidenceStore(root)
+        return store
+
+
+class EvidenceRecorder:
+    """
+    Thread-safe collector for the observations of a single run.
+
+    Observations are written to the evidence store as they happen and kept in
+    memory so other agents of the same run can reuse them without refetching.
+    """
+
+    def __init__(self, run_id: str, company: str, store: Optional[EvidenceStore] = None):
+        self.run_id = run_id
+        self.company = company
+        self.created_at = time.time()
+        self.store = store
+        self._queries: List[str] = []
+        self._items: List[EvidenceItem] = []
+        self._observed: Dict[Tuple[str, str], Any] = {}
+        self._lock = threading.Lock()
+
+    def record_observation(self, tool: str, tool_input: str, payload: Any) -> None:
+        """Record a raw tool observation."""
+        with self._lock:
+            self._observed[(tool, tool_input)] = payload
+            if tool == SEARCH_TOOL:
+                if tool_input not in self._queries:
+                    self._queries.append(tool_input)
+                self._items.extend(items_from_search(tool_input, payload))
+        if self.store is not None:
+            try:
+                self.store.record(self.run_id, self.company, tool, tool_input, payload)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Could not persist %s observation: %s", tool, e)
+
+    def record_search(self, query: str, results: List[Dict[str, Any]]) -> None:
+        """Record the raw results of one search query."""
+        self.record_observation(SEARCH_TOOL, query, results)
+
+    def lookup(self, tool: str, tool_input: str) -> Optional[Any]:
+        """Return a payload already observed in this run, if any."""
+        with self._lock:
+            return self._observed.get((tool, tool_input))
+
+    def snapshot(self) -> EvidenceSet:
+        """Return the search evidence gathered so far."""
+        with self._lock:
+            return EvidenceSet(
+                self.run_id, self.company, self.created_at, list(self._queries), list(self._items)
+            )
+
+
+def save(evidence: EvidenceSet) -> bool:
+    """
+    Mark a run's evidence as complete, making it the company's delta baseline.
+
+    Returns:
+        True if the run was recorded
+    """
+    store = get_evidence_store()
+    if store is None or not evidence.queries:
+        return False
+    store.complete_run(evidence.run_id, evidence.company, evidence.created_at, evidence.queries)
+    return True
+
+
+def load_latest(company: str) -> Optional[EvidenceSet]:
+    """Load the evidence of a company's most recent completed run."""
+    store = get_evidence_store()
+    return store.latest_run(company) if store is not None else None
+
+
+def diff(previous: EvidenceSet, current: EvidenceSet) -> List[EvidenceItem]:
+    """
+    Return evidence in ``current`` that is new or changed relative to ``previous``.
+
+    Items are matched by canonical URL; an item counts as changed when its
+    title/snippet hash differs from the previously observed one.
+    """
+    seen = previous.by_url()
+    delta = []
+    for url, item in current.by_url().items():
+        before = seen.get(url)
+        if before is None or before.content_hash != item.content_hash:
+            delta.append(item)
+    return delta
+
+
+_current: contextvars.ContextVar[Optional[EvidenceRecorder]] = contextvars.ContextVar(
+    "ghost_hunter_evidence", default=None
+)
+
+
+def current() -> Optional[EvidenceRecorder]:
+    """Return the recorder of the active run, if any."""
+    return _current.get()
+
+
+@contextmanager
+def activate(recorder: EvidenceRecorder) -> Iterator[EvidenceRecorder]:
+    """Make ``recorder`` collect tool observations for the enclosed block."""
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+def record_observation(tool: str, tool_input: str, payload: Any) -> None:
+    """Record an observation on the active run's recorder (no-op outside a run)."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.record_observation(tool, tool_input, payload)
+
+
+def record_search(query: str, results: List[Dict[str, Any]]) -> None:
+    """Record search results on the active run's recorder (no-op outside a run)."""
+    record_observation(SEARCH_TOOL, query, results)
+
+
+def reuse(tool: str, tool_input: str) -> Optional[Any]:
+    """
+    Return a previously observed payload for (tool, input), if one may be reused.
+
+    Observations from the active run are always reused; observations from
+    earlier runs are reused when younger than ``Config.EVIDENCE_REUSE_SECONDS``.
+    """
+    payload = _reuse(tool, tool_input)
+    metrics.current().record_cache("evidence", payload is not None)
+    return payload
+
+
+def _reuse(tool: str, tool_input: str) -> Optional[Any]:
+    recorder = _current.get()
+    if recorder is not None:
+        payload = recorder.lookup(tool, tool_input)
+        if payload is not None:
+            return payload
+    if Config.EVIDENCE_REUSE_SECONDS <= 0:
+        return None
+    store = recorder.store if recorder is not None else get_evidence_store()
+    if store is None:
+        return None
+    try:
+        payload = store.latest(tool, tool_input, Config.EVIDENCE_REUSE_SECONDS)
+    except (OSError, sqlite3.Error, KeyError) as e:
+        logger.warning("Could not read stored %s evidence: %s", tool, e)
+        return None
+    if payload is not None and recorder is not None:
+        # Make the reused observation part of this run's evidence as well
+        recorder.record_observation(tool, tool_input, payload)
+    return payload
@@ -0,0 +1,519 @@
+"""Concurrent web page fetching for Ghost Office Hunter.
+
+Pages are fetched concurrently over a single pooled ``httpx.AsyncClient`` with
+a global and a per-host concurrency limit, request timeouts and a cap on the
+number of bytes read. The main text is extracted with boilerplate (scripts,
+navigation, headers, footers, link lists) removed and truncated to a token
+budget. Results are cached on disk by URL and revalidated with ``ETag`` /
+``Last-Modified`` so unchanged pages are not downloaded twice.
+
+URLs come from the agent and, through search results, from arbitrary web
+pages, so every request target, including each redirect hop, must resolve to
+public addresses only: loopback, private, link-local and other non-global
+addresses are refused unless ``FETCH_ALLOW_PRIVATE_HOSTS`` is set.
+"""
+import asyncio
+import contextvars
+import hashlib
+import ipaddress
+import json
+import os
+import socket
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import asynccontextmanager
+from dataclasses import asdict, dataclass
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+import httpx
+
+import deadlines
+import evidence
+import metrics
+import tracing
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+USER_AGENT = "Mozilla/5.0 (compatible; GhostOfficeHunter/1.0; +compliance research)"
+
+# Rough token estimate used for truncation (OpenAI models average ~4 characters per token)
+CHARS_PER_TOKEN = 4
+
+_TEXT_CONTENT_TYPES = ("text/html", "application/xhtml+xml", "text/plain")
+
+# Redirects followed per page
+MAX_REDIRECTS = 5
+
+# Elements whose content is never part of the main text
+_SKIP_TAGS = {
+    "script", "style", "noscript", "template", "svg", "iframe", "form", "button",
+    "nav", "header", "footer", "aside", "select", "option", "head",
+}
+# Elements that end a block of text
+_BLOCK_TAGS = {
+    "p", "div", "section", "article", "main", "li", "ul", "ol", "table", "tr", "td", "th",
+    "h1", "h2", "h3", "h4", "h5", "h6", "blockquote", "pre", "br", "dd", "dt", "figcaption",
+}
+_MAIN_TAGS = {"article", "main"}
+
+
+class _TextExtractor(HTMLParser):
+    """Collect text blocks, noting which are inside <article>/<main> and how link-heavy they are."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.title = ""
+        self.blocks: List[Tuple[str, bool, float]] = []
+        self._in_title = False
+        self._skip_depth = 0
+        self._main_depth = 0
+        self._link_depth = 0
+        self._parts: List[str] = []
+        self._link_chars = 0
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag == "title":
+            self._in_title = True
+        elif tag == "a":
+            self._link_depth += 1
+        if tag in _BLOCK_TAGS:
+            self._end_block()
+        if tag in _MAIN_TAGS:
+            self._main_depth += 1
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in _SKIP_TAGS:
+            self._skip_depth = max(0, self._skip_depth - 1)
+        elif tag == "title":
+            self._in_title = False
+        elif tag == "a":
+            self._link_depth = max(0, self._link_depth - 1)
+        if tag in _BLOCK_TAGS:
+            self._end_block()
+        if tag in _MAIN_TAGS:
+            self._main_depth = max(0, self._main_depth - 1)
+
+    def handle_data(self, data: str) -> None:
+        if self._in_title:
+            self.title += data
+            return
+        if self._skip_depth:
+            return
+        self._parts.append(data)
+        if self._link_depth:
+            self._link_chars += len(data.strip())
+
+    def _end_block(self) -> None:
+        text = " ".join(" ".join(self._parts).split())
+        if text:
+            link_density = self._link_chars / len(text)
+            self.blocks.append((text, self._main_depth > 0, link_density))
+        self._parts = []
+        self._link_chars = 0
+
+    def close(self) -> None:
+        super().close()
+        self._end_block()
+
+
+def extract_main_text(html: str) -> Tuple[str, str]:
+    """
+    Extract the title and main text of an HTML page.
+
+    Content inside ``<article>``/``<main>`` is preferred when the page has
+    enough of it; otherwise all blocks are used. Blocks that are mostly links
+    (menus, tag clouds) or too short to be prose are dropped.
+
+    Args:
+        html: Page markup
+
+    Returns:
+        Tuple of (title, text) with one paragraph per line
+    """
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+
+    def keep(text: str, link_density: float) -> bool:
+        return link_density < 0.5 and (len(text.split()) >= 5 or text[-1:] in ".!?:")
+
+    main_blocks = [
+        text for text, in_main, density in parser.blocks if in_main and keep(text, density)
+    ]
+    if sum(len(text) for text in main_blocks) >= 200:
+        blocks = main_blocks
+    else:
+        blocks = [text for text, _, density in parser.blocks if keep(text, density)]
+
+    # Drop repeated blocks (cookie banners, share widgets) while keeping order
+    seen = set()
+    unique = [text for text in blocks if not (text in seen or seen.add(text))]
+    return " ".join(parser.title.split()), "\n".join(unique)
+
+
+class UnsafeURLError(Exception):
+    """Raised for a request target that must not be fetched (bad scheme or non-public host)."""
+
+
+def is_public_address(address: str) -> bool:
+    """Whether an IP address is globally routable (not loopback, private, link-local, ...)."""
+    ip = ipaddress.ip_address(address.split("%", 1)[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped is not None:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not ip.is_multicast
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> Tuple[str, bool]:
+    """
+    Truncate text to an approximate token budget, preferring a sentence boundary.
+
+    Returns:
+        Tuple of (text, truncated)
+    """
+    limit = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= limit:
+        return text, False
+    cut = text[:limit]
+    boundary = max(cut.rfind(". "), cut.rfind("\n"))
+    if boundary > limit // 2:
+        cut = cut[:boundary + 1]
+    return cut.rstrip() + " …", True
+
+
+@dataclass(frozen=True)
+class FetchedPage:
+    """Extracted content of one fetched URL."""
+
+    url: str
+    final_url: str = ""
+    status: int = 0
+    title: str = ""
+    text: str = ""
+    truncated: bool = False
+    from_cache: bool = False
+    error: Optional[str] = None
+
+
+class PageCache:
+    """On-disk cache of extracted pages, keyed by URL and revalidated by ETag."""
+
+    def __init__(self, root: str):
+        """
+        Args:
+            root: Directory holding one JSON file per cached URL
+        """
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, url: str) -> Path:
+        digest = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.root / digest[:2] / f"{digest}.json"
+
+    def get(self, url: str) -> Optional[Dict[str, Any]]:
+        """Return the cached entry for a URL, if any."""
+        try:
+            return json.loads(self._path(url).read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def put(self, url: str, entry: Dict[str, Any]) -> None:
+        """Atomically store the entry for a URL."""
+        path = self._path(url)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(entry, f, ensure_ascii=False)
+            os.replace(tmp_path, path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+
+class PageFetcher:
+    """Fetch and extract many pages concurrently with bounded per-host parallelism."""
+
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        per_host_limit: Optional[int] = None,
+        timeout: Optional[float] = None,
+        max_bytes: Optional[int] = None,
+        token_budget: Optional[int] = None,
+        cache: Optional[PageCache] = None,
+        cache_ttl: Optional[int] = None,
+        allow_private_hosts: Optional[bool] = None
+    ):
+        """
+        Args:
+            max_concurrency: Maximum simultaneous requests overall
+            per_host_limit: Maximum simultaneous requests per host
+            timeout: Per-request timeout in seconds
+            max_bytes: Maximum bytes read from a response body
+            token_budget: Approximate token budget of each extracted page
+            cache: Disk cache (None disables caching)
+            cache_ttl: Seconds a cached page is served without revalidation
+            allow_private_hosts: Also fetch hosts resolving to non-public addresses
+        """
+        self.max_concurrency = max_concurrency or Config.FETCH_MAX_CONCURRENCY
+        self.per_host_limit = per_host_limit or Config.FETCH_PER_HOST_LIMIT
+        self.timeout = timeout or Config.FETCH_TIMEOUT
+        self.max_bytes = max_bytes or Config.FETCH_MAX_BYTES
+        self.token_budget = token_budget or Config.FETCH_TOKEN_BUDGET
+        self.cache = cache
+        self.cache_ttl = Config.FETCH_CACHE_TTL if cache_ttl is None else cache_ttl
+        self.allow_private_hosts = (
+            Config.FETCH_ALLOW_PRIVATE_HOSTS if allow_private_hosts is None else allow_private_hosts
+        )
+
+    def fetch(self, urls: List[str]) -> List[FetchedPage]:
+        """
+        Fetch pages from synchronous code (e.g. a CrewAI tool).
+
+        Runs the event loop in this thread, or in a helper thread when one is
+        already running here. The caller's context (metrics, tracing, evidence)
+        is carried along either way.
+
+        Args:
+            urls: URLs to fetch
+
+        Returns:
+            One FetchedPage per URL, in input order
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self.fetch_many(urls))
+        context = contextvars.copy_context()
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            return executor.submit(context.run, asyncio.run, self.fetch_many(urls)).result()
+
+    async def fetch_many(self, urls: List[str]) -> List[FetchedPage]:
+        """
+        Fetch pages concurrently over one pooled client.
+
+        Fetches still running when the active investigation deadline passes are
+        cancelled and reported as failed pages.
+        """
+        limits = httpx.Limits(
+            max_connections=self.max_concurrency, max_keepalive_connections=self.max_concurrency
+        )
+        host_limits: Dict[str, asyncio.Semaphore] = {}
+        async with httpx.AsyncClient(
+            limits=limits,
+            timeout=httpx.Timeout(self.timeout),
+            # Redirects are followed by ``_open`` so every hop is checked
+            follow_redirects=False,
+            headers={"User-Agent": USER_AGENT, "Accept": "text/html,text/plain;q=0.9"}
+        ) as client:
+            async def fetch_one(url: str) -> FetchedPage:
+                host = (urlsplit(url).hostname or "").lower()
+                semaphore = host_limits.setdefault(host, asyncio.Semaphore(self.per_host_limit))
+                async with semaphore:
+                    return await self._fetch(client, url)
+
+            tasks = [asyncio.ensure_future(fetch_one(url)) for url in urls]
+            if not tasks:
+                return []
+            # Cancel whatever is still in flight when the investigation deadline passes
+            done, pending = await asyncio.wait(tasks, timeout=deadlines.remaining())
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+                metrics.current().increment("deadline_exceeded_total", operation="page_fetch")
+                logger.warning(
+                    "Cancelled %d page fetches: investigation deadline reached", len(pending)
+                )
+            pages = [
+                task.result() if task in done
+                else FetchedPage(url=url, error="Cancelled: investigation deadline reached")
+                for url, task in zip(urls, tasks)
+            ]
+
+        for page in pages:
+            if page.error is None:
+                evidence.record_observation(evidence.PAGE_TOOL, page.url, asdict(page))
+        return pages
+
+    async def _check_target(self, url: str) -> None:
+        """
+        Refuse a target that is not http(s) or does not resolve to public addresses only.
+
+        Raises:
+            UnsafeURLError: If the target must not be fetched
+        """
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise UnsafeURLError("Only http(s) URLs can be fetched")
+        host = parts.hostname
+        if not host:
+            raise UnsafeURLError("URL has no host")
+        if self.allow_private_hosts:
+            return
+        try:
+            port = parts.port or (443 if parts.scheme == "https" else 80)
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except (OSError, UnicodeError, ValueError) as e:
+            raise UnsafeURLError(f"Could not resolve {host}: {e}") from e
+        for info in infos:
+            address = str(info[4][0])
+            if not is_public_address(address):
+                metrics.current().increment("page_fetch_blocked_total")
+                raise UnsafeURLError(
+                    f"Refusing to fetch {host}: it resolves to non-public address {address}"
+                )
+
+    @asynccontextmanager
+    async def _open(
+        self, client: httpx.AsyncClient, url: str, headers: Dict[str, str]
+    ) -> AsyncIterator[httpx.Response]:
+        """Stream a GET of ``url``, following only redirects that pass ``_check_target``."""
+        target = url
+        for _ in range(MAX_REDIRECTS + 1):
+            await self._check_target(target)
+            async with client.stream("GET", target, headers=headers) as response:
+                location = response.headers.get("location")
+                if not (response.is_redirect and location):
+                    yield response
+                    return
+                target = str(response.url.join(location))
+        raise UnsafeURLError(f"Too many redirects (more than {MAX_REDIRECTS})")
+
+    async def _fetch(self, client: httpx.AsyncClient, url: str) -> FetchedPage:
+        if urlsplit(url).scheme not in ("http", "https"):
+            return FetchedPage(url=url, error="Only http(s) URLs can be fetched")
+
+        cached = self.cache.get(url) if self.cache else None
+        if cached and time.time() - cached.get("fetched_at", 0) < self.cache_ttl:
+            metrics.current().record_cache("page_fetch", True)
+            return self._page_from_cache(url, cached)
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+        try:
+            with metrics.current().timer("upstream_latency_seconds", upstream="http"), \
+                    tracing.span("http.get", url=url, conditional=bool(headers)) as span:
+                async with self._open(client, url, headers) as response:
+                    if span is not None:
+                        span.set_attribute("http.status_code", response.status_code)
+                    if response.status_code == 304 and cached:
+                        cached["fetched_at"] = time.time()
+                        self._store(url, cached)
+                        metrics.current().record_cache("page_fetch", True)
+                        return self._page_from_cache(url, cached)
+                    if response.status_code >= 400:
+                        return FetchedPage(
+                            url=url, final_url=str(response.url), status=response.status_code,
+                            error=f"HTTP {response.status_code}"
+                        )
+                    content_type = response.headers.get("content-type", "")
+                    content_type = content_type.split(";")[0].strip().lower()
+                    if content_type and content_type not in _TEXT_CONTENT_TYPES:
+                        return FetchedPage(
+                            url=url, final_url=str(response.url), status=response.status_code,
+                            error=f"Unsupported content type: {content_type}"
+                        )
+                    body = await self._read_capped(response)
+                    encoding = response.encoding or "utf-8"
+        except UnsafeURLError as e:
+            return FetchedPage(url=url, error=str(e))
+        except httpx.TimeoutException:
+            return FetchedPage(url=url, error=f"Timed out after {self.timeout:g}s")
+        except httpx.HTTPError as e:
+            return FetchedPage(url=url, error=f"{type(e).__name__}: {e}")
+
+        metrics.current().record_cache("page_fetch", False)
+        markup = body.decode(encoding, errors="replace")
+        if content_type == "text/plain":
+            title = ""
+            text = "\n".join(
+                " ".join(line.split()) for line in markup.splitlines() if line.strip()
+            )
+        else:
+            title, text = extract_main_text(markup)
+        text, truncated = truncate_to_tokens(text, self.token_budget)
+        page = FetchedPage(
+            url=url, final_url=str(response.url), status=response.status_code,
+            title=title, text=text, truncated=truncated
+        )
+        self._store(url, {
+            **asdict(page),
+            "etag": response.headers.get("etag"),
+            "last_modified": response.headers.get("last-modified"),
+            "fetched_at": time.time(),
+        })
+        return page
+
+    async def _read_capped(self, response: httpx.Response) -> bytes:
+        """Read the response body, stopping once ``max_bytes`` have been received."""
+        chunks: List[bytes] = []
+        received = 0
+        async for chunk in response.aiter_bytes():
+            chunks.append(chunk)
+            received += len(chunk)
+            if received >= self.max_bytes:
+                logger.debug(
+                    "Response from %s exceeded %d bytes; truncating", response.url, self.max_bytes
+                )
+                break
+        return b"".join(chunks)[:self.max_bytes]
+
+    def _store(self, url: str, entry: Dict[str, Any]) -> None:
+        if self.cache is None:
+            return
+        try:
+            self.cache.put(url, entry)
+        except OSError as e:
+            logger.warning("Could not cache page %s: %s", url, e)
+
+    @staticmethod
+    def _page_from_cache(url: str, entry: Dict[str, Any]) -> FetchedPage:
+        fields = {k: entry.get(k) for k in ("final_url", "status", "title", "text", "truncated")}
+        return FetchedPage(
+            url=url, from_cache=True, **{k: v for k, v in fields.items() if v is not None}
+        )
+
+
+def get_page_cache() -> Optional[PageCache]:
+    """Return the disk cache at ``Config.FETCH_CACHE_DIR``, or None if disabled."""
+    return PageCache(Config.FETCH_CACHE_DIR) if Config.FETCH_CACHE_DIR else None
+
+
+def format_pages(pages: List[FetchedPage]) -> str:
+    """
+    Format fetched pages for the agent.
+
+    Args:
+        pages: Pages as returned by ``PageFetcher.fetch``
+
+    Returns:
+        Numbered listing with each page's title, URL and extracted text
+    """
+    sections = []
+    for i, page in enumerate(pages, 1):
+        if page.error:
+            sections.append(f"Page {i}: {page.url}\nError: {page.error}\n")
+            continue
+        note = " (truncated)" if page.truncated else ""
+        sections.append(
+            f"Page {i}:\n"
+            f"Title: {page.title or 'No title'}\n"
+            f"URL: {page.final_url or page.url}\n"
+            f"Content{note}:\n{page.text or 'No readable text found.'}\n"
+        )
+    return "\n".join(sections) if sections else "No URLs provided."
@@ -1,52 +1,173 @@
 """Logging configuration for Ghost Office Hunter."""
+import atexit
+import contextvars
+import json
 import logging
+import logging.handlers
+import queue
 import sys
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional
 from config import Config
 
+# Run-scoped fields attached to every record logged inside ``log_context``
+_log_context: contextvars.ContextVar[Dict[str, Any]] = contextvars.ContextVar(
+    "ghost_hunter_log_context", default={}
+)
+
+_listeners: List[logging.handlers.QueueListener] = []
+
+
+@contextmanager
+def log_context(**fields: Any) -> Iterator[None]:
+    """
+    Attach fields such as ``run_id`` and ``company`` to records logged in this block.
+
+    Args:
+        **fields: Context fields to add to each log record
+    """
+    token = _log_context.set({**_log_context.get(), **fields})
+    try:
+        yield
+    finally:
+        _log_context.reset(token)
+
+
+def current_context() -> Dict[str, Any]:
+    """Fields set by the enclosing ``log_context`` blocks (e.g. ``company``)."""
+    return dict(_log_context.get())
+
+
+class ContextFilter(logging.Filter):
+    """Copy the current run context onto each record in the calling thread."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        context = _log_context.get()
+        record.run_id = context.get("run_id", "-")
+        record.company = context.get("company", "-")
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """Format records as single-line JSON objects."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "run_id": getattr(record, "run_id", "-"),
+            "company": getattr(record, "company", "-"),
+            "thread": record.threadName,
+        }
+        if record.exc_info:
+            payload["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class DeferredQueueHandler(logging.handlers.QueueHandler):
+    """
+    Queue handler that leaves formatting to the listener thread.
+
+    The stock ``QueueHandler.prepare`` formats the message (and traceback) in the
+    caller's thread; records only travel within this process, so they can be
+    enqueued as-is and formatted once, off the worker's hot path.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _file_handler(log_path: Path) -> logging.Handler:
+    """Create a file handler honouring the configured rotation policy."""
+    rotation = Config.LOG_ROTATION.lower()
+    if rotation == "size":
+        return logging.handlers.RotatingFileHandler(
+            log_path,
+            maxBytes=Config.LOG_MAX_BYTES,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+    if rotation == "time":
+        return logging.handlers.TimedRotatingFileHandler(
+            log_path,
+            when=Config.LOG_ROTATION_WHEN,
+            backupCount=Config.LOG_BACKUP_COUNT,
+            encoding="utf-8"
+        )
+    return logging.FileHandler(log_path, encoding="utf-8")
+
+
+def _stop_listeners() -> None:
+    """Flush and stop all queue listeners at interpreter exit."""
+    while _listeners:
+        _listeners.pop().stop()
+
 
 def setup_logger(name: str = "ghost_office_hunter", log_file: Optional[str] = None) -> logging.Logger:
     """
     Set up and configure the application logger.
-    
+
+    Records are put on an in-memory queue and written to the console and log
+    file by a background listener thread, so callers never block on I/O.
+
     Args:
         name: Logger name
         log_file: Optional path to log file
-        
+
     Returns:
         Configured logger instance
     """
     logger = logging.getLogger(name)
     logger.setLevel(getattr(logging, Config.LOG_LEVEL.upper(), logging.INFO))
-    
+
     # Prevent duplicate handlers
     if logger.handlers:
         return logger
-    
-    # Create formatters
-    detailed_formatter = logging.Formatter(
-        '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-        datefmt='%Y-%m-%d %H:%M:%S'
-    )
+
+    # Create formatters (JSON lines apply to the log file; the console stays readable)
+    if Config.LOG_FORMAT.lower() == "json":
+        detailed_formatter: logging.Formatter = JsonFormatter()
+    else:
+        detailed_formatter = logging.Formatter(
+            '%(asctime)s - %(name)s - %(levelname)s - [%(run_id)s] %(message)s',
+            datefmt='%Y-%m-%d %H:%M:%S'
+        )
     simple_formatter = logging.Formatter(
         '%(levelname)s - %(message)s'
     )
-    
+
+    handlers: List[logging.Handler] = []
+
     # Console handler
     console_handler = logging.StreamHandler(sys.stdout)
     console_handler.setLevel(logging.INFO)
     console_handler.setFormatter(simple_formatter)
-    logger.addHandler(console_handler)
-    
+    handlers.append(console_handler)
+
     # File handler (if specified)
     if log_file or Config.LOG_FILE:
         log_path = Path(log_file or Config.LOG_FILE)
         log_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        file_handler = logging.FileHandler(log_path)
+
+        file_handler = _file_handler(log_path)
         file_handler.setLevel(logging.DEBUG)
         file_handler.setFormatter(detailed_formatter)
-        logger.addHandler(file_handler)
-    
+        handlers.append(file_handler)
+
+    # Asynchronous pipeline: callers enqueue, a listener thread does the I/O
+    queue_handler = DeferredQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(ContextFilter())
+    logger.addHandler(queue_handler)
+
+    listener = logging.handlers.QueueListener(
+        queue_handler.queue, *handlers, respect_handler_level=True
+    )
+    listener.start()
+    if not _listeners:
+        atexit.register(_stop_listeners)
+    _listeners.append(listener)
+
     return logger
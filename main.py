@@ -1,27 +1,76 @@
 """Main entry point for Ghost Office Hunter."""
 import argparse
+import dataclasses
+import functools
 import logging
+import sqlite3
 import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
 from pathlib import Path
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from crewai import Crew, Process
+from crewai import Agent, Crew, Process, Task
 
-from agents import registry_researcher_agent, shariah_compliance_agent
-from tasks import investigation_task, shariah_compliance_task
-from tools import GhostHunterSearchTool, ShariahComplianceTool, ShariahBusinessActivityTool
-from config import Config
-from logger import setup_logger
+import context_compaction
+import deadlines
+import director_graph
+import evidence
+import metrics
+import portfolio
+import sanctions
+import tracing
+from agents import (
+    ROUTE_RESEARCH,
+    ROUTE_SYNTHESIS,
+    registry_researcher_agent,
+    report_writer_agent,
+    shariah_compliance_agent,
+)
+from query_planner import QueryPlanner
+from triage import select_for_investigation, triage, write_triage_csv
+from tasks import (
+    delta_update_task,
+    investigation_task,
+    report_synthesis_task,
+    shariah_compliance_task,
+)
+from tools import (
+    DirectorNetworkTool,
+    GhostHunterPageFetchTool,
+    GhostHunterSearchTool,
+    SanctionsScreeningTool,
+    SearchError,
+    ShariahBusinessActivityTool,
+    ShariahComplianceTool,
+    format_search_results,
+    stateless_tool,
+)
+from config import Config, RunSettings
+from deadlines import DeadlineExceeded
+from logger import log_context, setup_logger
+from metrics import RunMetrics
+from report import ReportWriter
+from report_store import compute_input_hash, get_report_store
 
 # Initialize logger
 logger = setup_logger()
 
+# How much of the previous report a delta update task sees as context
+DELTA_PREVIOUS_REPORT_CHARS = 6000
+
 
 def run_investigation(
     company_name: str, 
     output_path: Optional[str] = None,
     include_shariah: bool = False,
-    ticker_symbol: Optional[str] = None
+    ticker_symbol: Optional[str] = None,
+    settings: Optional[RunSettings] = None,
+    on_section: Optional[Callable[[str, str], None]] = None,
+    incremental: bool = False,
+    deadline: Optional[float] = None
 ) -> str:
     """
     Run a forensic investigation on a company.
@@ -31,6 +80,17 @@ def run_investigation(
         output_path: Optional custom path for output file
         include_shariah: Whether to include Shariah compliance check
         ticker_symbol: Optional stock ticker symbol for Shariah compliance check
+        settings: Per-run settings; defaults are taken from Config
+        on_section: Optional callback invoked with (title, content) as soon as
+            each task's report section is ready
+        incremental: Re-run the previous searches and only send new or changed
+            evidence to the LLM, appending a delta section to the last report
+            (plus a fresh Shariah section if ``include_shariah``). Falls back to a
+            full investigation if no previous evidence exists.
+        deadline: Time budget for the whole investigation in seconds (default
+            ``Config.INVESTIGATION_DEADLINE_SECONDS``; 0 means no limit). When it
+            passes, in-flight tool calls are abandoned and a partial report
+            marked as timed out is written.
         
     Returns:
         Path to the generated report file
@@ -43,65 +103,697 @@ def run_investigation(
         raise ValueError("Company name cannot be empty")
     
     company_name = company_name.strip()
-    logger.info(f"Starting investigation into: {company_name}")
+    settings = settings or RunSettings()
+    run_metrics = RunMetrics(run_id=uuid.uuid4().hex[:12])
+    logger.info("Starting investigation into: %s (run %s)", company_name, run_metrics.run_id)
+    
+    tracer = tracing.create_tracer()
+    recorder = evidence.EvidenceRecorder(
+        run_metrics.run_id, company_name, store=evidence.get_evidence_store()
+    )
+    run_deadline = deadlines.from_seconds(
+        Config.INVESTIGATION_DEADLINE_SECONDS if deadline is None else deadline
+    )
+    if run_deadline is not None:
+        logger.info("Investigation deadline: %gs", run_deadline.budget)
     
     try:
-        # Setup tools
-        search_tool = GhostHunterSearchTool()
-        logger.debug("Search tool initialized")
-        
-        # Setup agents and tasks
-        agents = []
-        tasks = []
+        with (
+            log_context(run_id=run_metrics.run_id, company=company_name),
+            metrics.activate(run_metrics),
+            tracing.activate(tracer),
+            evidence.activate(recorder),
+            deadlines.activate(run_deadline),
+            tracer.span(
+                "run_investigation", company=company_name, run_id=run_metrics.run_id,
+                include_shariah=include_shariah, incremental=incremental
+            ),
+        ):
+            if incremental:
+                previous = evidence.load_latest(company_name)
+                if previous is not None and previous.queries:
+                    return _execute_delta_investigation(
+                        company_name, output_path, include_shariah, ticker_symbol, settings,
+                        on_section, run_metrics, tracer, previous
+                    )
+                logger.info(
+                    "No previous evidence for %s; running a full investigation", company_name
+                )
+            
+            return _execute_investigation(
+                company_name,
+                output_path,
+                include_shariah,
+                ticker_symbol,
+                settings,
+                on_section,
+                run_metrics,
+                tracer
+            )
         
-        # Main investigation agent and task
-        investigator = registry_researcher_agent(tools=[search_tool], verbose=True)
-        agents.append(investigator)
-        tasks.append(investigation_task(investigator, company_name))
-        logger.debug("Investigator agent and task created")
+    except Exception as e:
+        logger.error("Investigation failed: %s", e, exc_info=True)
+        raise RuntimeError(f"Investigation failed: {str(e)}") from e
+    
+    finally:
+        if Config.METRICS_PROM_FILE:
+            write_prometheus_file(Config.METRICS_PROM_FILE)
+
+
+def _execute_investigation(
+    company_name: str,
+    output_path: Optional[str],
+    include_shariah: bool,
+    ticker_symbol: Optional[str],
+    settings: RunSettings,
+    on_section: Optional[Callable[[str, str], None]],
+    run_metrics: RunMetrics,
+    tracer: tracing.Tracer
+) -> str:
+    """Build the crew for a validated request, run it and write the report."""
+    # Setup tools
+    search_tool = GhostHunterSearchTool(settings=settings, planner=QueryPlanner())
+    page_tool = stateless_tool(GhostHunterPageFetchTool)
+    investigator_tools = [search_tool, page_tool]
+    # Local sanctions/PEP screening, offered only when lists are loaded
+    sanctions_index = sanctions.get_index()
+    sanctions_screening = sanctions_index is not None and len(sanctions_index) > 0
+    if sanctions_screening:
+        investigator_tools.append(stateless_tool(SanctionsScreeningTool))
+    # Director network lookups, offered only when a registry officer dump is present
+    director_network = director_graph.get_graph() is not None
+    if director_network:
+        investigator_tools.append(stateless_tool(DirectorNetworkTool))
+    logger.debug(
+        "Investigator tools initialized: %s",
+        ", ".join(tool.name for tool in investigator_tools)
+    )
+    
+    # Setup agents and tasks
+    agents = []
+    tasks = []
+    
+    # Main investigation agent and task
+    investigator = registry_researcher_agent(
+        tools=investigator_tools, verbose=True, settings=settings
+    )
+    agents.append(investigator)
+    research = investigation_task(
+        investigator,
+        company_name,
+        findings_only=settings.separate_synthesis,
+        sanctions_screening=sanctions_screening,
+        director_network=director_network
+    )
+    tasks.append(research)
+    logger.debug("Investigator agent and task created")
+    
+    # Final report written by the synthesis model when it differs from the research model
+    if settings.separate_synthesis:
+        writer = report_writer_agent(verbose=True, settings=settings)
+        agents.append(writer)
+        tasks.append(report_synthesis_task(writer, company_name, research))
+        logger.debug(
+            "Report synthesis routed to %s, research to %s",
+            settings.model_for(ROUTE_SYNTHESIS), settings.model_for(ROUTE_RESEARCH)
+        )
+    
+    # Shariah compliance agent and task (if requested)
+    if include_shariah:
+        shariah_analyst, shariah_task = _shariah_agent_and_task(
+            company_name, ticker_symbol, settings
+        )
+        agents.append(shariah_analyst)
+        tasks.append(shariah_task)
+    
+    # Determine output path; sections are streamed there as tasks complete
+    if not output_path:
+        output_path = Config.get_output_path(company_name, settings.output_dir)
+    report_writer = ReportWriter(output_path, on_section=on_section)
+    
+    timed_out = False
+    try:
+        result_text = str(_kickoff(agents, tasks, report_writer, run_metrics, tracer))
+    except DeadlineExceeded as e:
+        result_text = _mark_timed_out(report_writer, run_metrics, e)
+        timed_out = True
+    
+    return _complete_run(
+        company_name,
+        report_writer,
+        result_text,
+        run_metrics,
+        input_hash=compute_input_hash(
+            company_name,
+            include_shariah=include_shariah,
+            ticker_symbol=ticker_symbol,
+            settings=dataclasses.asdict(settings)
+        ),
+        timed_out=timed_out
+    )
+
+
+def _shariah_agent_and_task(
+    company_name: str,
+    ticker_symbol: Optional[str],
+    settings: RunSettings
+) -> Tuple[Agent, Task]:
+    """Build the Shariah compliance agent and its task."""
+    shariah_tool = stateless_tool(ShariahComplianceTool)
+    business_activity_tool = stateless_tool(ShariahBusinessActivityTool)
+    # Its own planner, so the Shariah analyst does not spend the investigator's search budget
+    search_tool = GhostHunterSearchTool(settings=settings, planner=QueryPlanner())
+    shariah_analyst = shariah_compliance_agent(
+        tools=[shariah_tool, business_activity_tool, search_tool],
+        verbose=True,
+        settings=settings
+    )
+    logger.debug("Shariah compliance agent and task created")
+    return shariah_analyst, shariah_compliance_task(shariah_analyst, company_name, ticker_symbol)
+
+
+def _execute_delta_investigation(
+    company_name: str,
+    output_path: Optional[str],
+    include_shariah: bool,
+    ticker_symbol: Optional[str],
+    settings: RunSettings,
+    on_section: Optional[Callable[[str, str], None]],
+    run_metrics: RunMetrics,
+    tracer: tracing.Tracer,
+    previous: evidence.EvidenceSet
+) -> str:
+    """
+    Re-run the previous searches and append a delta section covering only new evidence.
+    
+    Searches that fail are listed in the report, which is then marked incomplete,
+    and the run does not become the next delta baseline. If every search fails
+    nothing was re-checked, so the run fails instead of reporting "no change".
+    """
+    previous_date = datetime.fromtimestamp(previous.created_at).strftime("%Y-%m-%d %H:%M")
+    logger.info(
+        "Delta re-investigation: repeating %d searches from %s",
+        len(previous.queries), previous_date
+    )
+    
+    # Repeat the previous searches against DDGS itself (cached results would hide any change);
+    # results are recorded on the active evidence recorder
+    search_tool = GhostHunterSearchTool(settings=settings)
+    deadline_error: Optional[DeadlineExceeded] = None
+    failed_queries: Dict[str, str] = {}
+    with tracer.span("delta.research", queries=len(previous.queries)):
+        for query in previous.queries:
+            try:
+                search_tool.search(query, refresh=True)
+            except SearchError as e:
+                logger.warning("Delta search failed for '%s': %s", query, e)
+                failed_queries[query] = str(e)
+            except DeadlineExceeded as e:
+                logger.warning("Deadline reached during delta searches: %s", e)
+                deadline_error = e
+                break
+    
+    run_metrics.set_gauge("delta_failed_searches", len(failed_queries))
+    if deadline_error is None and len(failed_queries) == len(previous.queries):
+        raise SearchError(
+            f"All {len(previous.queries)} delta searches failed; nothing was re-checked "
+            f"(last error: {list(failed_queries.values())[-1]})"
+        )
+    
+    new_items = evidence.diff(previous, evidence.current().snapshot())
+    run_metrics.set_gauge("delta_new_evidence", len(new_items))
+    logger.info("Delta re-investigation found %s new or changed results", len(new_items))
+    
+    # Append to the last report for this company
+    store = get_report_store()
+    prior = store.latest(company_name) if store else None
+    if not output_path:
+        if prior and prior.report_path and Path(prior.report_path).exists():
+            output_path = prior.report_path
+        else:
+            output_path = Config.get_output_path(company_name, settings.output_dir)
+    if Path(output_path).exists():
+        previous_report = Path(output_path).read_text(encoding="utf-8")
+    else:
+        previous_report = (store.get_body(prior.id) if prior else None) or ""
+    
+    report_writer = ReportWriter(output_path, on_section=on_section, preamble=previous_report)
+    section_title = f"Delta Update {datetime.now():%Y-%m-%d %H:%M}"
+    
+    timed_out = False
+    result_text = ""
+    if deadline_error is not None:
+        result_text = _mark_timed_out(report_writer, run_metrics, deadline_error)
+        timed_out = True
+    else:
+        agents: List[Agent] = []
+        tasks: List[Task] = []
+        section_titles: List[str] = []
+        succeeded = len(previous.queries) - len(failed_queries)
+        if new_items:
+            analyst = registry_researcher_agent(
+                tools=[], verbose=True, settings=settings, route=ROUTE_SYNTHESIS
+            )
+            agents.append(analyst)
+            tasks.append(delta_update_task(
+                analyst,
+                company_name,
+                format_search_results([
+                    {"title": item.title, "body": item.snippet, "href": item.url}
+                    for item in new_items
+                ]),
+                previous_report[:DELTA_PREVIOUS_REPORT_CHARS] or "(previous report unavailable)",
+                previous_date
+            ))
+            section_titles.append(section_title)
+        else:
+            # Nothing new: no LLM call needed
+            summary = (
+                f"## {section_title}\n\nNo new or changed evidence since {previous_date} across "
+            )
+            if failed_queries:
+                summary += (
+                    f"the {succeeded} of {len(previous.queries)} repeated searches that succeeded."
+                )
+            else:
+                summary += (
+                    f"{len(previous.queries)} repeated searches. The previous assessment stands."
+                )
+            report_writer.append_section(section_title, summary)
+            result_text = summary
         
-        # Shariah compliance agent and task (if requested)
+        # Fundamentals change independently of search evidence, so the Shariah check always re-runs
         if include_shariah:
-            shariah_tool = ShariahComplianceTool()
-            business_activity_tool = ShariahBusinessActivityTool()
-            shariah_analyst = shariah_compliance_agent(
-                tools=[shariah_tool, business_activity_tool, search_tool], 
-                verbose=True
+            shariah_analyst, shariah_task = _shariah_agent_and_task(
+                company_name, ticker_symbol, settings
             )
             agents.append(shariah_analyst)
-            tasks.append(shariah_compliance_task(shariah_analyst, company_name, ticker_symbol))
-            logger.debug("Shariah compliance agent and task created")
-        
-        # Assemble crew
-        crew = Crew(
-            agents=agents,
-            tasks=tasks,
-            verbose=True,
-            process=Process.sequential
-        )
-        logger.debug("Crew assembled")
+            tasks.append(shariah_task)
         
-        # Execute investigation
-        logger.info("Executing investigation...")
-        result = crew.kickoff()
+        if tasks:
+            try:
+                result = _kickoff(
+                    agents, tasks, report_writer, run_metrics, tracer,
+                    section_titles=section_titles
+                )
+                result_text = str(result)
+            except DeadlineExceeded as e:
+                result_text = _mark_timed_out(report_writer, run_metrics, e)
+                timed_out = True
         
-        # Determine output path
-        if not output_path:
-            output_path = Config.get_output_path(company_name)
-        
-        # Save report
-        output_file = Path(output_path)
-        output_file.parent.mkdir(parents=True, exist_ok=True)
+        if failed_queries and not timed_out:
+            failed = "\n".join(f"- `{query}`: {error}" for query, error in failed_queries.items())
+            report_writer.mark_incomplete(
+                f"{len(failed_queries)} of {len(previous.queries)} repeated searches failed, "
+                f"so their results were not re-checked:\n\n{failed}",
+                status="SEARCHES FAILED",
+                advice="re-run the delta re-investigation once the search provider is reachable."
+            )
+    
+    return _complete_run(
+        company_name,
+        report_writer,
+        result_text,
+        run_metrics,
+        input_hash=compute_input_hash(
+            company_name,
+            mode="delta",
+            include_shariah=include_shariah,
+            ticker_symbol=ticker_symbol,
+            settings=dataclasses.asdict(settings)
+        ),
+        timed_out=timed_out,
+        mode="delta",
+        save_evidence=not failed_queries
+    )
+
+
+def _kickoff(
+    agents: List[Agent],
+    tasks: List[Task],
+    report_writer: ReportWriter,
+    run_metrics: RunMetrics,
+    tracer: tracing.Tracer,
+    section_titles: Optional[List[str]] = None
+) -> Any:
+    """
+    Run a sequential crew, streaming each finished task into the report.
+    
+    Args:
+        agents: Agents of the crew
+        tasks: Tasks in execution order
+        report_writer: Writer receiving each task's section
+        run_metrics: Metrics of the active run
+        tracer: Tracer of the active run
+        section_titles: Optional report section titles per task (default: agent role)
         
-        with open(output_file, "w", encoding="utf-8") as f:
-            f.write(str(result))
+    Returns:
+        The CrewAI kickoff result
         
-        logger.info(f"Report generated successfully: {output_file}")
-        return str(output_file)
+    Raises:
+        DeadlineExceeded: If the investigation deadline passes before the crew finishes
+    """
+    task_names = [
+        task.agent.role if task.agent else f"task {i + 1}" for i, task in enumerate(tasks)
+    ]
+    completed = []
+    
+    def on_task_complete(output) -> None:
+        index = len(completed)
+        task_name = task_names[index] if index < len(task_names) else "task"
+        duration = run_metrics.task_completed(task_name)
+        logger.info("Task completed: %s (%.1fs)", task_name, duration)
+        tracer.end_task(duration_s=round(duration, 3))
+        completed.append(task_name)
+        # Sequential process: the next task starts as soon as this one finishes
+        if len(completed) < len(task_names):
+            tracer.start_task(task_names[len(completed)])
+        if section_titles and index < len(section_titles):
+            title = section_titles[index]
+            content = getattr(output, "raw", None) or str(output)
+            report_writer.append_section(title, f"## {title}\n\n{content}")
+        else:
+            report_writer.task_callback(output)
+    
+    # Assemble crew
+    crew = Crew(
+        agents=agents,
+        tasks=tasks,
+        verbose=True,
+        process=Process.sequential,
+        task_callback=on_task_complete
+    )
+    logger.debug("Crew assembled")
+    
+    # Execute investigation
+    logger.info("Executing investigation...")
+    context_compaction.install()
+    tracer.bind_agents(agents)
+    tracer.start_task(task_names[0])
+    # Bounded by the run's deadline; on expiry the crew is abandoned and its later
+    # tool calls fail fast because the deadline is cancelled
+    result = deadlines.run_within(crew.kickoff, "crew.kickoff")
+    metrics.record_llm_usage(
+        run_metrics,
+        [
+            llm for agent in agents
+            for llm in (agent.llm, agent.function_calling_llm) if llm is not None
+        ],
+        fallback_usage=getattr(result, "token_usage", None)
+    )
+    return result
+
+
+def _mark_timed_out(
+    report_writer: ReportWriter, run_metrics: RunMetrics, error: DeadlineExceeded
+) -> str:
+    """Close the report as partial after the deadline passed; returns the fallback text."""
+    logger.warning("Investigation timed out: %s", error)
+    run_metrics.increment("investigation_timeouts_total")
+    reason = (
+        f"The investigation deadline of {error.budget:g}s was reached during {error.operation}."
+    )
+    report_writer.mark_incomplete(reason)
+    return reason
+
+
+def _complete_run(
+    company_name: str,
+    report_writer: ReportWriter,
+    fallback: str,
+    run_metrics: RunMetrics,
+    input_hash: str,
+    timed_out: bool = False,
+    mode: str = "full",
+    save_evidence: bool = True
+) -> str:
+    """Finalize the report, then persist metrics, the report index entry, the evidence
+    and the portfolio row."""
+    # Atomically move the complete report into place
+    output_file = report_writer.finalize(fallback=fallback)
+    
+    # Per-run performance summary next to the report
+    run_metrics.observe("run_duration_seconds", time.time() - run_metrics.started_at)
+    metrics_file = run_metrics.write_json(metrics_path_for(output_file))
+    logger.debug("Run metrics written to: %s", metrics_file)
+    
+    # Index the report with its metadata and version history
+    store_report(company_name, output_file, input_hash=input_hash, run_metrics=run_metrics)
+    
+    # Keep this run's evidence as the baseline for the next delta re-investigation;
+    # a timed-out run, or one whose searches partly failed, saw only part of the
+    # evidence, so it must not become the baseline
+    recorder = evidence.current()
+    if recorder is not None and save_evidence and not timed_out:
+        try:
+            evidence.save(recorder.snapshot())
+        except (OSError, sqlite3.Error) as e:
+            logger.warning("Could not save evidence for %s: %s", company_name, e)
+    
+    # Structured summary row for portfolio-level queries
+    record_portfolio(
+        company_name, output_file, run_metrics, mode=mode, timed_out=timed_out,
+        evidence_set=recorder.snapshot() if recorder is not None else None
+    )
+    
+    logger.info("Report generated successfully: %s", output_file)
+    return output_file
+
+
+def run_batch(
+    companies: List[str],
+    max_workers: int = 4,
+    settings: Optional[RunSettings] = None,
+    incremental: bool = False,
+    deadline: Optional[float] = None,
+    use_pool: bool = False,
+    include_shariah: bool = False,
+    tickers: Optional[Dict[str, str]] = None
+) -> Dict[str, Union[str, Exception]]:
+    """
+    Investigate several companies concurrently.
+    
+    Args:
+        companies: Company names to investigate
+        max_workers: Maximum number of concurrent investigations
+        settings: Per-run settings shared by every investigation
+        incremental: Use delta re-investigation for companies with previous evidence
+        deadline: Time budget per investigation in seconds (see ``run_investigation``)
+        use_pool: Run on pre-warmed worker processes (see ``worker_pool``) instead of threads
+        include_shariah: Run the Shariah compliance check for companies with a ticker
+        tickers: Ticker symbol per company name
         
+    Returns:
+        Mapping of company name to report path, or to the exception raised
+    """
+    if use_pool:
+        from worker_pool import InvestigationPool
+        pool = InvestigationPool(workers=max(1, max_workers))
+        submit = pool.submit
+    else:
+        pool = ThreadPoolExecutor(
+            max_workers=max(1, max_workers), thread_name_prefix="investigation"
+        )
+        submit = functools.partial(pool.submit, run_investigation)
+    
+    results: Dict[str, Union[str, Exception]] = {}
+    with pool:
+        futures = {}
+        for company in companies:
+            ticker = (tickers or {}).get(company)
+            future = submit(
+                company, settings=settings, incremental=incremental, deadline=deadline,
+                include_shariah=include_shariah and bool(ticker), ticker_symbol=ticker
+            )
+            futures[future] = company
+        for future in as_completed(futures):
+            company = futures[future]
+            try:
+                results[company] = future.result()
+            except Exception as e:
+                logger.error("Batch investigation failed for %s: %s", company, e)
+                results[company] = e
+    return results
+
+
+def _read_company_lines(path: str) -> List[Tuple[str, Optional[str]]]:
+    """Read ``Company Name`` or ``Company Name | TICKER`` lines, skipping blanks and # comments."""
+    entries = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            name, _, ticker = line.partition("|")
+            entries.append((name.strip(), ticker.strip() or None))
+    return entries
+
+
+def read_company_list(path: str) -> List[str]:
+    """Read one company name per line, skipping blanks and # comments."""
+    return [name for name, _ in _read_company_lines(path)]
+
+
+def read_company_tickers(path: str) -> Dict[str, str]:
+    """Read the ticker symbols given as ``Company Name | TICKER`` in a company list."""
+    return {name: ticker for name, ticker in _read_company_lines(path) if ticker}
+
+
+def store_report(
+    company_name: str, report_path: str, input_hash: str, run_metrics: RunMetrics
+) -> None:
+    """Record a finished report in the report store; failures are logged, not raised."""
+    store = get_report_store()
+    if store is None:
+        return
+    try:
+        body = Path(report_path).read_text(encoding="utf-8")
+        stored = store.add(
+            company_name,
+            body,
+            input_hash=input_hash,
+            run_id=run_metrics.run_id,
+            report_path=report_path,
+            metrics=run_metrics.to_dict()
+        )
+        logger.info(
+            "Report indexed: %s v%s (risk: %s, shariah: %s)",
+            stored.company, stored.version,
+            stored.risk_rating or "n/a", stored.shariah_status or "n/a"
+        )
     except Exception as e:
-        logger.error(f"Investigation failed: {e}", exc_info=True)
-        raise RuntimeError(f"Investigation failed: {str(e)}") from e
+        logger.warning("Could not index report for %s: %s", company_name, e)
+
+
+def record_portfolio(
+    company_name: str,
+    report_path: str,
+    run_metrics: RunMetrics,
+    mode: str = "full",
+    timed_out: bool = False,
+    evidence_set: Optional[evidence.EvidenceSet] = None
+) -> None:
+    """Append the run's summary row to the portfolio dataset; failures are logged, not raised."""
+    dataset = portfolio.get_portfolio()
+    if dataset is None:
+        return
+    try:
+        body = Path(report_path).read_text(encoding="utf-8")
+        dataset.append([portfolio.extract_record(
+            company_name,
+            body,
+            run_id=run_metrics.run_id,
+            report_path=report_path,
+            mode=mode,
+            timed_out=timed_out,
+            metrics_summary=run_metrics.to_dict(),
+            evidence_set=evidence_set
+        )])
+        dataset.maybe_compact()
+    except Exception as e:
+        logger.warning("Could not record portfolio row for %s: %s", company_name, e)
+
+
+def metrics_path_for(report_path: str) -> str:
+    """Return the path of the JSON metrics summary for a report file."""
+    return str(Path(report_path).with_suffix(".metrics.json"))
+
+
+def write_prometheus_file(path: str) -> None:
+    """Write process-wide metrics in Prometheus text format (textfile collector style)."""
+    try:
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_text(metrics.REGISTRY.to_prometheus(), encoding="utf-8")
+        tmp.replace(target)
+    except OSError as e:
+        logger.warning("Could not write Prometheus metrics to %s: %s", path, e)
+
+
+def print_section(title: str, content: str) -> None:
+    """Print a completed report section to the console."""
+    print("\n" + "=" * 60)
+    print(f"📄 {title}")
+    print("=" * 60)
+    print(content)
+
+
+def run_batch_cli(
+    batch_file: str,
+    workers: int,
+    incremental: bool = False,
+    deadline: Optional[float] = None,
+    use_pool: bool = False,
+    include_shariah: bool = False
+) -> int:
+    """Run batch mode from the CLI and print a summary."""
+    companies = read_company_list(batch_file)
+    if not companies:
+        raise ValueError(f"No company names found in {batch_file}")
+    
+    results = run_batch(
+        companies, max_workers=workers, incremental=incremental, deadline=deadline,
+        use_pool=use_pool, include_shariah=include_shariah,
+        tickers=read_company_tickers(batch_file)
+    )
+    failures = {c: r for c, r in results.items() if isinstance(r, Exception)}
+    
+    print("\n" + "=" * 60)
+    print(f"✅ BATCH COMPLETE: {len(results) - len(failures)}/{len(results)} succeeded")
+    for company in companies:
+        outcome = results.get(company)
+        marker = "❌" if isinstance(outcome, Exception) else "📄"
+        print(f"{marker} {company}: {outcome}")
+    print("=" * 60)
+    
+    return 1 if failures else 0
+
+
+def run_triage_cli(
+    batch_file: str,
+    workers: int,
+    top_n: Optional[int],
+    threshold: Optional[float],
+    triage_only: bool = False,
+    incremental: bool = False,
+    deadline: Optional[float] = None,
+    use_pool: bool = False,
+    include_shariah: bool = False
+) -> int:
+    """Triage a company list from the CLI, then investigate the selected companies."""
+    companies = read_company_list(batch_file)
+    if not companies:
+        raise ValueError(f"No company names found in {batch_file}")
+    
+    ranked = triage(companies, max_workers=max(workers, 8))
+    csv_path = write_triage_csv(
+        ranked, str(Path(Config.OUTPUT_DIR) / f"triage_{datetime.now():%Y%m%d_%H%M%S}.csv")
+    )
+    selected = select_for_investigation(ranked, top_n=top_n, threshold=threshold)
+    
+    print("\n" + "=" * 60)
+    print(f"🔎 TRIAGE COMPLETE: {len(selected)}/{len(ranked)} selected for investigation")
+    for rank, result in enumerate(ranked[:20], 1):
+        marker = "➡️" if result in selected else "  "
+        detail = result.error or ", ".join(result.top_terms[:3]) or "no red flags"
+        print(f"{marker} {rank:>3}. {result.company} ({result.score:.1f}): {detail}")
+    print(f"📊 Full ranking: {csv_path}")
+    print("=" * 60)
+    
+    if triage_only or not selected:
+        return 0
+    
+    results = run_batch(
+        [r.company for r in selected], max_workers=workers, incremental=incremental,
+        deadline=deadline, use_pool=use_pool, include_shariah=include_shariah,
+        tickers=read_company_tickers(batch_file)
+    )
+    failures = [c for c, r in results.items() if isinstance(r, Exception)]
+    print(f"\n✅ Investigated {len(results) - len(failures)}/{len(results)} selected companies")
+    for company in failures:
+        print(f"❌ {company}: {results[company]}")
+    return 1 if failures else 0
 
 
 def main():
@@ -114,15 +806,91 @@ Examples:
   python main.py "Three Arrows Capital"
   python main.py "Company Name" --output custom_report.md
   python main.py "Company Name" --verbose
+  python main.py "Company Name" --incremental
+  python main.py "Company Name" --deadline 300
+  python main.py --batch companies.txt --workers 4
+  python main.py --batch companies.txt --workers 4 --pool
+  python main.py --batch companies.txt --shariah
+  python main.py --batch companies.txt --triage --top 50
         """
     )
     
     parser.add_argument(
         "company",
         type=str,
+        nargs="?",
         help="Name of the company to investigate"
     )
     
+    parser.add_argument(
+        "--incremental", "-i",
+        action="store_true",
+        help="Delta re-investigation: only analyze evidence that is new since the last report"
+    )
+    
+    parser.add_argument(
+        "--deadline", "-d",
+        type=float,
+        default=None,
+        help="Time budget per investigation in seconds; a partial report marked TIMED OUT is "
+             "written when it runs out (default: INVESTIGATION_DEADLINE_SECONDS, 0 = no limit)"
+    )
+    
+    parser.add_argument(
+        "--batch", "-b",
+        type=str,
+        default=None,
+        help=(
+            "File with one company name per line to investigate concurrently "
+            "('Company Name | TICKER' adds a ticker for --shariah)"
+        )
+    )
+    
+    parser.add_argument(
+        "--workers", "-w",
+        type=int,
+        default=4,
+        help="Maximum concurrent investigations in batch mode (default: 4)"
+    )
+    
+    parser.add_argument(
+        "--pool",
+        action="store_true",
+        help=(
+            "With --batch: run investigations on pre-warmed worker processes "
+            "that reuse LLM clients and tools"
+        )
+    )
+    
+    parser.add_argument(
+        "--triage",
+        action="store_true",
+        help=(
+            "With --batch: pre-score all companies with rule-based searches "
+            "and only investigate the riskiest"
+        )
+    )
+    
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=None,
+        help="With --triage: investigate at most this many of the highest-scoring companies"
+    )
+    
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="With --triage: investigate only companies scoring at least this much"
+    )
+    
+    parser.add_argument(
+        "--triage-only",
+        action="store_true",
+        help="With --triage: write the ranking without running any investigations"
+    )
+    
     parser.add_argument(
         "--output", "-o",
         type=str,
@@ -151,6 +919,13 @@ Examples:
     
     args = parser.parse_args()
     
+    if not args.company and not args.batch:
+        parser.error("a company name or --batch file is required")
+    if args.triage and not args.batch:
+        parser.error("--triage requires --batch")
+    if args.pool and not args.batch:
+        parser.error("--pool requires --batch")
+    
     # Configure logging level
     if args.verbose:
         logger.setLevel(logging.DEBUG)
@@ -161,16 +936,32 @@ Examples:
         Config.validate()
         
         # Validate Shariah compliance arguments
-        if args.shariah and not args.ticker:
+        if args.shariah and not args.ticker and not args.batch:
             logger.warning("Shariah compliance requested but no ticker symbol provided. Proceeding without Shariah check.")
             args.shariah = False
         
-        # Run investigation
+        if args.batch and args.triage:
+            return run_triage_cli(
+                args.batch, args.workers, args.top, args.threshold,
+                triage_only=args.triage_only, incremental=args.incremental, deadline=args.deadline,
+                use_pool=args.pool, include_shariah=args.shariah
+            )
+        
+        if args.batch:
+            return run_batch_cli(
+                args.batch, args.workers, incremental=args.incremental, deadline=args.deadline,
+                use_pool=args.pool, include_shariah=args.shariah
+            )
+        
+        # Run investigation, printing each report section as soon as it is ready
         output_file = run_investigation(
             args.company, 
             args.output,
             include_shariah=args.shariah,
-            ticker_symbol=args.ticker
+            ticker_symbol=args.ticker,
+            on_section=print_section,
+            incremental=args.incremental,
+            deadline=args.deadline
         )
         
         # Print success message
@@ -182,12 +973,12 @@ Examples:
         return 0
         
     except ValueError as e:
-        logger.error(f"Configuration error: {e}")
+        logger.error("Configuration error: %s", e)
         print(f"❌ Error: {e}", file=sys.stderr)
         return 1
         
     except RuntimeError as e:
-        logger.error(f"Investigation error: {e}")
+        logger.error("Investigation error: %s", e)
         print(f"❌ Investigation failed: {e}", file=sys.stderr)
         return 1
         
@@ -197,7 +988,7 @@ Examples:
         return 130
         
     except Exception as e:
-        logger.error(f"Unexpected error: {e}", exc_info=True)
+        logger.error("Unexpected error: %s", e, exc_info=True)
         print(f"❌ Unexpected error: {e}", file=sys.stderr)
         return 1
 
@@ -0,0 +1,401 @@
+"""Run-level performance metrics for Ghost Office Hunter."""
+import contextvars
+import functools
+import json
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+# Latency buckets in seconds, from fast cache hits to slow LLM-backed tasks
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0
+)
+
+METRIC_HELP: Dict[str, str] = {
+    "tool_latency_seconds": "Wall time of a tool _run call",
+    "upstream_latency_seconds": "Wall time of a single upstream request (DDGS, yfinance)",
+    "tool_retries_total": "Retries performed by a tool after a failed upstream call",
+    "cache_requests_total": "Cache lookups by result",
+    "llm_tokens_total": "LLM tokens consumed",
+    "llm_requests_total": "Successful LLM requests",
+    "llm_latency_seconds": "Wall time of a single LLM call by model route",
+    "task_duration_seconds": "Wall time of a crew task",
+    "run_duration_seconds": "Wall time of a complete investigation",
+    "circuit_breaker_state": "Upstream circuit state (0 closed, 1 half-open, 2 open)",
+    "circuit_breaker_transitions_total": "Upstream circuit state changes by new state",
+    "circuit_breaker_rejections_total": "Upstream calls rejected while the circuit was open",
+    "service_jobs_total": "HTTP service job submissions and outcomes",
+    "service_queue_wait_seconds": "Time an HTTP service job waited for a worker",
+    "sanctions_screenings_total": "Names screened against the local sanctions/PEP lists",
+    "sanctions_matches_total": "Screened names with at least one possible list match",
+    "context_compactions_total": "Tool observations replaced by compact summaries",
+    "context_tokens_saved_total": "Estimated prompt tokens removed by context compaction",
+    "context_tokens_estimate": "Estimated prompt size of the latest LLM call per agent",
+}
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def _label_key(labels: Dict[str, Any]) -> LabelKey:
+    """Normalize a label dict into a hashable, ordered key."""
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _format_labels(labels: LabelKey, extra: Optional[Dict[str, str]] = None) -> str:
+    """Render labels in Prometheus exposition syntax."""
+    items = list(labels) + sorted((extra or {}).items())
+    if not items:
+        return ""
+    escaped = []
+    for k, v in items:
+        value = str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+        escaped.append(f'{k}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value: float) -> None:
+        """Record a single observation."""
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def merge(self, other: "Histogram") -> None:
+        """Add another histogram's observations to this one."""
+        for i, c in enumerate(other.counts):
+            self.counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+        self.max = max(self.max, other.max)
+
+    def quantile(self, q: float) -> float:
+        """Estimate a quantile from the bucket upper bounds."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        cumulative = 0
+        for bound, c in zip(self.buckets, self.counts):
+            cumulative += c
+            if cumulative >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the histogram as plain data."""
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 6),
+            "buckets": {str(b): c for b, c in zip(self.buckets, self.counts)},
+        }
+
+
+class RunMetrics:
+    """
+    Thread-safe collection of counters, gauges and histograms.
+
+    One instance is created per investigation; finished runs are merged into the
+    process-wide ``REGISTRY`` so long-lived processes can expose totals.
+    """
+
+    def __init__(self, run_id: Optional[str] = None):
+        self.run_id = run_id
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelKey], float] = {}
+        self._gauges: Dict[Tuple[str, LabelKey], float] = {}
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._last_task_mark = time.perf_counter()
+
+    def increment(self, name: str, amount: float = 1, **labels: Any) -> None:
+        """Increase a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def set_gauge(self, name: str, value: float, **labels: Any) -> None:
+        """Set a gauge to an absolute value."""
+        with self._lock:
+            self._gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        """Record a histogram observation."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: Any) -> Iterator[None]:
+        """Time the enclosed block into a histogram."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def record_cache(self, cache: str, hit: bool) -> None:
+        """Count a cache lookup."""
+        self.increment("cache_requests_total", cache=cache, result="hit" if hit else "miss")
+
+    def task_completed(self, task: str) -> float:
+        """
+        Record the wall time of a sequential task, measured from the previous mark.
+
+        Returns:
+            Task duration in seconds
+        """
+        now = time.perf_counter()
+        with self._lock:
+            duration = now - self._last_task_mark
+            self._last_task_mark = now
+        self.observe("task_duration_seconds", duration, task=task)
+        return duration
+
+    def record_token_usage(self, usage: Any, **labels: Any) -> None:
+        """
+        Record LLM token usage from a CrewAI ``UsageMetrics`` object or dict.
+
+        Args:
+            usage: Object exposing prompt_tokens, completion_tokens and successful_requests
+            **labels: Extra labels such as the model route
+        """
+        if usage is None:
+            return
+        get = usage.get if isinstance(usage, dict) else functools.partial(getattr, usage)
+        self.increment("llm_tokens_total", get("prompt_tokens", 0) or 0, kind="prompt", **labels)
+        self.increment(
+            "llm_tokens_total", get("completion_tokens", 0) or 0, kind="completion", **labels
+        )
+        self.increment("llm_requests_total", get("successful_requests", 0) or 0, **labels)
+
+    def merge(self, other: "RunMetrics") -> None:
+        """Fold another collection into this one."""
+        with other._lock:
+            counters = dict(other._counters)
+            gauges = dict(other._gauges)
+            histograms = {k: v for k, v in other._histograms.items()}
+        with self._lock:
+            for key, value in counters.items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            self._gauges.update(gauges)
+            for key, histogram in histograms.items():
+                target = self._histograms.get(key)
+                if target is None:
+                    target = self._histograms[key] = Histogram(histogram.buckets)
+                target.merge(histogram)
+
+    def drain(self) -> "RunMetrics":
+        """Move everything collected so far into a new collection and reset this one."""
+        drained = RunMetrics(self.run_id)
+        with self._lock:
+            drained._counters, self._counters = self._counters, {}
+            drained._gauges, self._gauges = self._gauges, {}
+            drained._histograms, self._histograms = self._histograms, {}
+        return drained
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Picklable for worker processes; the lock is recreated on unpickling
+        with self._lock:
+            state = dict(self.__dict__)
+        del state["_lock"]
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def counter_value(self, name: str, **labels: Any) -> float:
+        """Return the current value of a counter (0 if never incremented)."""
+        with self._lock:
+            return self._counters.get((name, _label_key(labels)), 0)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Build a JSON-serializable summary."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        def grouped(items, render):
+            out: Dict[str, list] = {}
+            for (name, labels), value in items:
+                out.setdefault(name, []).append({"labels": dict(labels), **render(value)})
+            return out
+
+        summary: Dict[str, Any] = {
+            "run_id": self.run_id,
+            "started_at": self.started_at,
+            "counters": grouped(counters, lambda v: {"value": v}),
+            "gauges": grouped(gauges, lambda v: {"value": v}),
+            "histograms": grouped(histograms, lambda h: h.to_dict()),
+        }
+
+        hits = sum(
+            v for (n, l), v in counters if n == "cache_requests_total" and ("result", "hit") in l
+        )
+        total = sum(v for (n, _), v in counters if n == "cache_requests_total")
+        summary["cache_hit_rate"] = round(hits / total, 4) if total else None
+        return summary
+
+    def write_json(self, path: str) -> str:
+        """Write the JSON summary to ``path`` and return the path."""
+        target = Path(path)
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_text(json.dumps(self.to_dict(), indent=2), encoding="utf-8")
+        return str(target)
+
+    def to_prometheus(self, prefix: str = "ghost_hunter_") -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            gauges = sorted(self._gauges.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+
+        lines = []
+        declared = set()
+
+        def declare(name: str, kind: str) -> None:
+            if name in declared:
+                return
+            declared.add(name)
+            base = name[len(prefix):]
+            if base in METRIC_HELP:
+                lines.append(f"# HELP {name} {METRIC_HELP[base]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        for (name, labels), value in counters:
+            full = prefix + name
+            declare(full, "counter")
+            lines.append(f"{full}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), value in gauges:
+            full = prefix + name
+            declare(full, "gauge")
+            lines.append(f"{full}{_format_labels(labels)} {value:g}")
+
+        for (name, labels), histogram in histograms:
+            full = prefix + name
+            declare(full, "histogram")
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                bucket_labels = _format_labels(labels, {'le': f'{bound:g}'})
+                lines.append(f"{full}_bucket{bucket_labels} {cumulative}")
+            lines.append(f"{full}_bucket{_format_labels(labels, {'le': '+Inf'})} {histogram.count}")
+            lines.append(f"{full}_sum{_format_labels(labels)} {histogram.sum:.6f}")
+            lines.append(f"{full}_count{_format_labels(labels)} {histogram.count}")
+
+        return "\n".join(lines) + "\n"
+
+
+# Process-wide totals across all finished runs
+REGISTRY = RunMetrics(run_id="process")
+
+_current: contextvars.ContextVar[Optional[RunMetrics]] = contextvars.ContextVar(
+    "ghost_hunter_metrics", default=None
+)
+
+
+def current() -> RunMetrics:
+    """Return the metrics of the active run, or the process registry outside a run."""
+    return _current.get() or REGISTRY
+
+
+@contextmanager
+def activate(run_metrics: RunMetrics) -> Iterator[RunMetrics]:
+    """
+    Make ``run_metrics`` the active collection for the enclosed block.
+
+    On exit the run is merged into ``REGISTRY``.
+    """
+    token = _current.set(run_metrics)
+    try:
+        yield run_metrics
+    finally:
+        _current.reset(token)
+        REGISTRY.merge(run_metrics)
+
+
+def instrumented_tool(func: Callable[..., str]) -> Callable[..., str]:
+    """Decorator recording a tool ``_run`` call's latency under its class name."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> str:
+        with current().timer("tool_latency_seconds", tool=type(self).__name__):
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+def instrument_llm(llm: Any, route: str) -> Any:
+    """
+    Record the latency of every call an LLM instance makes under its model route.
+
+    The route is kept on the instance as ``metrics_route`` so token usage can be
+    attributed to the same route after the run (see ``record_llm_usage``).
+    """
+    call = llm.call
+
+    @functools.wraps(call)
+    def timed_call(*args: Any, **kwargs: Any) -> Any:
+        with current().timer("llm_latency_seconds", route=route, model=getattr(llm, "model", "")):
+            return call(*args, **kwargs)
+
+    llm.call = timed_call
+    llm.metrics_route = route
+    return llm
+
+
+# UsageMetrics fields recorded by ``RunMetrics.record_token_usage``
+_USAGE_FIELDS = ("prompt_tokens", "completion_tokens", "successful_requests")
+
+
+def record_llm_usage(run_metrics: RunMetrics, llms: Any, fallback_usage: Any = None) -> None:
+    """
+    Record token usage per model route from instrumented LLM instances.
+
+    Args:
+        run_metrics: Collection to record into
+        llms: LLM instances used by the run (duplicates and uninstrumented ones are skipped)
+        fallback_usage: Aggregate usage recorded without labels if no LLM was instrumented
+    """
+    seen = set()
+    for llm in llms:
+        route = getattr(llm, "metrics_route", None)
+        if route is None or id(llm) in seen or not hasattr(llm, "get_token_usage_summary"):
+            continue
+        seen.add(id(llm))
+        # Usage is cumulative per instance; record only what was used since the last
+        # run recorded it (instances are reused across runs by pool workers)
+        summary = llm.get_token_usage_summary()
+        usage = {field: getattr(summary, field, 0) or 0 for field in _USAGE_FIELDS}
+        baseline = getattr(llm, "metrics_usage_recorded", None) or dict.fromkeys(_USAGE_FIELDS, 0)
+        llm.metrics_usage_recorded = usage
+        run_metrics.record_token_usage(
+            {field: usage[field] - baseline[field] for field in _USAGE_FIELDS},
+            route=route,
+            model=getattr(llm, "model", "")
+        )
+    if not seen:
+        run_metrics.record_token_usage(fallback_usage)
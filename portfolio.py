@@ -0,0 +1,426 @@
+"""Columnar portfolio dataset for Ghost Office Hunter.
+
+Each finished investigation contributes one row of structured fields extracted
+from its report and run: risk rating, red-flag counts per category, ghost-office
+verdict, Shariah status and ratios, source counts and timings. Rows are appended
+as small immutable part files under ``PORTFOLIO_DIR`` (Parquet when ``pyarrow``
+is installed, CSV otherwise) and periodically compacted into a single file, so
+dashboards over thousands of companies read one columnar file instead of
+re-parsing every markdown report.
+
+Usage:
+    python portfolio.py summary
+    python portfolio.py compact --latest-only
+    python portfolio.py export portfolio.csv
+"""
+import argparse
+import re
+import sys
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import pandas as pd
+
+from config import Config
+from logger import setup_logger
+from red_flags import RED_FLAG_LEXICON, find_red_flags, term_category, term_weight
+from report_store import company_key, extract_risk_rating, extract_shariah_status
+
+try:
+    import pyarrow  # noqa: F401 - only needed by pandas' Parquet engine
+except ImportError:  # pragma: no cover - optional dependency
+    pyarrow = None
+
+logger = setup_logger()
+
+# Column name -> pandas dtype; the order is the column order of every file
+COLUMNS: Dict[str, str] = {
+    "company": "string",
+    "company_key": "string",
+    "run_id": "string",
+    "mode": "string",
+    "created_at": "float64",
+    "report_path": "string",
+    "timed_out": "boolean",
+    "risk_rating": "string",
+    "red_flag_score": "float64",
+    **{f"flags_{category}": "Int64" for category in RED_FLAG_LEXICON},
+    "red_flag_terms": "string",
+    "ghost_office_verdict": "string",
+    "shariah_status": "string",
+    "debt_ratio": "float64",
+    "cash_ratio": "float64",
+    "report_sources": "Int64",
+    "evidence_results": "Int64",
+    "search_queries": "Int64",
+    "run_seconds": "float64",
+    "llm_seconds": "float64",
+    "tool_seconds": "float64",
+    "llm_tokens": "Int64",
+}
+
+# Ghost-office verdicts
+INDICATED = "INDICATED"
+NOT_INDICATED = "NOT_INDICATED"
+INCONCLUSIVE = "INCONCLUSIVE"
+
+_HEADING_RE = re.compile(r"^(?:#{1,6}\s+|\*\*|\d+\.\s+\*\*).*$", re.MULTILINE)
+_GHOST_HEADING_RE = re.compile(
+    r"^(?:#{1,6}\s+|\*\*|\d+\.\s+\*\*).*ghost\s+office.*$", re.MULTILINE | re.IGNORECASE
+)
+_GHOST_CLEAR_RE = re.compile(
+    r"\bno\s+(?:evidence|indication|indicators|signs)\s+(?:of|that)\b"
+    r"[^.\n]{0,40}\b(?:ghost|virtual|shell)"
+    r"|\bnot\s+(?:a\s+)?(?:ghost|virtual)\s+office"
+    r"|\b(?:physical|operational)\s+presence\s+(?:is\s+|was\s+)?(?:confirmed|verified|established)",
+    re.IGNORECASE
+)
+_GHOST_FLAGGED_RE = re.compile(
+    r"\b(?:ghost|virtual)\s+office\b[^.\n]{0,60}"
+    r"\b(?:confirmed|likely|suspected|indicated|identified|detected)"
+    r"|\b(?:confirmed|likely|suspected|probable|potential)\s+(?:ghost|virtual)\s+office",
+    re.IGNORECASE
+)
+_URL_RE = re.compile(r"https?://[^\s)\]>\"'`]+")
+
+
+def _ratio_re(kind: str) -> "re.Pattern[str]":
+    return re.compile(
+        rf"{kind}[\s_-]*ratio[*_\s]*[:\-–]?[^0-9\n%]{{0,30}}?(\d{{1,4}}(?:\.\d+)?)\s*%",
+        re.IGNORECASE
+    )
+
+
+_DEBT_RATIO_RE = _ratio_re("debt")
+_CASH_RATIO_RE = _ratio_re("cash")
+
+
+def _section(body: str, heading_re: "re.Pattern[str]") -> Optional[str]:
+    """Return the text under the first heading matching ``heading_re``, up to the next heading."""
+    match = heading_re.search(body)
+    if not match:
+        return None
+    following = _HEADING_RE.search(body, match.end())
+    return body[match.end():following.start() if following else len(body)]
+
+
+def extract_ghost_office_verdict(body: str) -> Optional[str]:
+    """
+    Classify a report's ghost-office assessment.
+
+    Returns:
+        INDICATED, NOT_INDICATED or INCONCLUSIVE, or None if the report has no
+        ghost-office assessment
+    """
+    text = _section(body, _GHOST_HEADING_RE)
+    if text is None:
+        sentences = [
+            s for s in re.split(r"(?<=[.!?])\s+", body)
+            if re.search(r"ghost\s+office", s, re.IGNORECASE)
+        ]
+        if not sentences:
+            return None
+        text = " ".join(sentences)
+    if _GHOST_FLAGGED_RE.search(text):
+        return INDICATED
+    if _GHOST_CLEAR_RE.search(text):
+        return NOT_INDICATED
+    if any(term_category(term) == "ghost_office" for term in find_red_flags(text)):
+        return INDICATED
+    return INCONCLUSIVE
+
+
+def _extract_ratio(pattern: "re.Pattern[str]", body: str) -> Optional[float]:
+    match = pattern.search(body)
+    return float(match.group(1)) if match else None
+
+
+def _histogram_sum(summary: Dict[str, Any], name: str) -> float:
+    return round(sum(h.get("sum", 0.0) for h in summary.get("histograms", {}).get(name, [])), 3)
+
+
+def _counter_sum(summary: Dict[str, Any], name: str) -> float:
+    return sum(c.get("value", 0) for c in summary.get("counters", {}).get(name, []))
+
+
+def extract_record(
+    company: str,
+    body: str,
+    run_id: Optional[str] = None,
+    report_path: Optional[str] = None,
+    mode: str = "full",
+    timed_out: bool = False,
+    metrics_summary: Optional[Dict[str, Any]] = None,
+    evidence_set: Optional[Any] = None,
+    created_at: Optional[float] = None
+) -> Dict[str, Any]:
+    """
+    Extract one portfolio row from a finished investigation.
+
+    Args:
+        company: Company name as investigated
+        body: Full markdown report
+        run_id: Identifier of the run that produced the report
+        report_path: Path of the report file on disk
+        mode: "full" or "delta"
+        timed_out: Whether the report is partial because the deadline passed
+        metrics_summary: ``RunMetrics.to_dict()`` of the run, for timings and token usage
+        evidence_set: ``evidence.EvidenceSet`` of the run, for source counts
+        created_at: Row timestamp (default: now)
+
+    Returns:
+        Mapping of every column in ``COLUMNS`` to its value
+    """
+    flags = find_red_flags(body)
+    per_category = {category: 0 for category in RED_FLAG_LEXICON}
+    for term, count in flags.items():
+        per_category[term_category(term)] += count
+    summary = metrics_summary or {}
+
+    record: Dict[str, Any] = {
+        "company": company,
+        "company_key": company_key(company),
+        "run_id": run_id or uuid.uuid4().hex,
+        "mode": mode,
+        "created_at": created_at or time.time(),
+        "report_path": report_path,
+        "timed_out": timed_out,
+        "risk_rating": extract_risk_rating(body),
+        "red_flag_score": round(sum(term_weight(term) * count for term, count in flags.items()), 2),
+        **{f"flags_{category}": count for category, count in per_category.items()},
+        "red_flag_terms": "; ".join(term for term, _ in flags.most_common(10)) or None,
+        "ghost_office_verdict": extract_ghost_office_verdict(body),
+        "shariah_status": extract_shariah_status(body),
+        "debt_ratio": _extract_ratio(_DEBT_RATIO_RE, body),
+        "cash_ratio": _extract_ratio(_CASH_RATIO_RE, body),
+        "report_sources": len(set(_URL_RE.findall(body))),
+        "evidence_results": len(evidence_set.by_url()) if evidence_set is not None else None,
+        "search_queries": len(evidence_set.queries) if evidence_set is not None else None,
+        "run_seconds": _histogram_sum(summary, "run_duration_seconds") or None,
+        "llm_seconds": _histogram_sum(summary, "llm_latency_seconds") if summary else None,
+        "tool_seconds": _histogram_sum(summary, "tool_latency_seconds") if summary else None,
+        "llm_tokens": int(_counter_sum(summary, "llm_tokens_total")) if summary else None,
+    }
+    return record
+
+
+def _frame(records: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    """Build a DataFrame with the portfolio schema from row dicts."""
+    frame = pd.DataFrame.from_records(list(records), columns=list(COLUMNS))
+    return _conform(frame)
+
+
+def _conform(frame: pd.DataFrame) -> pd.DataFrame:
+    """Add missing columns and apply the schema dtypes."""
+    for column in COLUMNS:
+        if column not in frame.columns:
+            frame[column] = None
+    return frame[list(COLUMNS)].astype(COLUMNS)
+
+
+class PortfolioDataset:
+    """Append-only columnar dataset of investigation summaries."""
+
+    def __init__(self, root: str, file_format: Optional[str] = None):
+        """
+        Args:
+            root: Directory holding the part files (created if missing)
+            file_format: "parquet" or "csv" (default: Parquet if pyarrow is installed)
+        """
+        self.format = file_format or ("parquet" if pyarrow is not None else "csv")
+        if self.format == "parquet" and pyarrow is None:
+            raise RuntimeError("Parquet portfolio output requires 'pyarrow'; install it or use CSV")
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._cache: Optional[Tuple[Tuple[Tuple[str, float], ...], pd.DataFrame]] = None
+
+    def parts(self) -> List[Path]:
+        """Data files currently in the dataset, oldest first."""
+        files = [p for p in self.root.iterdir() if p.suffix in (".parquet", ".csv") and p.is_file()]
+        return sorted(files, key=lambda p: p.name.split("-", 1)[1] if "-" in p.name else p.name)
+
+    def _write(self, frame: pd.DataFrame, prefix: str) -> Path:
+        """Write a frame to a new, uniquely named file atomically."""
+        name = f"{prefix}-{time.time_ns():020d}-{uuid.uuid4().hex[:8]}.{self.format}"
+        target = self.root / name
+        tmp = target.with_name(target.name + ".tmp")
+        if self.format == "parquet":
+            frame.to_parquet(tmp, index=False)
+        else:
+            frame.to_csv(tmp, index=False)
+        tmp.replace(target)
+        return target
+
+    @staticmethod
+    def _read(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+        if path.suffix == ".parquet":
+            frame = pd.read_parquet(path, columns=columns)
+        else:
+            frame = pd.read_csv(path, usecols=columns)
+        return frame
+
+    def append(self, records: Sequence[Dict[str, Any]]) -> Optional[Path]:
+        """
+        Append rows as a new part file.
+
+        Returns:
+            Path of the written part, or None if there was nothing to write
+        """
+        if not records:
+            return None
+        return self._write(_frame(records), "part")
+
+    def load(self, columns: Optional[List[str]] = None, latest_only: bool = False) -> pd.DataFrame:
+        """
+        Read the dataset.
+
+        Args:
+            columns: Columns to return (default: all)
+            latest_only: Keep only the most recent run per company
+
+        Returns:
+            DataFrame ordered by ``created_at``
+        """
+        parts = self.parts()
+        key = tuple((p.name, p.stat().st_mtime) for p in parts)
+        with self._lock:
+            cached = self._cache
+        if cached is not None and cached[0] == key:
+            frame = cached[1]
+        else:
+            frames = [self._read(p) for p in parts]
+            frame = (
+                pd.concat([_conform(f) for f in frames], ignore_index=True)
+                if frames else _frame([])
+            )
+            # A compaction racing with a reader can briefly leave a run in two files
+            frame = frame.drop_duplicates("run_id", keep="last")
+            frame = frame.sort_values("created_at", kind="stable")
+            frame = frame.reset_index(drop=True)
+            with self._lock:
+                self._cache = (key, frame)
+        if latest_only:
+            frame = frame.drop_duplicates("company_key", keep="last").reset_index(drop=True)
+        return frame[columns] if columns else frame.copy()
+
+    def compact(self, latest_only: bool = False) -> int:
+        """
+        Merge all part files into one file.
+
+        Args:
+            latest_only: Also drop every run except the most recent per company
+
+        Returns:
+            Number of files merged (0 if there was nothing to do)
+        """
+        with self._lock:
+            parts = self.parts()
+            if len(parts) < 2 and not latest_only:
+                return 0
+            frames = [_conform(self._read(p)) for p in parts]
+            frame = pd.concat(frames, ignore_index=True) if frames else _frame([])
+            frame = frame.drop_duplicates("run_id", keep="last")
+            frame = frame.sort_values("created_at", kind="stable")
+            if latest_only:
+                frame = frame.drop_duplicates("company_key", keep="last")
+            self._write(frame.reset_index(drop=True), "compacted")
+            # Only the files read above are removed; parts appended meanwhile survive
+            for part in parts:
+                part.unlink(missing_ok=True)
+            self._cache = None
+        logger.info("Compacted %d portfolio files (%d rows)", len(parts), len(frame))
+        return len(parts)
+
+    def maybe_compact(self, max_parts: Optional[int] = None) -> int:
+        """Compact once the number of part files exceeds ``max_parts``."""
+        max_parts = max_parts or Config.PORTFOLIO_COMPACT_PARTS
+        if len(self.parts()) <= max_parts:
+            return 0
+        return self.compact()
+
+
+_datasets: Dict[str, PortfolioDataset] = {}
+_datasets_lock = threading.Lock()
+
+
+def get_portfolio(root: Optional[str] = None) -> Optional[PortfolioDataset]:
+    """
+    Return the shared dataset for ``root`` (default ``Config.PORTFOLIO_DIR``).
+
+    Returns:
+        PortfolioDataset instance, or None if portfolio output is disabled
+    """
+    root = root or Config.PORTFOLIO_DIR
+    if not root:
+        return None
+    with _datasets_lock:
+        dataset = _datasets.get(root)
+        if dataset is None:
+            dataset = _datasets[root] = PortfolioDataset(
+                root, file_format=Config.PORTFOLIO_FORMAT or None
+            )
+        return dataset
+
+
+def summarize(frame: pd.DataFrame) -> Dict[str, Any]:
+    """Portfolio-level counts over the latest run per company."""
+    return {
+        "companies": int(frame["company_key"].nunique()),
+        "risk_rating": frame["risk_rating"].fillna("UNKNOWN").value_counts().to_dict(),
+        "ghost_office_verdict": (
+            frame["ghost_office_verdict"].fillna("UNKNOWN").value_counts().to_dict()
+        ),
+        "shariah_status": frame["shariah_status"].dropna().value_counts().to_dict(),
+        "timed_out": int(frame["timed_out"].fillna(False).sum()),
+        "median_run_seconds": (
+            float(frame["run_seconds"].median()) if frame["run_seconds"].notna().any() else None
+        ),
+    }
+
+
+def main() -> int:
+    """CLI entry point."""
+    parser = argparse.ArgumentParser(description="Ghost Office Hunter portfolio dataset")
+    parser.add_argument("--dir", default=None, help="Dataset directory (default: PORTFOLIO_DIR)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser(
+        "summary", help="Print risk, ghost-office and Shariah counts over the latest runs"
+    )
+    compact = sub.add_parser("compact", help="Merge part files into a single file")
+    compact.add_argument(
+        "--latest-only", action="store_true", help="Keep only the latest run per company"
+    )
+    export = sub.add_parser("export", help="Write the dataset to a single .csv or .parquet file")
+    export.add_argument("path")
+    export.add_argument(
+        "--latest-only", action="store_true", help="Export only the latest run per company"
+    )
+    args = parser.parse_args()
+
+    dataset = get_portfolio(args.dir)
+    if dataset is None:
+        print("Portfolio output is disabled (PORTFOLIO_DIR is empty)", file=sys.stderr)
+        return 1
+
+    if args.command == "summary":
+        for name, value in summarize(dataset.load(latest_only=True)).items():
+            print(f"{name}: {value}")
+    elif args.command == "compact":
+        merged = dataset.compact(latest_only=args.latest_only)
+        print(f"Merged {merged} files into one" if merged else "Nothing to compact")
+    elif args.command == "export":
+        frame = dataset.load(latest_only=args.latest_only)
+        if args.path.endswith(".parquet"):
+            frame.to_parquet(args.path, index=False)
+        else:
+            frame.to_csv(args.path, index=False)
+        print(f"Wrote {len(frame)} rows to {args.path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
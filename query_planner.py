@@ -0,0 +1,235 @@
+"""Search query planning for Ghost Office Hunter.
+
+The ReAct loop tends to issue many near-duplicate searches ("X fraud",
+"X fraud news", "X collapse liquidators"), each costing a DDGS call and an LLM
+turn. A ``QueryPlanner`` sits in front of the search tool for one
+investigation and:
+
+* normalizes queries and serves near-duplicates from earlier results;
+* merges several keyword searches about the same subject into one OR-query;
+* enforces a per-investigation search budget, telling the agent when it is spent.
+"""
+import re
+import threading
+from dataclasses import dataclass, field
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+import metrics
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+# Words that do not change what a web search returns
+_STOPWORDS = frozenset({
+    "a", "an", "and", "the", "of", "for", "in", "on", "at", "to", "by", "with", "about",
+    "news", "latest", "recent", "information", "info", "details", "search", "find", "any",
+})
+
+_TOKEN_RE = re.compile(r'"[^"]+"|[\w&.\'-]+', re.UNICODE)
+
+# Separators the agent can use to pass several searches in one tool call
+QUERY_SEPARATORS = re.compile(r"\s*(?:;|\n|\|\|)\s*")
+
+
+def tokenize(query: str) -> List[str]:
+    """Split a query into lowercase tokens, keeping quoted phrases whole."""
+    tokens = []
+    for token in _TOKEN_RE.findall(query):
+        token = token.lower().strip(".'-")
+        if token.upper() == "OR" or not token:
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def normalize(query: str) -> FrozenSet[str]:
+    """Order-, case- and stopword-insensitive signature of a query."""
+    return frozenset(t.strip('"') for t in tokenize(query) if t.strip('"') not in _STOPWORDS)
+
+
+def similarity(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    """Jaccard similarity of two query signatures."""
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+def split_queries(text: str) -> List[str]:
+    """Split tool input into individual queries, dropping blanks and exact repeats."""
+    return list(dict.fromkeys(q.strip() for q in QUERY_SEPARATORS.split(text) if q.strip()))
+
+
+def _common_prefix(word_lists: List[List[str]]) -> int:
+    """Number of leading words (case-insensitive) shared by all lists."""
+    length = 0
+    for words in zip(*word_lists):
+        if len({w.lower() for w in words}) != 1:
+            break
+        length += 1
+    return length
+
+
+def merge_queries(queries: List[str]) -> List[Tuple[str, List[str]]]:
+    """
+    Merge queries that share a leading subject into combined OR-queries.
+
+    ``["Acme Pte fraud", "Acme Pte collapse liquidators", "Beta sanctions"]``
+    becomes ``[('Acme Pte (fraud OR "collapse liquidators")', [both Acme
+    queries]), ("Beta sanctions", ["Beta sanctions"])]``.
+
+    Args:
+        queries: Individual search queries
+
+    Returns:
+        List of (query to execute, original queries it covers)
+    """
+    groups: Dict[str, List[str]] = {}
+    for query in queries:
+        words = query.split()
+        groups.setdefault(words[0].lower() if words else "", []).append(query)
+
+    merged: List[Tuple[str, List[str]]] = []
+    for members in groups.values():
+        word_lists = [m.split() for m in members]
+        prefix = _common_prefix(word_lists)
+        if len(members) == 1 or not Config.SEARCH_SUPPORTS_OR or prefix == 0:
+            merged.extend((m, [m]) for m in members)
+            continue
+        subject = " ".join(word_lists[0][:prefix])
+        keywords = []
+        for words in word_lists:
+            rest = words[prefix:]
+            if rest:
+                keywords.append(f'"{" ".join(rest)}"' if len(rest) > 1 else rest[0])
+        if not keywords:
+            merged.append((subject, members))
+        else:
+            merged.append((f"{subject} ({' OR '.join(dict.fromkeys(keywords))})", members))
+    return merged
+
+
+@dataclass
+class PlannedSearch:
+    """Outcome of planning one query."""
+
+    query: str
+    execute: Optional[str] = None
+    results: Optional[List[Dict[str, Any]]] = None
+    note: str = ""
+    covers: List[str] = field(default_factory=list)
+
+
+class QueryPlanner:
+    """Per-investigation planner deduplicating, merging and budgeting searches."""
+
+    def __init__(self, budget: Optional[int] = None, duplicate_threshold: Optional[float] = None):
+        """
+        Args:
+            budget: Maximum upstream searches for the investigation (0 = unlimited)
+            duplicate_threshold: Similarity at or above which a query counts as a near-duplicate
+        """
+        self.budget = Config.SEARCH_BUDGET if budget is None else budget
+        self.duplicate_threshold = duplicate_threshold or Config.SEARCH_DUPLICATE_THRESHOLD
+        self.executed = 0
+        self._history: List[Tuple[FrozenSet[str], str, List[Dict[str, Any]]]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def remaining(self) -> Optional[int]:
+        """Searches left in the budget (None if unlimited)."""
+        return None if not self.budget else max(0, self.budget - self.executed)
+
+    def find_duplicate(self, query: str) -> Optional[Tuple[str, List[Dict[str, Any]]]]:
+        """
+        Return (earlier query, results) if ``query`` adds nothing to an earlier search.
+
+        A query is a near-duplicate when its signature is similar enough to an
+        earlier one (including each query covered by a merged search). Broader
+        or narrower queries are not duplicates: results for "Acme registered
+        office address" do not answer "Acme" or "Acme directors".
+        """
+        signature = normalize(query)
+        with self._lock:
+            for earlier_signature, earlier_query, results in reversed(self._history):
+                if similarity(signature, earlier_signature) >= self.duplicate_threshold:
+                    return earlier_query, results
+        return None
+
+    def plan(self, queries: List[str]) -> List[PlannedSearch]:
+        """
+        Plan a batch of queries from one tool call.
+
+        Near-duplicates are answered from history, the rest are merged where
+        possible, and only as many searches as the budget allows are scheduled.
+
+        Returns:
+            One PlannedSearch per executed/served query; ``execute`` is set for
+            searches to run and ``results`` for those answered from history
+        """
+        registry = metrics.current()
+        planned: List[PlannedSearch] = []
+        fresh: List[str] = []
+        for query in queries:
+            duplicate = self.find_duplicate(query)
+            if duplicate is not None:
+                earlier, results = duplicate
+                registry.increment("search_planner_total", outcome="duplicate")
+                planned.append(PlannedSearch(
+                    query=query, results=results,
+                    note=f"Near-duplicate of earlier search '{earlier}'; showing those results."
+                ))
+            else:
+                fresh.append(query)
+
+        for execute, covers in merge_queries(fresh):
+            with self._lock:
+                allowed = not self.budget or self.executed < self.budget
+                if allowed:
+                    self.executed += 1
+            if not allowed:
+                registry.increment("search_planner_total", outcome="budget_exhausted")
+                planned.append(
+                    PlannedSearch(query=execute, covers=covers, note=self.budget_message())
+                )
+                continue
+            if len(covers) > 1:
+                registry.increment("search_planner_total", outcome="merged")
+                logger.info("Merged %d searches into: %s", len(covers), execute)
+            registry.increment("search_planner_total", outcome="executed")
+            planned.append(PlannedSearch(query=execute, execute=execute, covers=covers))
+        return planned
+
+    def refund(self, planned: PlannedSearch) -> None:
+        """Return the budget slot of a scheduled search that failed upstream."""
+        if planned.execute is None:
+            return
+        with self._lock:
+            self.executed = max(0, self.executed - 1)
+        metrics.current().increment("search_planner_total", outcome="refunded")
+
+    def record(self, planned: PlannedSearch, results: List[Dict[str, Any]]) -> None:
+        """Remember an executed search so later near-duplicates can be served from it."""
+        signature = normalize(planned.execute or planned.query)
+        for covered in planned.covers:
+            signature |= normalize(covered)
+        with self._lock:
+            self._history.append((signature, planned.query, results))
+            for covered in planned.covers:
+                if covered != planned.query:
+                    self._history.append((normalize(covered), planned.query, results))
+
+    def budget_message(self) -> str:
+        """Feedback for the agent once the search budget is spent."""
+        return (
+            f"Search budget exhausted: all {self.budget} searches for this investigation "
+            "have been used. Do not search again; base your analysis and final report on "
+            "the results you already have."
+        )
+
+    def budget_note(self) -> str:
+        """Short status line appended to tool output."""
+        remaining = self.remaining
+        if remaining is None:
+            return ""
+        return f"[Search budget: {remaining} of {self.budget} searches left for this investigation]"
@@ -0,0 +1,114 @@
+"""Red-flag lexicons shared by the investigation prompt and rule-based triage."""
+import re
+from collections import Counter
+from typing import Dict, Tuple
+
+# Adverse media terms the investigator is told to search for (see ``tasks.investigation_task``)
+ADVERSE_MEDIA_TERMS: Tuple[str, ...] = (
+    "fraud",
+    "collapse",
+    "arrest",
+    "investigation",
+    "liquidators",
+    "MAS penalty",
+    "bankruptcy",
+    "sanctions",
+    "regulatory action",
+)
+
+# Weighted lexicon used to pre-score search results; weights reflect how strongly a
+# term indicates an entity worth a full investigation. Words that ordinary finance
+# news or company-directory pages use for any company ("default", "penalty",
+# "registered office address") are left out or weighted low.
+RED_FLAG_LEXICON: Dict[str, Dict[str, float]] = {
+    "adverse_media": {
+        "fraud": 5.0,
+        "collapse": 4.0,
+        "arrest": 4.0,
+        "investigation": 0.5,
+        "liquidators": 5.0,
+        "MAS penalty": 6.0,
+        "bankruptcy": 4.0,
+        "sanctions": 5.0,
+        "regulatory action": 4.0,
+        "money laundering": 6.0,
+        "ponzi": 6.0,
+        "scam": 4.0,
+        "charged": 3.0,
+        "convicted": 5.0,
+        "lawsuit": 2.0,
+        "winding up": 4.0,
+        "judicial management": 4.0,
+        "insolvent": 4.0,
+    },
+    "ghost_office": {
+        "virtual office": 3.0,
+        "co-working": 2.0,
+        "coworking": 2.0,
+        "shared office": 2.0,
+        "serviced office": 2.0,
+        "corporate secretarial": 1.0,
+        "mail forwarding": 3.0,
+    },
+    "corporate_structure": {
+        "shell company": 5.0,
+        "nominee director": 4.0,
+        "nominee shareholder": 4.0,
+        "struck off": 3.0,
+        "offshore": 2.0,
+        "british virgin islands": 2.0,
+        "cayman islands": 1.5,
+    },
+}
+
+
+def _key(term: str) -> str:
+    """Case-, space- and hyphen-insensitive lookup key for a term."""
+    return " ".join(re.split(r"[\s\-]+", term.lower().strip()))
+
+
+_TERM_WEIGHTS: Dict[str, Tuple[str, float]] = {
+    _key(term): (category, weight)
+    for category, terms in RED_FLAG_LEXICON.items()
+    for term, weight in terms.items()
+}
+# Longest terms first so a term wins over any shorter term it contains
+_TERM_PATTERN = re.compile(
+    r"\b(" + "|".join(
+        r"[\s\-]+".join(re.escape(word) for word in term.split())
+        for term in sorted(_TERM_WEIGHTS, key=len, reverse=True)
+    ) + r")\b",
+    re.IGNORECASE
+)
+
+
+def find_red_flags(text: str) -> Counter:
+    """
+    Count lexicon terms occurring in a piece of text.
+
+    Args:
+        text: Text to scan (e.g. a search result title and snippet)
+
+    Returns:
+        Counter of normalized lexicon term (lowercase, single spaces) to occurrences
+    """
+    hits: Counter = Counter()
+    for match in _TERM_PATTERN.finditer(text):
+        hits[_key(match.group(1))] += 1
+    return hits
+
+
+def term_weight(term: str) -> float:
+    """Weight of a lexicon term (0 if unknown)."""
+    return _TERM_WEIGHTS.get(_key(term), ("", 0.0))[1]
+
+
+def term_category(term: str) -> str:
+    """Lexicon category of a term ('' if unknown)."""
+    return _TERM_WEIGHTS.get(_key(term), ("", 0.0))[0]
+
+
+def adverse_media_prompt_list() -> str:
+    """Render the adverse media terms as a quoted prose list for prompts."""
+    quoted = [f'"{term}"' for term in ADVERSE_MEDIA_TERMS]
+    return ", ".join(quoted[:-1]) + f", and {quoted[-1]}"
@@ -0,0 +1,160 @@
+"""Incremental report writing for Ghost Office Hunter."""
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+from logger import setup_logger
+
+logger = setup_logger()
+
+SectionCallback = Callable[[str, str], None]
+
+# Title of the notice section closing a partial report
+INCOMPLETE_SECTION = "Incomplete Report"
+
+
+class ReportWriter:
+    """
+    Stream report sections to disk as each task completes.
+
+    Sections are appended to a ``.partial`` file next to the final report so
+    analysts can follow progress, and the finished report is moved into place
+    atomically by ``finalize``.
+    """
+
+    def __init__(
+        self,
+        output_path: str,
+        on_section: Optional[SectionCallback] = None,
+        preamble: str = ""
+    ):
+        """
+        Args:
+            output_path: Final path of the report file
+            on_section: Optional callback invoked with (title, content) for each section
+            preamble: Existing report content that new sections are appended to
+        """
+        self.output_path = Path(output_path)
+        self.output_path.parent.mkdir(parents=True, exist_ok=True)
+        self.partial_path = self.output_path.with_name(self.output_path.name + ".partial")
+        self.on_section = on_section
+        self.preamble = preamble.rstrip()
+        self.sections: List[Tuple[str, str]] = []
+        self.incomplete = False
+        # Start the partial file for this run from the preamble (if any)
+        self.partial_path.write_text(self.preamble, encoding="utf-8")
+
+    def append_section(self, title: str, content: str) -> None:
+        """
+        Append a completed section to the partial report and notify listeners.
+
+        Args:
+            title: Section heading (typically the agent role)
+            content: Markdown content produced by the task
+        """
+        if self.incomplete:
+            # The run was abandoned; output from the still-running crew is discarded
+            logger.debug("Ignoring late report section: %s", title)
+            return
+        self._write_section(title, content)
+
+    def mark_incomplete(
+        self,
+        reason: str,
+        status: str = "TIMED OUT",
+        advice: str = "re-run the investigation with a longer deadline for a full assessment."
+    ) -> None:
+        """
+        Close the report early with a notice that it is partial.
+
+        Later sections are ignored, so a crew that keeps running in the
+        background cannot change the report after it was cut off.
+
+        Args:
+            reason: Why the investigation did not complete (e.g. a timeout)
+            status: Label shown in the notice heading
+            advice: What to do for a full assessment
+        """
+        if self.incomplete:
+            return
+        completed = ", ".join(title for title, _ in self.sections) or "none"
+        self._write_section(
+            INCOMPLETE_SECTION,
+            f"## ⚠️ Incomplete Report — {status}\n\n{reason}\n\n"
+            f"Sections completed before the cut-off: {completed}. "
+            f"Findings above may be partial; {advice}"
+        )
+        self.incomplete = True
+
+    def _write_section(self, title: str, content: str) -> None:
+        self.sections.append((title, content))
+        with open(self.partial_path, "a", encoding="utf-8") as f:
+            first = len(self.sections) == 1 and not self.preamble
+            f.write(self._format_section(title, content, first=first))
+            f.flush()
+        logger.info("Report section ready: %s", title)
+
+        if self.on_section:
+            try:
+                self.on_section(title, content)
+            except Exception as e:
+                # A broken listener must never abort the investigation
+                logger.warning("Report section callback failed: %s", e)
+
+    def task_callback(self, output: Any) -> None:
+        """
+        CrewAI ``task_callback`` adapter.
+
+        Args:
+            output: TaskOutput emitted by CrewAI when a task finishes
+        """
+        title = getattr(output, "agent", None) or getattr(output, "name", None) or "Task"
+        content = getattr(output, "raw", None) or str(output)
+        self.append_section(str(title).strip(), content)
+
+    def render(self) -> str:
+        """Render the preamble and all sections received so far as a single markdown document."""
+        return self.preamble + "".join(
+            self._format_section(title, content, first=i == 0 and not self.preamble)
+            for i, (title, content) in enumerate(self.sections)
+        )
+
+    def finalize(self, fallback: Optional[str] = None) -> str:
+        """
+        Atomically write the complete report to its final path.
+
+        Args:
+            fallback: Report text to use if no task sections were received
+
+        Returns:
+            Path to the finalized report file
+        """
+        if self.sections:
+            content = self.render()
+        elif self.preamble and fallback:
+            content = self.preamble + self._format_section("Report", fallback, first=False)
+        else:
+            content = self.preamble or fallback or ""
+
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=f".{self.output_path.name}.", suffix=".tmp", dir=self.output_path.parent
+        )
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(content)
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.output_path)
+        except BaseException:
+            Path(tmp_path).unlink(missing_ok=True)
+            raise
+
+        self.partial_path.unlink(missing_ok=True)
+        return str(self.output_path)
+
+    @staticmethod
+    def _format_section(title: str, content: str, first: bool) -> str:
+        """Format a section, separating it from the previous one."""
+        separator = "" if first else "\n\n---\n\n"
+        return f"{separator}<!-- section: {title} -->\n{content.strip()}\n"
@@ -0,0 +1,316 @@
+"""Indexed report store for Ghost Office Hunter.
+
+Every finished report is recorded in an embedded SQLite database together with
+its metadata (company, timestamp, risk rating, Shariah status, input hash and
+run metrics). Report bodies are indexed with FTS5 for full-text search, and
+each company keeps a versioned history instead of overwriting earlier runs.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    id INTEGER PRIMARY KEY,
+    company TEXT NOT NULL,
+    company_key TEXT NOT NULL,
+    version INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    risk_rating TEXT,
+    shariah_status TEXT,
+    input_hash TEXT NOT NULL,
+    run_id TEXT,
+    report_path TEXT,
+    metrics_json TEXT,
+    body TEXT NOT NULL,
+    UNIQUE (company_key, version)
+);
+CREATE INDEX IF NOT EXISTS idx_reports_company ON reports (company_key, version DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_created ON reports (created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_reports_input_hash ON reports (input_hash);
+"""
+
+_FTS_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS reports_fts USING fts5 (
+    company, body, content='reports', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS reports_fts_insert AFTER INSERT ON reports BEGIN
+    INSERT INTO reports_fts (rowid, company, body) VALUES (new.id, new.company, new.body);
+END;
+CREATE TRIGGER IF NOT EXISTS reports_fts_delete AFTER DELETE ON reports BEGIN
+    INSERT INTO reports_fts (reports_fts, rowid, company, body)
+    VALUES ('delete', old.id, old.company, old.body);
+END;
+"""
+
+_SUMMARY_COLUMNS = (
+    "id, company, version, created_at, risk_rating, shariah_status, "
+    "input_hash, run_id, report_path"
+)
+
+_RISK_RATING_RE = re.compile(
+    r"risk\s*(?:rating|level)[*_\s]*[:\-–]?[*_\s]*(critical|high|medium|moderate|low)",
+    re.IGNORECASE
+)
+_SHARIAH_STATUS_RE = re.compile(
+    r"(?:overall\s+(?:compliance\s+)?)?status[*_\s]*[:\-–]?[*_\s]*"
+    r"(pass|fail|non-compliant|compliant)",
+    re.IGNORECASE
+)
+
+
+def company_key(company: str) -> str:
+    """Normalize a company name for lookups (case and whitespace insensitive)."""
+    return " ".join(company.lower().split())
+
+
+def extract_risk_rating(body: str) -> Optional[str]:
+    """Extract the headline risk rating from a report, if stated."""
+    match = _RISK_RATING_RE.search(body)
+    return match.group(1).upper() if match else None
+
+
+def extract_shariah_status(body: str) -> Optional[str]:
+    """Extract the overall Shariah PASS/FAIL status from a report, if present."""
+    if "shariah" not in body.lower():
+        return None
+    match = _SHARIAH_STATUS_RE.search(body)
+    if not match:
+        return None
+    status = match.group(1).upper()
+    return "FAIL" if status in ("FAIL", "NON-COMPLIANT") else "PASS"
+
+
+def compute_input_hash(company: str, **inputs: Any) -> str:
+    """Stable hash of the inputs that determine an investigation."""
+    payload = json.dumps({"company": company_key(company), **inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class StoredReport:
+    """Metadata for one stored report version."""
+
+    id: int
+    company: str
+    version: int
+    created_at: float
+    risk_rating: Optional[str]
+    shariah_status: Optional[str]
+    input_hash: str
+    run_id: Optional[str]
+    report_path: Optional[str]
+    snippet: Optional[str] = None
+
+
+class ReportStore:
+    """SQLite-backed report store with FTS5 full-text search."""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.fts_enabled = False
+        self._init_schema()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Open a short-lived connection; safe across threads and processes."""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+            try:
+                conn.executescript(_FTS_SCHEMA)
+                self.fts_enabled = True
+            except sqlite3.OperationalError as e:
+                # SQLite builds without FTS5 fall back to LIKE scans
+                logger.warning("FTS5 unavailable, report search will use LIKE: %s", e)
+
+    def add(
+        self,
+        company: str,
+        body: str,
+        input_hash: str,
+        run_id: Optional[str] = None,
+        report_path: Optional[str] = None,
+        metrics: Optional[Dict[str, Any]] = None,
+        risk_rating: Optional[str] = None,
+        shariah_status: Optional[str] = None
+    ) -> StoredReport:
+        """
+        Store a new report version for a company.
+
+        Args:
+            company: Company name as investigated
+            body: Full markdown report
+            input_hash: Hash of the investigation inputs (see ``compute_input_hash``)
+            run_id: Identifier of the run that produced the report
+            report_path: Path of the report file on disk
+            metrics: Run metrics summary
+            risk_rating: Risk rating; extracted from the body if omitted
+            shariah_status: Shariah PASS/FAIL; extracted from the body if omitted
+
+        Returns:
+            Metadata of the stored version
+        """
+        key = company_key(company)
+        risk_rating = risk_rating or extract_risk_rating(body)
+        shariah_status = shariah_status or extract_shariah_status(body)
+        created_at = time.time()
+
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                version = conn.execute(
+                    "SELECT COALESCE(MAX(version), 0) + 1 FROM reports WHERE company_key = ?",
+                    (key,)
+                ).fetchone()[0]
+                cursor = conn.execute(
+                    "INSERT INTO reports (company, company_key, version, created_at, risk_rating, "
+                    "shariah_status, input_hash, run_id, report_path, metrics_json, body) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        company, key, version, created_at, risk_rating, shariah_status, input_hash,
+                        run_id, report_path, json.dumps(metrics) if metrics else None, body
+                    )
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+        return StoredReport(
+            id=cursor.lastrowid, company=company, version=version, created_at=created_at,
+            risk_rating=risk_rating, shariah_status=shariah_status, input_hash=input_hash,
+            run_id=run_id, report_path=report_path
+        )
+
+    def get_body(self, report_id: int) -> Optional[str]:
+        """Return the markdown body of a stored report."""
+        with self._connect() as conn:
+            row = conn.execute("SELECT body FROM reports WHERE id = ?", (report_id,)).fetchone()
+        return row["body"] if row else None
+
+    def get_metrics(self, report_id: int) -> Optional[Dict[str, Any]]:
+        """Return the run metrics stored with a report."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT metrics_json FROM reports WHERE id = ?", (report_id,)
+            ).fetchone()
+        return json.loads(row["metrics_json"]) if row and row["metrics_json"] else None
+
+    def latest(self, company: str) -> Optional[StoredReport]:
+        """Return the most recent version for a company."""
+        history = self.history(company, limit=1)
+        return history[0] if history else None
+
+    def history(self, company: str, limit: int = 50) -> List[StoredReport]:
+        """Return a company's report versions, newest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports WHERE company_key = ? "
+                "ORDER BY version DESC LIMIT ?",
+                (company_key(company), limit)
+            ).fetchall()
+        return [StoredReport(**dict(row)) for row in rows]
+
+    def recent(self, limit: int = 50) -> List[StoredReport]:
+        """Return the most recently stored reports across all companies."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports ORDER BY created_at DESC LIMIT ?", (limit,)
+            ).fetchall()
+        return [StoredReport(**dict(row)) for row in rows]
+
+    def find_by_input_hash(self, input_hash: str) -> Optional[StoredReport]:
+        """Return the newest report produced from identical inputs."""
+        with self._connect() as conn:
+            row = conn.execute(
+                f"SELECT {_SUMMARY_COLUMNS} FROM reports WHERE input_hash = ? "
+                "ORDER BY created_at DESC LIMIT 1",
+                (input_hash,)
+            ).fetchone()
+        return StoredReport(**dict(row)) if row else None
+
+    def search(self, query: str, limit: int = 50) -> List[StoredReport]:
+        """
+        Full-text search over report bodies and company names.
+
+        Args:
+            query: Search terms (FTS5 query syntax when available)
+            limit: Maximum number of results
+
+        Returns:
+            Matching reports, best match first, with a highlighted snippet
+        """
+        query = query.strip()
+        if not query:
+            return self.recent(limit)
+
+        with self._connect() as conn:
+            if self.fts_enabled:
+                columns = ", ".join(f"r.{c.strip()}" for c in _SUMMARY_COLUMNS.split(","))
+                sql = (
+                    f"SELECT {columns}, snippet(reports_fts, 1, '**', '**', ' … ', 16) AS snippet "
+                    "FROM reports_fts JOIN reports r ON r.id = reports_fts.rowid "
+                    "WHERE reports_fts MATCH ? ORDER BY bm25(reports_fts) LIMIT ?"
+                )
+                try:
+                    rows = conn.execute(sql, (query, limit)).fetchall()
+                except sqlite3.OperationalError:
+                    # Treat input that isn't valid FTS syntax as a literal phrase
+                    phrase = '"' + query.replace('"', '""') + '"'
+                    rows = conn.execute(sql, (phrase, limit)).fetchall()
+            else:
+                pattern = f"%{query}%"
+                rows = conn.execute(
+                    f"SELECT {_SUMMARY_COLUMNS}, NULL AS snippet FROM reports "
+                    "WHERE body LIKE ? OR company LIKE ? ORDER BY created_at DESC LIMIT ?",
+                    (pattern, pattern, limit)
+                ).fetchall()
+        return [StoredReport(**dict(row)) for row in rows]
+
+
+_stores: Dict[str, ReportStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_report_store(db_path: Optional[str] = None) -> Optional[ReportStore]:
+    """
+    Return the shared store for ``db_path`` (default ``Config.REPORT_DB``).
+
+    Returns:
+        ReportStore instance, or None if the store is disabled
+    """
+    db_path = db_path or Config.REPORT_DB
+    if not db_path:
+        return None
+    with _stores_lock:
+        store = _stores.get(db_path)
+        if store is None:
+            store = _stores[db_path] = ReportStore(db_path)
+        return store
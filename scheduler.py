@@ -0,0 +1,496 @@
+#!/usr/bin/env python3
+"""Watchlist monitoring scheduler for Ghost Office Hunter.
+
+Keeps a persistent watchlist of companies with their last run time and risk
+rating, and continuously re-screens it. The next company is always the one
+with the highest priority, combining staleness with prior risk, so a HIGH-risk
+entity is revisited sooner than a LOW-risk one that was checked at the same
+time. Investigations run under a global concurrency limit and an hourly rate
+budget, and the queue state and the budget's recent start times survive
+restarts. A run whose report is marked incomplete (failed delta searches, a
+timeout) counts as failed, so the entry is retried rather than treated as
+freshly screened::
+
+    python scheduler.py add "Three Arrows Capital"
+    python scheduler.py import companies.txt
+    python scheduler.py list
+    python scheduler.py run --workers 2 --rate 12
+"""
+import argparse
+import signal
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import circuit_breaker
+from config import Config
+from logger import setup_logger
+from report import INCOMPLETE_SECTION
+from report_store import company_key, extract_risk_rating
+
+logger = setup_logger()
+
+# How much faster each prior risk rating makes an entry go stale
+RISK_WEIGHTS: Dict[Optional[str], float] = {
+    "CRITICAL": 8.0,
+    "HIGH": 4.0,
+    "MEDIUM": 2.0,
+    "MODERATE": 2.0,
+    "LOW": 1.0,
+    None: 1.5,
+}
+
+# Failed runs are retried after base * 2^(failures - 1), capped
+FAILURE_BACKOFF_SECONDS = 15 * 60
+MAX_BACKOFF_SECONDS = 24 * 3600
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS watchlist (
+    company_key TEXT PRIMARY KEY,
+    company TEXT NOT NULL,
+    ticker TEXT,
+    added_at REAL NOT NULL,
+    last_run_at REAL,
+    last_risk TEXT,
+    last_report TEXT,
+    failures INTEGER NOT NULL DEFAULT 0,
+    not_before REAL NOT NULL DEFAULT 0,
+    running_since REAL
+);
+CREATE TABLE IF NOT EXISTS run_starts (
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_run_starts_started ON run_starts (started_at);
+"""
+
+
+@dataclass(frozen=True)
+class WatchlistEntry:
+    """One monitored company."""
+
+    company_key: str
+    company: str
+    ticker: Optional[str]
+    added_at: float
+    last_run_at: Optional[float]
+    last_risk: Optional[str]
+    last_report: Optional[str]
+    failures: int
+    not_before: float
+    running_since: Optional[float]
+
+    def staleness(self, now: float) -> float:
+        """Seconds since the last run (or since being added, if never run)."""
+        return now - (self.last_run_at or self.added_at)
+
+    def priority(self, now: float, min_interval: float) -> float:
+        """
+        Scheduling priority; higher runs first, 0 means not due yet.
+
+        Never-investigated companies come first. Otherwise staleness is scaled by
+        the prior risk weight, and an entry becomes due once its weighted
+        staleness exceeds ``min_interval`` (so a HIGH-risk company is due four
+        times as often as a LOW-risk one).
+        """
+        if self.running_since is not None or now < self.not_before:
+            return 0.0
+        if self.last_run_at is None:
+            return float("inf")
+        weighted = self.staleness(now) * RISK_WEIGHTS.get(self.last_risk, RISK_WEIGHTS[None])
+        return weighted / min_interval if weighted >= min_interval else 0.0
+
+
+class Watchlist:
+    """SQLite-backed watchlist; every state change is committed immediately."""
+
+    def __init__(self, db_path: str):
+        """
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            yield conn
+        finally:
+            conn.close()
+
+    def add(self, company: str, ticker: Optional[str] = None) -> bool:
+        """
+        Add a company to the watchlist.
+
+        Returns:
+            True if it was added, False if it was already being watched
+        """
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO watchlist (company_key, company, ticker, added_at) "
+                "VALUES (?, ?, ?, ?)",
+                (company_key(company), company, ticker, time.time())
+            )
+        return cursor.rowcount > 0
+
+    def remove(self, company: str) -> bool:
+        """Stop watching a company."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "DELETE FROM watchlist WHERE company_key = ?", (company_key(company),)
+            )
+        return cursor.rowcount > 0
+
+    def entries(self) -> List[WatchlistEntry]:
+        """Return all watched companies."""
+        with self._connect() as conn:
+            rows = conn.execute("SELECT * FROM watchlist ORDER BY company_key").fetchall()
+        return [WatchlistEntry(**dict(row)) for row in rows]
+
+    def claim_next(self, min_interval: float) -> Optional[WatchlistEntry]:
+        """
+        Atomically pick the highest-priority due company and mark it running.
+
+        Args:
+            min_interval: Seconds of risk-weighted staleness before an entry is due
+
+        Returns:
+            The claimed entry, or None if nothing is due
+        """
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = conn.execute(
+                    "SELECT * FROM watchlist WHERE running_since IS NULL AND not_before <= ?",
+                    (now,)
+                ).fetchall()
+                candidates = [WatchlistEntry(**dict(row)) for row in rows]
+                due = [(e.priority(now, min_interval), e) for e in candidates]
+                due = [(p, e) for p, e in due if p > 0]
+                if not due:
+                    conn.execute("COMMIT")
+                    return None
+                _, entry = max(due, key=lambda item: (item[0], item[1].staleness(now)))
+                conn.execute(
+                    "UPDATE watchlist SET running_since = ? WHERE company_key = ?",
+                    (now, entry.company_key)
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return entry
+
+    def complete(self, key: str, risk: Optional[str], report_path: Optional[str]) -> None:
+        """Record a successful run."""
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE watchlist SET last_run_at = ?, last_risk = COALESCE(?, last_risk), "
+                "last_report = ?, failures = 0, not_before = 0, running_since = NULL "
+                "WHERE company_key = ?",
+                (time.time(), risk, report_path, key)
+            )
+
+    def fail(self, key: str) -> None:
+        """Record a failed run and back off exponentially before retrying."""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT failures FROM watchlist WHERE company_key = ?", (key,)
+            ).fetchone()
+            failures = (row["failures"] if row else 0) + 1
+            delay = min(FAILURE_BACKOFF_SECONDS * 2 ** (failures - 1), MAX_BACKOFF_SECONDS)
+            conn.execute(
+                "UPDATE watchlist SET failures = ?, not_before = ?, running_since = NULL "
+                "WHERE company_key = ?",
+                (failures, time.time() + delay, key)
+            )
+
+    def record_start(self, started_at: float, keep_seconds: float) -> None:
+        """Remember when an investigation started, forgetting starts older than ``keep_seconds``."""
+        with self._connect() as conn:
+            conn.execute("INSERT INTO run_starts (started_at) VALUES (?)", (started_at,))
+            conn.execute(
+                "DELETE FROM run_starts WHERE started_at < ?", (started_at - keep_seconds,)
+            )
+
+    def recent_starts(self, since: float) -> List[float]:
+        """Start times of investigations started at or after ``since``, oldest first."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT started_at FROM run_starts WHERE started_at >= ? ORDER BY started_at",
+                (since,)
+            ).fetchall()
+        return [row["started_at"] for row in rows]
+
+    def release_stale_claims(self) -> int:
+        """Release entries left marked as running by a scheduler that exited uncleanly."""
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "UPDATE watchlist SET running_since = NULL WHERE running_since IS NOT NULL"
+            )
+        return cursor.rowcount
+
+
+class RateBudget:
+    """Token bucket limiting how many investigations start per hour."""
+
+    def __init__(self, per_hour: float, burst: Optional[int] = None, starts: Iterable[float] = ()):
+        """
+        Args:
+            per_hour: Sustained investigations per hour
+            burst: Maximum investigations that may start back-to-back (default: 1)
+            starts: Wall-clock times of earlier starts (e.g. before a restart) to charge
+        """
+        self.rate = per_hour / 3600.0
+        self.capacity = float(burst or 1)
+        self.tokens = self.capacity
+        starts = sorted(starts)
+        self._updated = starts[0] if starts else time.time()
+        for started_at in starts:
+            self._refill(started_at)
+            self.tokens = max(0.0, self.tokens - 1.0)
+
+    @property
+    def refill_seconds(self) -> float:
+        """Seconds an empty bucket needs to fill up; older starts no longer matter."""
+        return self.capacity / self.rate
+
+    def _refill(self, now: Optional[float] = None) -> None:
+        # Wall-clock time, so start times persisted by an earlier process can be replayed
+        now = time.time() if now is None else now
+        self.tokens = min(self.capacity, self.tokens + max(0.0, now - self._updated) * self.rate)
+        self._updated = max(self._updated, now)
+
+    def try_acquire(self) -> bool:
+        """Consume one token if available."""
+        self._refill()
+        if self.tokens >= 1.0:
+            self.tokens -= 1.0
+            return True
+        return False
+
+    def seconds_until_available(self) -> float:
+        """Seconds until the next token is available."""
+        self._refill()
+        return 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) / self.rate
+
+
+class Scheduler:
+    """Continuously investigate due watchlist entries within concurrency and rate limits."""
+
+    def __init__(
+        self,
+        watchlist: Watchlist,
+        workers: Optional[int] = None,
+        runs_per_hour: Optional[float] = None,
+        min_interval_hours: Optional[float] = None,
+        poll_seconds: Optional[float] = None
+    ):
+        """
+        Args:
+            watchlist: Persistent watchlist to work through
+            workers: Maximum concurrent investigations
+            runs_per_hour: Rate budget for starting investigations
+            min_interval_hours: Risk-weighted staleness before a company is due again
+            poll_seconds: How often to look for due work when idle
+        """
+        self.watchlist = watchlist
+        self.workers = workers or Config.SCHEDULER_WORKERS
+        runs_per_hour = runs_per_hour or Config.SCHEDULER_RUNS_PER_HOUR
+        # Charge the starts of earlier scheduler processes, so a restart does not reset the budget
+        horizon = RateBudget(runs_per_hour, burst=self.workers).refill_seconds
+        self.budget = RateBudget(
+            runs_per_hour, burst=self.workers, starts=watchlist.recent_starts(time.time() - horizon)
+        )
+        self.min_interval = (min_interval_hours or Config.SCHEDULER_MIN_INTERVAL_HOURS) * 3600
+        self.poll_seconds = poll_seconds or Config.SCHEDULER_POLL_SECONDS
+        self._stop = threading.Event()
+        self._running: Dict[Future, WatchlistEntry] = {}
+
+    def stop(self) -> None:
+        """Ask the loop to exit once running investigations finish."""
+        self._stop.set()
+
+    def run(self, once: bool = False) -> None:
+        """
+        Run the scheduling loop until ``stop`` is called.
+
+        Args:
+            once: Exit when nothing is due and nothing is running
+        """
+        released = self.watchlist.release_stale_claims()
+        if released:
+            logger.info(
+                "Released %d watchlist entries left running by a previous scheduler", released
+            )
+
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="scheduled") as pool:
+            while not self._stop.is_set():
+                self._reap()
+                started = self._start_due(pool)
+                idle = not started and not self._running
+                if once and idle and not circuit_breaker.open_circuits():
+                    break
+                wait = self.poll_seconds
+                if len(self._running) < self.workers:
+                    wait = min(wait, max(1.0, self.budget.seconds_until_available()))
+                    blocked = circuit_breaker.open_circuits()
+                    if blocked:
+                        wait = min(wait, max(1.0, min(b.retry_after() for b in blocked)))
+                self._stop.wait(wait)
+            logger.info(
+                "Scheduler stopping; waiting for %d running investigations", len(self._running)
+            )
+        self._reap()
+
+    def _start_due(self, pool: ThreadPoolExecutor) -> int:
+        # An investigation started during an upstream outage would only produce an
+        # empty report and push the entry into failure backoff; wait for recovery
+        blocked = circuit_breaker.open_circuits()
+        if blocked:
+            logger.info(
+                "Not starting investigations while circuits are open: %s",
+                ", ".join(b.name for b in blocked)
+            )
+            return 0
+        started = 0
+        while len(self._running) < self.workers and self.budget.seconds_until_available() == 0.0:
+            entry = self.watchlist.claim_next(self.min_interval)
+            if entry is None:
+                break
+            self.budget.try_acquire()
+            self.watchlist.record_start(time.time(), self.budget.refill_seconds)
+            logger.info(
+                "Scheduling %s (last risk %s, stale %.1fh)",
+                entry.company, entry.last_risk or "unknown", entry.staleness(time.time()) / 3600
+            )
+            self._running[pool.submit(self._investigate, entry)] = entry
+            started += 1
+        return started
+
+    def _reap(self) -> None:
+        for future in [f for f in self._running if f.done()]:
+            entry = self._running.pop(future)
+            try:
+                report_path, incomplete = future.result()
+            except Exception as e:
+                logger.error("Scheduled investigation of %s failed: %s", entry.company, e)
+                self.watchlist.fail(entry.company_key)
+                continue
+            if incomplete:
+                # e.g. delta searches failed or the deadline passed: nothing was fully re-screened
+                logger.error(
+                    "Scheduled investigation of %s is incomplete: %s", entry.company, incomplete
+                )
+                self.watchlist.fail(entry.company_key)
+                continue
+            risk = None
+            try:
+                risk = extract_risk_rating(Path(report_path).read_text(encoding="utf-8"))
+            except OSError as e:
+                logger.warning("Could not read report for %s: %s", entry.company, e)
+            self.watchlist.complete(entry.company_key, risk, report_path)
+            logger.info(
+                "Scheduled investigation of %s finished (risk %s)", entry.company, risk or "unknown"
+            )
+
+    @staticmethod
+    def _investigate(entry: WatchlistEntry) -> Tuple[str, Optional[str]]:
+        """Run the investigation; returns the report path and any incomplete-report notice."""
+        # Imported lazily so watchlist management does not load CrewAI
+        from main import run_investigation
+
+        incomplete: List[str] = []
+
+        def on_section(title: str, content: str) -> None:
+            if title == INCOMPLETE_SECTION:
+                incomplete.append(content.strip().splitlines()[0].lstrip("#⚠️ ").strip())
+
+        report_path = run_investigation(
+            entry.company,
+            include_shariah=bool(entry.ticker),
+            ticker_symbol=entry.ticker,
+            incremental=entry.last_run_at is not None,
+            on_section=on_section
+        )
+        return report_path, (incomplete[0] if incomplete else None)
+
+
+def main() -> int:
+    """Watchlist management and scheduler CLI."""
+    parser = argparse.ArgumentParser(description="Ghost Office Hunter watchlist scheduler")
+    parser.add_argument("--db", default=None, help="Watchlist database (default: WATCHLIST_DB)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="Watch a company")
+    add.add_argument("company")
+    add.add_argument("--ticker", "-t", default=None, help="Ticker for Shariah compliance checks")
+
+    import_cmd = commands.add_parser("import", help="Watch every company in a file (one per line)")
+    import_cmd.add_argument("file")
+
+    remove = commands.add_parser("remove", help="Stop watching a company")
+    remove.add_argument("company")
+
+    commands.add_parser("list", help="Show the watchlist in priority order")
+
+    run = commands.add_parser("run", help="Run the scheduler")
+    run.add_argument("--workers", "-w", type=int, default=None, help="Concurrent investigations")
+    run.add_argument("--rate", type=float, default=None, help="Investigations started per hour")
+    run.add_argument("--min-interval", type=float, default=None,
+                     help="Hours of risk-weighted staleness before a company is re-screened")
+    run.add_argument("--once", action="store_true", help="Exit when nothing is due")
+
+    args = parser.parse_args()
+    watchlist = Watchlist(args.db or Config.WATCHLIST_DB)
+
+    if args.command == "add":
+        added = watchlist.add(args.company, args.ticker)
+        print(f"{'Added' if added else 'Already watching'}: {args.company}")
+    elif args.command == "import":
+        from main import read_company_list, read_company_tickers
+        tickers = read_company_tickers(args.file)
+        added = sum(
+            watchlist.add(company, tickers.get(company))
+            for company in read_company_list(args.file)
+        )
+        print(f"Added {added} companies")
+    elif args.command == "remove":
+        print(f"{'Removed' if watchlist.remove(args.company) else 'Not watching'}: {args.company}")
+    elif args.command == "list":
+        now = time.time()
+        min_interval = Config.SCHEDULER_MIN_INTERVAL_HOURS * 3600
+        entries = sorted(
+            watchlist.entries(), key=lambda e: e.priority(now, min_interval), reverse=True
+        )
+        for entry in entries:
+            last = "never"
+            if entry.last_run_at:
+                last = time.strftime("%Y-%m-%d %H:%M", time.localtime(entry.last_run_at))
+            priority = entry.priority(now, min_interval)
+            status = "running" if entry.running_since else ("due" if priority > 0 else "waiting")
+            print(f"{entry.company:<40} {entry.last_risk or '-':<9} last {last:<16} {status}")
+    else:
+        Config.validate()
+        scheduler = Scheduler(watchlist, args.workers, args.rate, args.min_interval)
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(sig, lambda *_: scheduler.stop())
+        scheduler.run(once=args.once)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
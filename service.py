@@ -0,0 +1,585 @@
+#!/usr/bin/env python3
+"""Headless HTTP service for Ghost Office Hunter.
+
+Wraps ``run_investigation`` in a small JSON API so other systems (e.g. client
+onboarding) can submit investigations programmatically::
+
+    python service.py --port 8080 --workers 4
+
+Endpoints:
+
+* ``POST /investigations`` submits a job (``{"company": ..., "include_shariah":
+  false, "ticker": null, "incremental": false, "deadline": null, "settings":
+  {...}}``) and answers ``202`` with the job. An identical job that is already
+  queued or running is returned instead of starting a second one. When the
+  queue is full the answer is ``429`` with ``Retry-After``.
+* ``GET /investigations/<id>`` returns job status and completed sections.
+* ``GET /investigations/<id>/events`` streams progress as server-sent events.
+* ``GET /investigations/<id>/report`` returns the finished Markdown report.
+* ``GET /health`` and ``GET /metrics`` report queue depth, circuit breaker
+  state and Prometheus metrics.
+
+Jobs run on a bounded worker pool. Job state is kept in memory, so it does not
+survive a restart; finished reports remain in the report store. Start with
+``--stub`` to run the real investigation pipeline against the offline DDGS,
+yfinance and LLM stubs from ``benchmarks/stubs.py``, for local integration
+testing. Reports, indexes and caches then go to a temporary directory.
+"""
+import argparse
+import dataclasses
+import hmac
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import circuit_breaker
+import metrics
+from config import Config, RunSettings
+from logger import setup_logger
+from report_store import compute_input_hash
+
+logger = setup_logger()
+
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+# RunSettings fields a client may override per job
+CLIENT_SETTINGS = (
+    "model_name", "temperature", "search_max_results", "search_region", "search_safesearch",
+    "research_model", "shariah_model", "synthesis_model", "function_calling_model",
+)
+
+# Maximum accepted request body
+MAX_BODY_BYTES = 64 * 1024
+
+# Seconds between SSE keep-alive comments while a job is quiet
+SSE_KEEPALIVE_SECONDS = 15.0
+
+Runner = Callable[..., str]
+
+
+class QueueFullError(Exception):
+    """Raised when the service cannot accept another job right now."""
+
+
+@dataclasses.dataclass
+class Job:
+    """One submitted investigation and its progress."""
+
+    id: str
+    key: str
+    company: str
+    include_shariah: bool = False
+    ticker: Optional[str] = None
+    incremental: bool = False
+    deadline: Optional[float] = None
+    settings: RunSettings = dataclasses.field(default_factory=RunSettings)
+    status: str = QUEUED
+    submitted_at: float = dataclasses.field(default_factory=time.time)
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    report_path: Optional[str] = None
+    error: Optional[str] = None
+    sections: List[Tuple[str, str]] = dataclasses.field(default_factory=list)
+    events: List[Tuple[str, Dict[str, Any]]] = dataclasses.field(default_factory=list)
+
+    @property
+    def done(self) -> bool:
+        return self.status in (SUCCEEDED, FAILED)
+
+    def to_dict(self, include_sections: bool = True) -> Dict[str, Any]:
+        """JSON representation returned by the API."""
+        data: Dict[str, Any] = {
+            "id": self.id,
+            "company": self.company,
+            "status": self.status,
+            "include_shariah": self.include_shariah,
+            "ticker": self.ticker,
+            "incremental": self.incremental,
+            "deadline": self.deadline,
+            "submitted_at": self.submitted_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+            "report_url": f"/investigations/{self.id}/report" if self.status == SUCCEEDED else None,
+        }
+        if include_sections:
+            data["sections"] = [
+                {"title": title, "content": content} for title, content in self.sections
+            ]
+        return data
+
+
+class JobManager:
+    """Bounded worker pool running investigations, with in-flight deduplication."""
+
+    def __init__(
+        self,
+        workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        retention: Optional[int] = None,
+        runner: Optional[Runner] = None
+    ):
+        """
+        Args:
+            workers: Concurrent investigations
+            max_queue: Jobs allowed to wait for a worker before submissions get 429
+            retention: Finished jobs kept in memory for status and report lookups
+            runner: Function with ``run_investigation``'s signature (default: the real one)
+        """
+        self.workers = workers or Config.SERVICE_WORKERS
+        self.max_queue = Config.SERVICE_MAX_QUEUE if max_queue is None else max_queue
+        self.retention = retention or Config.SERVICE_JOB_RETENTION
+        self.runner = runner or _run_investigation
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="service-job")
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._in_flight: Dict[str, str] = {}
+        self._changed = threading.Condition()
+
+    @property
+    def active(self) -> int:
+        """Jobs queued or running."""
+        with self._changed:
+            return len(self._in_flight)
+
+    def submit(
+        self,
+        company: str,
+        include_shariah: bool = False,
+        ticker: Optional[str] = None,
+        incremental: bool = False,
+        deadline: Optional[float] = None,
+        settings: Optional[RunSettings] = None
+    ) -> Tuple[Job, bool]:
+        """
+        Queue an investigation, or return the identical job already in flight.
+
+        Returns:
+            Tuple of (job, created); ``created`` is False for a deduplicated submission
+
+        Raises:
+            QueueFullError: If all workers are busy and the wait queue is full
+        """
+        settings = settings or RunSettings()
+        key = compute_input_hash(
+            company,
+            include_shariah=include_shariah,
+            ticker_symbol=ticker,
+            incremental=incremental,
+            deadline=deadline,
+            settings=dataclasses.asdict(settings)
+        )
+        registry = metrics.REGISTRY
+        with self._changed:
+            existing = self._in_flight.get(key)
+            if existing is not None:
+                registry.increment("service_jobs_total", outcome="deduplicated")
+                return self._jobs[existing], False
+            if len(self._in_flight) >= self.workers + self.max_queue:
+                registry.increment("service_jobs_total", outcome="rejected")
+                raise QueueFullError(
+                    f"{len(self._in_flight)} investigations are queued or running; try again later"
+                )
+            job = Job(
+                id=uuid.uuid4().hex[:16], key=key, company=company, include_shariah=include_shariah,
+                ticker=ticker, incremental=incremental, deadline=deadline, settings=settings
+            )
+            self._jobs[job.id] = job
+            self._in_flight[key] = job.id
+            self._add_event(job, "status", {"status": QUEUED})
+            self._trim()
+        registry.increment("service_jobs_total", outcome="accepted")
+        self._pool.submit(self._execute, job)
+        logger.info("Accepted investigation job %s for %s", job.id, company)
+        return job, True
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._changed:
+            return self._jobs.get(job_id)
+
+    def wait_for_events(
+        self, job: Job, seen: int, timeout: float
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """Block until the job has events after index ``seen`` (or the timeout passes)."""
+        with self._changed:
+            self._changed.wait_for(lambda: len(job.events) > seen, timeout=timeout)
+            return job.events[seen:]
+
+    def shutdown(self) -> None:
+        """Stop accepting work and wait for running jobs."""
+        self._pool.shutdown(wait=True)
+
+    def _add_event(self, job: Job, kind: str, data: Dict[str, Any]) -> None:
+        # Caller holds the condition
+        job.events.append((kind, data))
+        self._changed.notify_all()
+
+    def _trim(self) -> None:
+        # Drop the oldest finished jobs beyond the retention limit; caller holds the condition
+        excess = len(self._jobs) - self.retention
+        for job_id in [j.id for j in self._jobs.values() if j.done][:max(0, excess)]:
+            del self._jobs[job_id]
+
+    def _execute(self, job: Job) -> None:
+        def on_section(title: str, content: str) -> None:
+            with self._changed:
+                job.sections.append((title, content))
+                self._add_event(job, "section", {"title": title, "content": content})
+
+        with self._changed:
+            job.status = RUNNING
+            job.started_at = time.time()
+            self._add_event(job, "status", {"status": RUNNING})
+        metrics.REGISTRY.observe("service_queue_wait_seconds", job.started_at - job.submitted_at)
+
+        output_dir = os.path.join(job.settings.output_dir, "service", job.id)
+        try:
+            report_path = self.runner(
+                job.company,
+                Config.get_output_path(job.company, output_dir),
+                include_shariah=job.include_shariah,
+                ticker_symbol=job.ticker,
+                settings=job.settings,
+                on_section=on_section,
+                incremental=job.incremental,
+                deadline=job.deadline
+            )
+        except Exception as e:
+            logger.error("Investigation job %s failed: %s", job.id, e)
+            status, report_path, error = FAILED, None, str(e)
+        else:
+            status, error = SUCCEEDED, None
+
+        with self._changed:
+            job.status = status
+            job.report_path = report_path
+            job.error = error
+            job.finished_at = time.time()
+            self._in_flight.pop(job.key, None)
+            self._add_event(job, "status", {"status": status, "error": error})
+        metrics.REGISTRY.increment("service_jobs_total", outcome=status)
+
+
+def _run_investigation(*args: Any, **kwargs: Any) -> str:
+    # Imported lazily so --help does not load CrewAI, and so ``--stub`` can install its stubs first
+    from main import run_investigation
+    return run_investigation(*args, **kwargs)
+
+
+def install_stubs() -> str:
+    """
+    Switch this process to the offline upstream stubs for ``--stub`` mode.
+
+    Must run before ``main``/``tools`` are imported. Installs the fake DDGS,
+    yfinance and LLM from ``benchmarks/stubs.py`` and moves all state into a
+    temporary directory, so stub runs never touch the real stores.
+
+    Returns:
+        The temporary state directory
+    """
+    from benchmarks import stubs
+
+    stubs.install()
+    os.environ.setdefault("OPENAI_API_KEY", "stub-offline-key")
+    state_dir = tempfile.mkdtemp(prefix="ghost-hunter-stub-")
+    stubs.isolate_state(state_dir)
+    stubs.use_fake_llm()
+    return state_dir
+
+
+def _parse_settings(raw: Any) -> RunSettings:
+    if raw is None:
+        return RunSettings()
+    if not isinstance(raw, dict):
+        raise ValueError("settings must be an object")
+    unknown = set(raw) - set(CLIENT_SETTINGS)
+    if unknown:
+        raise ValueError(f"unsupported settings: {', '.join(sorted(unknown))}")
+    defaults = RunSettings()
+    overrides = {}
+    for name, value in raw.items():
+        expected = type(getattr(defaults, name))
+        if expected is float and isinstance(value, int) and not isinstance(value, bool):
+            value = float(value)
+        if not isinstance(value, expected) or isinstance(value, bool):
+            raise ValueError(f"settings.{name} must be of type {expected.__name__}")
+        overrides[name] = value
+    return dataclasses.replace(defaults, **overrides)
+
+
+def parse_submission(payload: Any) -> Dict[str, Any]:
+    """
+    Validate a ``POST /investigations`` body into ``JobManager.submit`` arguments.
+
+    Raises:
+        ValueError: If the payload is invalid
+    """
+    if not isinstance(payload, dict):
+        raise ValueError("request body must be a JSON object")
+    company = payload.get("company")
+    if not isinstance(company, str) or not company.strip():
+        raise ValueError("company is required")
+    if len(company) > 200:
+        raise ValueError("company must be at most 200 characters")
+    ticker = payload.get("ticker")
+    if ticker is not None and (not isinstance(ticker, str) or not ticker.strip()):
+        raise ValueError("ticker must be a non-empty string")
+    deadline = payload.get("deadline")
+    if deadline is not None and (
+        isinstance(deadline, bool) or not isinstance(deadline, (int, float)) or deadline < 0
+    ):
+        raise ValueError("deadline must be a non-negative number of seconds")
+    for flag in ("include_shariah", "incremental"):
+        if not isinstance(payload.get(flag, False), bool):
+            raise ValueError(f"{flag} must be a boolean")
+    include_shariah = payload.get("include_shariah", False)
+    if include_shariah and not ticker:
+        raise ValueError("include_shariah requires a ticker")
+    return {
+        "company": company.strip(),
+        "include_shariah": include_shariah,
+        "ticker": ticker.strip().upper() if ticker else None,
+        "incremental": payload.get("incremental", False),
+        "deadline": float(deadline) if deadline is not None else None,
+        "settings": _parse_settings(payload.get("settings")),
+    }
+
+
+class ServiceHandler(BaseHTTPRequestHandler):
+    """Request handler; the ``JobManager`` is attached to the server."""
+
+    server_version = "GhostOfficeHunter/1.0"
+    protocol_version = "HTTP/1.1"
+
+    @property
+    def manager(self) -> JobManager:
+        return self.server.manager  # type: ignore[attr-defined]
+
+    def log_message(self, format: str, *args: Any) -> None:
+        logger.debug("%s - %s", self.address_string(), format % args)
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body, default=str).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_error(
+        self, status: int, message: str, headers: Optional[Dict[str, str]] = None
+    ) -> None:
+        self._send_json(status, {"error": message}, headers)
+
+    def _authorized(self) -> bool:
+        token = Config.SERVICE_API_TOKEN
+        if not token:
+            return True
+        supplied = self.headers.get("Authorization", "")
+        if hmac.compare_digest(supplied.encode("utf-8"), f"Bearer {token}".encode("utf-8")):
+            return True
+        self._send_error(HTTPStatus.UNAUTHORIZED, "missing or invalid bearer token")
+        return False
+
+    def _route(self) -> Tuple[List[str], Optional[Job]]:
+        parts = [p for p in self.path.split("?", 1)[0].split("/") if p]
+        job = None
+        if len(parts) >= 2 and parts[0] == "investigations":
+            job = self.manager.get(parts[1])
+        return parts, job
+
+    def do_POST(self) -> None:
+        if not self._authorized():
+            return
+        parts, _ = self._route()
+        if parts != ["investigations"]:
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+            return
+        try:
+            length = int(self.headers.get("Content-Length") or 0)
+        except ValueError:
+            length = -1
+        if length < 0:
+            # The body cannot be framed, so the connection cannot be reused either
+            self.close_connection = True
+            self._send_error(HTTPStatus.BAD_REQUEST, "invalid Content-Length")
+            return
+        if length > MAX_BODY_BYTES:
+            self._send_error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE, "request body too large")
+            return
+        try:
+            submission = parse_submission(json.loads(self.rfile.read(length) or b"null"))
+        except (ValueError, UnicodeDecodeError) as e:
+            self._send_error(HTTPStatus.BAD_REQUEST, str(e))
+            return
+        try:
+            job, created = self.manager.submit(**submission)
+        except QueueFullError as e:
+            self._send_error(
+                HTTPStatus.TOO_MANY_REQUESTS, str(e),
+                {"Retry-After": str(Config.SERVICE_RETRY_AFTER)}
+            )
+            return
+        body = job.to_dict(include_sections=False)
+        body["deduplicated"] = not created
+        self._send_json(
+            HTTPStatus.ACCEPTED if created else HTTPStatus.OK, body,
+            {"Location": f"/investigations/{job.id}"}
+        )
+
+    def do_GET(self) -> None:
+        if not self._authorized():
+            return
+        parts, job = self._route()
+        if parts == ["health"]:
+            self._send_json(HTTPStatus.OK, {
+                "status": "ok",
+                "active_jobs": self.manager.active,
+                "capacity": self.manager.workers + self.manager.max_queue,
+                "open_circuits": [
+                    breaker.snapshot() for breaker in circuit_breaker.open_circuits()
+                ],
+            })
+        elif parts == ["metrics"]:
+            data = metrics.REGISTRY.to_prometheus().encode("utf-8")
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif len(parts) >= 2 and parts[0] == "investigations" and job is None:
+            self._send_error(HTTPStatus.NOT_FOUND, "unknown investigation")
+        elif len(parts) == 2 and job is not None:
+            self._send_json(HTTPStatus.OK, job.to_dict())
+        elif len(parts) == 3 and parts[2] == "events" and job is not None:
+            self._stream_events(job)
+        elif len(parts) == 3 and parts[2] == "report" and job is not None:
+            self._send_report(job)
+        else:
+            self._send_error(HTTPStatus.NOT_FOUND, "not found")
+
+    def _send_report(self, job: Job) -> None:
+        if job.status != SUCCEEDED or not job.report_path:
+            self._send_error(HTTPStatus.CONFLICT, f"investigation is {job.status}")
+            return
+        try:
+            data = Path(job.report_path).read_bytes()
+        except OSError as e:
+            self._send_error(HTTPStatus.GONE, f"report no longer available: {e}")
+            return
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/markdown; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream_events(self, job: Job) -> None:
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-cache")
+        self.send_header("Connection", "close")
+        self.end_headers()
+        self.close_connection = True
+        seen = 0
+        try:
+            while True:
+                events = self.manager.wait_for_events(job, seen, SSE_KEEPALIVE_SECONDS)
+                if not events:
+                    self.wfile.write(b": keep-alive\n\n")
+                for kind, data in events:
+                    self.wfile.write(f"event: {kind}\ndata: {json.dumps(data)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+                seen += len(events)
+                if job.done and seen >= len(job.events):
+                    return
+        except (BrokenPipeError, ConnectionResetError):
+            logger.debug("Event stream for job %s closed by client", job.id)
+
+
+def create_server(
+    manager: JobManager, host: Optional[str] = None, port: Optional[int] = None
+) -> ThreadingHTTPServer:
+    """Build the HTTP server (port 0 picks a free port, useful for local testing)."""
+    server = ThreadingHTTPServer(
+        (host or Config.SERVICE_HOST, Config.SERVICE_PORT if port is None else port), ServiceHandler
+    )
+    server.daemon_threads = True
+    server.manager = manager  # type: ignore[attr-defined]
+    return server
+
+
+def main() -> int:
+    """Service CLI entry point."""
+    parser = argparse.ArgumentParser(description="Ghost Office Hunter HTTP service")
+    parser.add_argument("--host", default=None, help="Bind address (default: SERVICE_HOST)")
+    parser.add_argument("--port", type=int, default=None, help="Port (default: SERVICE_PORT)")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Concurrent investigations (default: SERVICE_WORKERS)"
+    )
+    parser.add_argument(
+        "--max-queue", type=int, default=None,
+        help="Waiting jobs before 429 (default: SERVICE_MAX_QUEUE)"
+    )
+    parser.add_argument(
+        "--stub", action="store_true",
+        help="Use offline DDGS, yfinance and LLM stubs (no network calls)"
+    )
+    parser.add_argument(
+        "--pool", action="store_true",
+        help="Run jobs on pre-warmed worker processes that reuse LLM clients and tools"
+    )
+    args = parser.parse_args()
+
+    if not args.stub:
+        try:
+            Config.validate()
+        except ValueError as e:
+            logger.error("Configuration error: %s", e)
+            return 1
+
+    if args.stub:
+        logger.info("Stub mode: offline upstreams, state in %s", install_stubs())
+
+    pool = None
+    runner: Optional[Runner] = None
+    if args.pool and not args.stub:
+        from worker_pool import InvestigationPool
+        pool = InvestigationPool(workers=args.workers or Config.SERVICE_WORKERS)
+        runner = pool.run
+    manager = JobManager(workers=args.workers, max_queue=args.max_queue, runner=runner)
+    server = create_server(manager, args.host, args.port)
+    host, port = server.server_address[:2]
+    logger.info(
+        "Service listening on http://%s:%s (%d %s, queue %d%s)",
+        host, port, manager.workers, "worker processes" if pool else "workers",
+        manager.max_queue, ", stub mode" if args.stub else ""
+    )
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        logger.info("Shutting down service")
+    finally:
+        server.server_close()
+        manager.shutdown()
+        if pool is not None:
+            pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
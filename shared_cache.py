@@ -0,0 +1,324 @@
+"""Cross-process shared cache for upstream data (DDGS results, yfinance fundamentals).
+
+Batch workers, the scheduler and the web UI may run in separate processes on
+one machine; an in-process cache would fetch the same query or ticker once per
+process. This cache lives in a local SQLite database in WAL mode, which gives
+safe concurrent access from many processes and threads. Entries carry a TTL,
+the database is kept under a size budget by evicting least recently used
+entries, and short leases make concurrent misses for the same key wait for the
+first fetch instead of all hitting the upstream service.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, Optional
+
+import deadlines
+import metrics
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    last_access REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+CREATE INDEX IF NOT EXISTS idx_entries_expires ON entries (expires_at);
+CREATE INDEX IF NOT EXISTS idx_entries_access ON entries (last_access);
+CREATE TABLE IF NOT EXISTS leases (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+);
+"""
+
+# Run eviction after this many writes from one process
+_EVICT_EVERY = 64
+
+# Refresh an entry's LRU timestamp at most this often, to keep reads mostly read-only
+_TOUCH_INTERVAL = 60.0
+
+_MISSING = object()
+
+
+def _is_empty(value: Any) -> bool:
+    """Whether a computed value carries no data (None or an empty list/dict/string)."""
+    return value is None or (isinstance(value, (list, dict, str)) and not value)
+
+
+class SharedCache:
+    """SQLite-backed key/value cache safe for concurrent use by local processes."""
+
+    def __init__(self, db_path: str, max_bytes: int, lease_seconds: float):
+        """
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+            max_bytes: Total size of stored values before LRU eviction kicks in
+            lease_seconds: How long a process may hold the right to fill a missing key
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.lease_seconds = lease_seconds
+        self._owner = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self._writes = 0
+        self._lock = threading.Lock()
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode = WAL")
+            conn.executescript(_SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            conn.execute("PRAGMA busy_timeout = 30000")
+            conn.execute("PRAGMA synchronous = NORMAL")
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _encode(value: Any) -> bytes:
+        encoded = json.dumps(value, separators=(",", ":"), default=str).encode("utf-8")
+        return zlib.compress(encoded, 6)
+
+    @staticmethod
+    def _decode(blob: bytes) -> Any:
+        return json.loads(zlib.decompress(blob))
+
+    def get(self, namespace: str, key: str) -> Any:
+        """
+        Look up a live entry.
+
+        Returns:
+            The cached value, or the module-private ``_MISSING`` sentinel
+        """
+        now = time.time()
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT value, last_access FROM entries "
+                "WHERE namespace = ? AND key = ? AND expires_at > ?",
+                (namespace, key, now)
+            ).fetchone()
+            if row is None:
+                return _MISSING
+            if now - row[1] > _TOUCH_INTERVAL:
+                conn.execute(
+                    "UPDATE entries SET last_access = ? WHERE namespace = ? AND key = ?",
+                    (now, namespace, key)
+                )
+        return self._decode(row[0])
+
+    def set(self, namespace: str, key: str, value: Any, ttl: float) -> None:
+        """Store a value for ``ttl`` seconds."""
+        blob = self._encode(value)
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO entries "
+                "(namespace, key, value, size, created_at, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, blob, len(blob), now, now + ttl, now)
+            )
+        with self._lock:
+            self._writes += 1
+            evict = self._writes % _EVICT_EVERY == 0
+        if evict:
+            self.evict()
+
+    def evict(self) -> int:
+        """
+        Drop expired entries, then least recently used ones until under the size budget.
+
+        Returns:
+            Number of entries removed
+        """
+        now = time.time()
+        with self._connect() as conn:
+            removed = conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,)).rowcount
+            conn.execute("DELETE FROM leases WHERE expires_at <= ?", (now,))
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                # Free down to 90% of the budget so eviction does not run on every write
+                excess = total - int(self.max_bytes * 0.9)
+                freed = 0
+                victims = []
+                for namespace, key, size in conn.execute(
+                    "SELECT namespace, key, size FROM entries ORDER BY last_access"
+                ):
+                    victims.append((namespace, key))
+                    freed += size
+                    if freed >= excess:
+                        break
+                conn.executemany("DELETE FROM entries WHERE namespace = ? AND key = ?", victims)
+                removed += len(victims)
+        if removed:
+            logger.debug("Shared cache evicted %d entries", removed)
+        return removed
+
+    def _lease_owner(self) -> str:
+        return f"{self._owner}-{threading.get_ident()}"
+
+    def _acquire_lease(self, namespace: str, key: str) -> bool:
+        owner = self._lease_owner()
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT owner, expires_at FROM leases WHERE namespace = ? AND key = ?",
+                    (namespace, key)
+                ).fetchone()
+                acquired = row is None or row[1] <= now or row[0] == owner
+                if acquired:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO leases (namespace, key, owner, expires_at) "
+                        "VALUES (?, ?, ?, ?)",
+                        (namespace, key, owner, now + self.lease_seconds)
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return acquired
+
+    def _release_lease(self, namespace: str, key: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                "DELETE FROM leases WHERE namespace = ? AND key = ? AND owner = ?",
+                (namespace, key, self._lease_owner())
+            )
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        key: str,
+        ttl: float,
+        compute: Callable[[], Any],
+        refresh: bool = False
+    ) -> Any:
+        """
+        Return the cached value or compute, store and return it.
+
+        When another process or thread is already computing the same key, wait
+        (up to the lease duration) for its result instead of computing it again.
+        Exceptions from ``compute`` propagate and nothing is cached. Empty
+        values (no results) are returned but not cached, so a transient empty
+        answer is not served for the whole TTL. Cache failures never fail the
+        caller; the value is computed directly instead.
+
+        Args:
+            namespace: Cache namespace (e.g. ``ddgs`` or ``yfinance.info``)
+            key: Key within the namespace
+            ttl: Seconds the computed value stays valid
+            compute: Zero-argument function producing a JSON-serializable value
+            refresh: Ignore any cached value and replace it with a fresh one
+
+        Returns:
+            The cached or freshly computed value
+
+        Raises:
+            DeadlineExceeded: If the deadline passes while waiting on another fetch
+        """
+        try:
+            # Never wait on another process's fetch past the investigation deadline
+            wait_until = time.monotonic() + deadlines.cap(self.lease_seconds)
+            delay = 0.05
+            while True:
+                value = _MISSING if refresh else self.get(namespace, key)
+                if value is not _MISSING:
+                    metrics.current().record_cache(f"shared:{namespace}", True)
+                    return value
+                if self._acquire_lease(namespace, key) or time.monotonic() >= wait_until:
+                    break
+                deadlines.sleep(delay, f"shared_cache.{namespace}")
+                delay = min(delay * 2, 0.5)
+        except sqlite3.Error as e:
+            logger.warning("Shared cache unavailable for %s: %s", namespace, e)
+            return compute()
+
+        metrics.current().record_cache(f"shared:{namespace}", False)
+        try:
+            value = compute()
+            if not _is_empty(value):
+                try:
+                    self.set(namespace, key, value, ttl)
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    logger.warning("Could not store %s in shared cache: %s", namespace, e)
+            return value
+        finally:
+            try:
+                self._release_lease(namespace, key)
+            except sqlite3.Error:
+                pass
+
+    def stats(self) -> Dict[str, Any]:
+        """Entry counts and stored bytes per namespace."""
+        with self._connect() as conn:
+            rows = conn.execute(
+                "SELECT namespace, COUNT(*), COALESCE(SUM(size), 0) FROM entries "
+                "WHERE expires_at > ? GROUP BY namespace",
+                (time.time(),)
+            ).fetchall()
+        return {namespace: {"entries": count, "bytes": size} for namespace, count, size in rows}
+
+
+_caches: Dict[str, SharedCache] = {}
+_caches_lock = threading.Lock()
+
+
+def get_shared_cache(db_path: Optional[str] = None) -> Optional[SharedCache]:
+    """
+    Return the process-wide cache for ``db_path`` (default ``Config.SHARED_CACHE_DB``).
+
+    Returns:
+        SharedCache instance, or None if the shared cache is disabled or unusable
+    """
+    db_path = db_path or Config.SHARED_CACHE_DB
+    if not db_path:
+        return None
+    with _caches_lock:
+        cache = _caches.get(db_path)
+        if cache is None:
+            try:
+                cache = SharedCache(
+                    db_path,
+                    max_bytes=Config.SHARED_CACHE_MAX_MB * 1024 * 1024,
+                    lease_seconds=Config.SHARED_CACHE_LEASE_SECONDS
+                )
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Shared cache disabled, could not open %s: %s", db_path, e)
+                return None
+            _caches[db_path] = cache
+        return cache
+
+
+def cached(
+    namespace: str, key: str, ttl: float, compute: Callable[[], Any], refresh: bool = False
+) -> Any:
+    """Compute through the shared cache when enabled, otherwise call ``compute`` directly."""
+    cache = get_shared_cache()
+    if cache is None or ttl <= 0:
+        return compute()
+    return cache.get_or_compute(namespace, key, ttl, compute, refresh=refresh)
+
+
+def make_key(*parts: Any) -> str:
+    """Build a stable cache key from query parameters."""
+    return json.dumps(parts, separators=(",", ":"), sort_keys=True, default=str)
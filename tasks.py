@@ -2,25 +2,73 @@
 from typing import Optional
 from crewai import Agent, Task
 
+from red_flags import adverse_media_prompt_list
 
-def investigation_task(agent: Agent, company_name: str) -> Task:
+# Expected output of the final forensic report
+FORENSIC_REPORT_OUTPUT = (
+    "A comprehensive forensic risk report in markdown format that includes:\n"
+    "- Executive summary with risk rating\n"
+    "- Adverse media findings\n"
+    "- Ghost office assessment\n"
+    "- Corporate structure analysis\n"
+    "- Recommendations and red flags\n"
+    "- Supporting evidence and sources"
+)
+
+# Expected output of the investigation when a separate synthesis task writes the report
+FINDINGS_OUTPUT = (
+    "Structured investigation findings in markdown format (not a polished report) that include:\n"
+    "- Adverse media findings, each with its source URL\n"
+    "- Ghost office indicators found or ruled out, with sources\n"
+    "- Corporate structure observations and shell company characteristics\n"
+    "- Every red flag found, and your provisional risk rating"
+)
+
+
+def investigation_task(
+    agent: Agent,
+    company_name: str,
+    findings_only: bool = False,
+    sanctions_screening: bool = False,
+    director_network: bool = False
+) -> Task:
     """
     Create an investigation task for a company.
     
     Args:
         agent: The agent assigned to this task
         company_name: Name of the company to investigate
+        findings_only: Ask for structured findings instead of the final report,
+            which is then written by ``report_synthesis_task``
+        sanctions_screening: The agent has the local sanctions/PEP screening tool
+        director_network: The agent has the local director network tool
         
     Returns:
         Configured Task instance
     """
+    extra_steps = []
+    if director_network:
+        extra_steps.append("""DIRECTOR NETWORK ANALYSIS:
+           - Use the Ghost Hunter Director Network tool on the company to get its officers, how
+             many companies each of them sits on, and the cluster of companies linked to it
+             through shared officers and registered addresses.
+           - Treat directors sitting on dozens or hundreds of boards as likely nominee directors,
+             and large clusters at one address as a shell-company pattern.""")
+    if sanctions_screening:
+        extra_steps.append("""SANCTIONS AND PEP SCREENING:
+           - Use the Ghost Hunter Sanctions Screener on the company name, its former names and
+             every director, shareholder and related entity you identify (one call, names
+             separated by semicolons; screen newly found names in a further call).
+           - Report every possible match with its score, list, programs and list ID, and state
+             whether other identifiers (nationality, dates, addresses) support or rule it out.""")
+    extra = "".join(f"\n        {number}. {step}\n" for number, step in enumerate(extra_steps, 4))
+    
     return Task(
         description=f"""
         Conduct a comprehensive forensic investigation on '{company_name}'.
         
         1. ADVERSE MEDIA CHECK: 
-           - Search specifically for terms like "fraud", "collapse", "arrest", "investigation", 
-             "liquidators", "MAS penalty", "bankruptcy", "sanctions", and "regulatory action" 
+           - Search specifically for terms like {adverse_media_prompt_list()}
              associated with the company or its directors.
            - Look for any negative news, legal proceedings, or regulatory violations.
         
@@ -34,24 +82,45 @@ def investigation_task(agent: Agent, company_name: str) -> Task:
            - Examine corporate registry data for red flags.
            - Identify shell company characteristics.
            - Assess operational transparency.
-        
+        {extra}
         CRITICAL: If you find ANY negative news, regulatory actions, or suspicious patterns, 
         you MUST flag it as a HIGH RISK entity. Do not return a 'clean' report if the company 
         has collapsed, is under investigation, or shows signs of being a shell company.
         """,
-        expected_output=(
-            "A comprehensive forensic risk report in markdown format that includes:\n"
-            "- Executive summary with risk rating\n"
-            "- Adverse media findings\n"
-            "- Ghost office assessment\n"
-            "- Corporate structure analysis\n"
-            "- Recommendations and red flags\n"
-            "- Supporting evidence and sources"
-        ),
+        expected_output=FINDINGS_OUTPUT if findings_only else FORENSIC_REPORT_OUTPUT,
         agent=agent
     )
 
 
+def report_synthesis_task(agent: Agent, company_name: str, research: Task) -> Task:
+    """
+    Create the task that writes the final forensic report from the investigation findings.
+    
+    Args:
+        agent: The report writer agent (typically on a stronger model)
+        company_name: Name of the investigated company
+        research: The investigation task whose findings are the input
+        
+    Returns:
+        Configured Task instance
+    """
+    return Task(
+        description=f"""
+        Write the final forensic risk report on '{company_name}' from the investigator's findings
+        provided as context. Do not invent evidence: every finding must come from the context and
+        keep its source URL.
+        
+        Assign the overall risk rating. CRITICAL: If the findings contain ANY negative news,
+        regulatory actions, or suspicious patterns, you MUST rate the company HIGH RISK. Do not
+        return a 'clean' report if the company has collapsed, is under investigation, or shows
+        signs of being a shell company.
+        """,
+        expected_output=FORENSIC_REPORT_OUTPUT,
+        agent=agent,
+        context=[research]
+    )
+
+
 def shariah_compliance_task(agent: Agent, company_name: str, ticker_symbol: Optional[str] = None) -> Task:
     """
     Create a Shariah compliance check task for a company.
@@ -132,4 +201,56 @@ def shariah_compliance_task(agent: Agent, company_name: str, ticker_symbol: Opti
             "  * Recommendations if the company fails compliance"
         ),
         agent=agent
-    )
\ No newline at end of file
+    )
+
+
+def delta_update_task(
+    agent: Agent,
+    company_name: str,
+    new_evidence: str,
+    previous_report: str,
+    previous_date: str
+) -> Task:
+    """
+    Create a delta update task that reviews only evidence found since the last report.
+    
+    Args:
+        agent: The agent assigned to this task
+        company_name: Name of the company being re-screened
+        new_evidence: Formatted new or changed search results
+        previous_report: The previous report (or an excerpt of it) for context
+        previous_date: When the previous report was produced
+        
+    Returns:
+        Configured Task instance
+    """
+    return Task(
+        description=f"""
+        Update the forensic assessment of '{company_name}' last reported on {previous_date}.
+        
+        Do NOT repeat the previous investigation. Review ONLY the new or changed evidence below,
+        which was found by re-running the previous searches, and determine whether it changes
+        the company's risk profile.
+        
+        PREVIOUS REPORT (for context):
+        {previous_report}
+        
+        NEW OR CHANGED EVIDENCE SINCE {previous_date}:
+        {new_evidence}
+        
+        Apply the same criteria as the original investigation: adverse media
+        ({adverse_media_prompt_list()}), ghost office indicators and shell company
+        characteristics.
+        
+        CRITICAL: If the new evidence contains ANY negative news, regulatory actions, or suspicious
+        patterns, you MUST flag it and state whether the risk rating should be raised.
+        """,
+        expected_output=(
+            "A concise delta section in markdown format that includes:\n"
+            "- Updated risk rating (or confirmation that it is unchanged) with justification\n"
+            "- New findings, each with its source URL\n"
+            "- Whether any previous finding is contradicted or resolved\n"
+            "- Recommended follow-up actions"
+        ),
+        agent=agent
+    )
@@ -0,0 +1,87 @@
+"""Tests for the historical AAOIFI ratio screen."""
+import numpy as np
+import pandas as pd
+import pytest
+
+import aaoifi
+import tools
+from tools import ShariahComplianceTool
+
+QUARTERS = pd.to_datetime(["2024-03-31", "2024-06-30", "2024-09-30", "2024-12-31"])
+
+
+def _balance_sheet(debt, cash):
+    return pd.DataFrame(
+        [debt, cash, [10.0] * len(QUARTERS)],
+        index=["Total Debt", "Cash And Cash Equivalents", "Ordinary Shares Number"],
+        columns=QUARTERS,
+    )
+
+
+@pytest.fixture
+def prices():
+    # Constant price of 100 and 10 shares: every ratio is the raw figure / 1000 * 100
+    return pd.Series(100.0, index=pd.date_range("2022-01-01", "2025-01-01"))
+
+
+def test_missing_figures_are_unknown_not_zero(prices):
+    history = aaoifi.compute_ratio_history(
+        _balance_sheet([np.nan, 100.0, 500.0, 100.0], [np.nan, 50.0, 50.0, np.nan]), prices, 730
+    )
+
+    assert list(history["status"]) == [aaoifi.UNKNOWN, "PASS", "FAIL", aaoifi.UNKNOWN]
+    assert pd.isna(history["debt_ratio"].iloc[0])
+    assert pd.isna(history["cash_pass"].iloc[-1])
+
+
+def test_known_failing_ratio_fails_despite_missing_other(prices):
+    history = aaoifi.compute_ratio_history(
+        _balance_sheet([500.0] * 4, [np.nan] * 4), prices, 730
+    )
+
+    assert set(history["status"]) == {"FAIL"}
+
+
+def test_format_marks_missing_ratios(prices):
+    history = aaoifi.compute_ratio_history(
+        _balance_sheet([np.nan, 100.0, 100.0, 100.0], [50.0] * 4), prices, 730
+    )
+
+    text = aaoifi.format_ratio_history(history, 730)
+
+    assert "n/a" in text
+    assert "1 without reported debt or cash" in text
+
+
+def test_tool_reports_both_bases_consistently(monkeypatch, prices):
+    # Snapshot passes, but the latest quarter fails on cash
+    monkeypatch.setattr(tools, "fetch_ticker_info", lambda symbol: {
+        "marketCap": 1_000_000, "totalDebt": 10_000, "totalCash": 10_000,
+    })
+    history = aaoifi.compute_ratio_history(
+        _balance_sheet([100.0] * 4, [50.0, 50.0, 50.0, 400.0]), prices, 730
+    )
+    monkeypatch.setattr(aaoifi, "ratio_history", lambda symbol, window_days=None: history)
+
+    output = ShariahComplianceTool()._run("WTS")
+
+    assert "Overall Status: FAIL (based on latest quarter 2024-12-31" in output
+    assert "Latest Quarter Ratios (2024-12-31, trailing" in output
+    assert "  Cash Ratio: 40.00% (Threshold: <33%) ✗" in output
+    assert "Current Snapshot Ratios (current market cap): PASS" in output
+    assert "  Cash Ratio: 1.00% (Threshold: <33%) ✓" in output
+
+
+@pytest.mark.parametrize("info", [
+    {"marketCap": 1_000_000},
+    {"marketCap": 1_000_000, "totalDebt": None, "totalCash": 10_000},
+])
+def test_unreported_snapshot_figures_are_unknown(monkeypatch, info):
+    monkeypatch.setattr(tools, "fetch_ticker_info", lambda symbol: info)
+    monkeypatch.setattr(aaoifi, "ratio_history", lambda symbol, window_days=None: pd.DataFrame())
+
+    output = ShariahComplianceTool()._run("WTS")
+
+    assert "Overall Status: UNKNOWN (based on current market cap snapshot)" in output
+    assert "Current Snapshot Ratios (current market cap): UNKNOWN" in output
+    assert "  Debt Ratio: n/a (Threshold: <33%) ?" in output
@@ -0,0 +1,29 @@
+"""Tests for batch mode."""
+import main
+
+
+def test_batch_forwards_shariah_options_per_company(tmp_path, monkeypatch):
+    calls = {}
+
+    def run_investigation(company_name, **options):
+        calls[company_name] = options
+        return f"{company_name}.md"
+
+    monkeypatch.setattr(main, "run_investigation", run_investigation)
+    batch_file = tmp_path / "companies.txt"
+    batch_file.write_text(
+        "# watchlist\nWilmar International | F34.SI\n\nAcme Pte Ltd\n", encoding="utf-8"
+    )
+
+    companies = main.read_company_list(str(batch_file))
+    results = main.run_batch(
+        companies, max_workers=2, include_shariah=True,
+        tickers=main.read_company_tickers(str(batch_file))
+    )
+
+    assert companies == ["Wilmar International", "Acme Pte Ltd"]
+    assert results == {n: f"{n}.md" for n in companies}
+    assert calls["Wilmar International"]["include_shariah"] is True
+    assert calls["Wilmar International"]["ticker_symbol"] == "F34.SI"
+    assert calls["Acme Pte Ltd"]["include_shariah"] is False
+    assert calls["Acme Pte Ltd"]["ticker_symbol"] is None
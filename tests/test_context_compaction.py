@@ -0,0 +1,71 @@
+"""Tests for compacting old tool observations."""
+import context_compaction
+from context_compaction import COMPACTED_PREFIX, compact_messages, summarize_observation
+from tools import format_search_results
+
+RESULTS = [
+    {
+        "title": "Acme Pte Ltd - company profile",
+        "body": (
+            "Acme Pte Ltd is registered at 10 Anson Road #12-01, Singapore. "
+            "Its sole director is Jane Tan. The weather in Singapore was mild this week."
+        ),
+        "href": "https://registry.example.com/acme",
+    },
+    {
+        "title": "Anson Road virtual office",
+        "body": "Cheap plans for startups. The address is a virtual office shared by 400 firms.",
+        "href": "https://offices.example.com/anson",
+    },
+]
+
+
+def test_snippet_sentences_about_the_company_or_red_flags_are_kept():
+    text = "Search: Acme Pte Ltd address\n" + format_search_results(RESULTS)
+
+    summary = summarize_observation(text, subject="ACME PTE. LTD.")
+
+    assert summary.startswith(COMPACTED_PREFIX)
+    assert "Searches: Acme Pte Ltd address" in summary
+    assert "- Acme Pte Ltd - company profile <https://registry.example.com/acme>" in summary
+    assert "  > Acme Pte Ltd is registered at 10 Anson Road #12-01, Singapore." in summary
+    assert "  > The address is a virtual office shared by 400 firms." in summary
+    assert "weather" not in summary and "Cheap plans" not in summary
+
+
+def test_long_sentences_are_truncated():
+    body = "Acme Pte Ltd " + "was named in filings " * 40 + "."
+    text = format_search_results(
+        [{"title": "Filing", "body": body, "href": "https://x.example.com"}]
+    )
+
+    summary = summarize_observation(text, "Acme")
+    fact = [line for line in summary.splitlines() if line.startswith("  > ")]
+
+    assert len(fact) == 1
+    assert len(fact[0]) <= len("  > ") + context_compaction.MAX_FACT_CHARS + 2
+    assert fact[0].endswith(" …")
+
+
+def test_text_without_numbered_results_keeps_key_sentences():
+    text = "The weather was mild. Acme Pte Ltd was charged with fraud. Nothing else happened."
+
+    summary = summarize_observation(text, subject="Acme Pte Ltd")
+
+    assert summary.splitlines()[-1] == "> Acme Pte Ltd was charged with fraud."
+    assert "weather" not in summary
+
+
+def test_compaction_keeps_recent_observations_verbatim():
+    observation = format_search_results(RESULTS * 20)
+    messages = [
+        {"role": "assistant", "content": f"Action: search\nObservation: {observation}"},
+        {"role": "assistant", "content": f"Action: search\nObservation: {observation}"},
+    ]
+
+    compacted = compact_messages(messages, max_tokens=100, keep_recent=1, subject="Acme Pte Ltd")
+
+    assert compacted == 1
+    assert COMPACTED_PREFIX in messages[0]["content"]
+    assert "shared by 400 firms" in messages[0]["content"]
+    assert messages[1]["content"].endswith(observation)
@@ -0,0 +1,94 @@
+"""Tests for investigation deadlines."""
+import threading
+import time
+
+import pytest
+
+import aaoifi
+import deadlines
+from deadlines import Deadline, DeadlineExceeded
+from shared_cache import SharedCache
+
+
+class HangingTicker:
+    """yfinance Ticker stand-in whose balance sheet request never returns in time."""
+
+    release = threading.Event()
+
+    def __init__(self, symbol):
+        self.symbol = symbol
+
+    @property
+    def quarterly_balance_sheet(self):
+        self.release.wait(5)
+        return None
+
+
+def test_call_without_deadline_runs_inline():
+    caller = threading.current_thread()
+
+    assert deadlines.call(threading.current_thread, "inline") is caller
+
+
+def test_call_gives_up_when_the_deadline_passes():
+    release = threading.Event()
+
+    with deadlines.activate(Deadline(0.2)):
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded) as raised:
+            deadlines.call(lambda: release.wait(5), "slow.fetch")
+        waited = time.monotonic() - started
+    release.set()
+
+    assert raised.value.operation == "slow.fetch"
+    assert waited < 1
+
+
+def test_call_reraises_errors_from_the_worker():
+    def fail():
+        raise ValueError("bad response")
+
+    with deadlines.activate(Deadline(5)):
+        with pytest.raises(ValueError, match="bad response"):
+            deadlines.call(fail, "fetch")
+
+
+def test_run_within_cancels_the_deadline_for_abandoned_work():
+    release = threading.Event()
+    deadline = Deadline(0.2)
+
+    with deadlines.activate(deadline):
+        with pytest.raises(DeadlineExceeded):
+            deadlines.run_within(lambda: release.wait(5), "crew.kickoff")
+        # The abandoned crew's later tool calls fail at once
+        deadline.expires_at = time.monotonic() + 60
+        with pytest.raises(DeadlineExceeded):
+            deadlines.check("search")
+    release.set()
+
+    assert deadline.remaining() == 0
+
+
+def test_shared_cache_does_not_wait_on_a_lease_past_the_deadline(tmp_path):
+    cache = SharedCache(str(tmp_path / "cache.db"), max_bytes=1_000_000, lease_seconds=30)
+    cache._lease_owner = lambda: "other-process"
+    assert cache._acquire_lease("ddgs", "query")
+    cache._lease_owner = lambda: "this-process"
+
+    with deadlines.activate(Deadline(0.3)):
+        started = time.monotonic()
+        with pytest.raises(DeadlineExceeded):
+            cache.get_or_compute("ddgs", "query", ttl=60, compute=lambda: ["result"])
+
+    assert time.monotonic() - started < 2
+
+
+def test_aaoifi_fetch_propagates_the_deadline(monkeypatch):
+    monkeypatch.setattr(aaoifi.yf, "Ticker", HangingTicker)
+
+    with deadlines.activate(Deadline(0.2)):
+        with pytest.raises(DeadlineExceeded) as raised:
+            aaoifi.fetch_inputs("WIL.SI", 730)
+    HangingTicker.release.set()
+
+    assert raised.value.operation == "yfinance.balance_sheet"
@@ -0,0 +1,55 @@
+"""Tests for delta re-investigation."""
+import pytest
+
+import evidence
+import main
+import tracing
+from config import RunSettings
+from evidence import EvidenceSet, canonical_url
+from metrics import RunMetrics
+from tools import SearchError
+
+
+def _evidence(*results):
+    items = evidence.items_from_search("Acme Pte Ltd fraud", list(results))
+    return EvidenceSet("run", "Acme Pte Ltd", 0.0, ["Acme Pte Ltd fraud"], items)
+
+
+def test_same_page_found_via_different_urls_compares_equal():
+    assert canonical_url("http://www.News.example.com:443/acme/?utm_source=x&b=2&a=1#top") == \
+        canonical_url("https://news.example.com/acme?a=1&b=2")
+
+
+def test_diff_reports_only_new_or_changed_results():
+    previous = _evidence(
+        {"href": "https://news.example.com/acme", "title": "Acme wins award", "body": ""},
+        {"href": "https://registry.example.com/acme", "title": "Acme Pte Ltd", "body": "Live"},
+    )
+    current = _evidence(
+        {"href": "https://www.news.example.com/acme/", "title": "Acme wins award", "body": ""},
+        {"href": "https://registry.example.com/acme", "title": "Acme Pte Ltd", "body": "Gone"},
+        {"href": "https://court.example.com/acme", "title": "Acme sued", "body": ""},
+    )
+
+    changed = evidence.diff(previous, current)
+
+    assert [item.url for item in changed] == [
+        "https://registry.example.com/acme", "https://court.example.com/acme"
+    ]
+
+
+def test_delta_with_every_search_failed_is_not_reported_as_unchanged(monkeypatch):
+    class FailingSearch:
+        def __init__(self, settings):
+            pass
+
+        def search(self, query, refresh=False):
+            raise SearchError("Ratelimit")
+
+    monkeypatch.setattr(main, "GhostHunterSearchTool", FailingSearch)
+
+    with pytest.raises(SearchError, match="All 1 delta searches failed"):
+        main._execute_delta_investigation(
+            "Acme Pte Ltd", None, False, None, RunSettings(), None, RunMetrics(),
+            tracing.Tracer(), _evidence()
+        )
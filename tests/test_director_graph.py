@@ -0,0 +1,59 @@
+"""Tests for the director-company network graph."""
+import director_graph
+from director_graph import DirectorGraph
+
+ROWS = [
+    # A nominee director on three shell companies at one serviced address
+    {"company": "Alpha Pte Ltd", "officer": "John Tan", "address": "1 Raffles Place #20-01"},
+    {"company": "Beta Pte Ltd", "officer": "John Tan", "address": "1  raffles place #20-01"},
+    {"company": "Gamma Pte Ltd", "officer": "John Tan", "address": "1 Raffles Place #20-01"},
+    {"company": "Alpha Pte Ltd", "officer": "Mary Lim"},
+    # Linked to Gamma only through a shared officer
+    {"company": "Delta Pte Ltd", "officer": "Mary Lim", "address": "9 Jurong Road"},
+    {"company": "Solo Pte Ltd", "officer": "Ali Rahman", "address": "5 Orchard Road"},
+    {"company": "", "officer": "Nobody"},
+]
+
+
+def test_company_profile_flags_nominee_directors():
+    graph = DirectorGraph.from_rows(ROWS)
+
+    profile = graph.company_profile("alpha pte. ltd.", nominee_threshold=3)
+
+    assert profile.company == "Alpha Pte Ltd"
+    assert [(o.name, o.companies) for o in profile.officers] == [("John Tan", 3), ("Mary Lim", 2)]
+    assert [o.name for o in profile.nominee_suspects] == ["John Tan"]
+    assert profile.companies_at_address == 3
+    assert profile.to_row()["nominee_suspects"] == "John Tan (3)"
+
+
+def test_shared_officers_and_addresses_form_one_cluster():
+    graph = DirectorGraph.from_rows(ROWS)
+
+    cluster, size = graph.cluster_of("Delta Pte Ltd")
+
+    assert size == 4
+    assert graph.cluster_of("Beta Pte Ltd") == (cluster, size)
+    assert graph.cluster_of("Solo Pte Ltd")[1] == 1
+    assert graph.cluster_of("Unknown Pte Ltd") is None
+    assert graph.director_company_count("JOHN TAN") == 3
+    assert graph.top_directors(1) == [("John Tan", 3)]
+
+
+def test_load_graph_reads_the_dump_and_reuses_the_cached_build(tmp_path):
+    dump = tmp_path / "officers.csv"
+    dump.write_text(
+        "Entity_Name,UEN,Director_Name,Registered_Address\n"
+        "Alpha Pte Ltd,201900001A,John Tan,1 Raffles Place\n"
+        "Alpha Private Limited,201900001A,Mary Lim,1 Raffles Place\n",
+        encoding="utf-8",
+    )
+
+    graph = director_graph.load_graph(str(dump))
+    cached = director_graph.load_graph(str(dump))
+
+    assert (tmp_path / "officers.csv.graph.pickle").exists()
+    assert cached.stats() == graph.stats()
+    assert graph.company_profile("201900001A").officers == \
+        graph.company_profile("Alpha Private Limited").officers
+    assert len(graph.company_profile("Alpha Pte Ltd").officers) == 2
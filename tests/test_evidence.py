@@ -0,0 +1,49 @@
+"""Tests for the evidence store."""
+import evidence
+from config import Config
+from evidence import EvidenceRecorder, EvidenceStore
+
+RESULTS = [
+    {"href": "https://news.example.com/acme", "title": "Acme fined", "body": "MAS penalty"},
+    {"href": "https://registry.example.com/acme", "title": "Acme Pte Ltd", "body": "Live"},
+]
+
+
+def test_identical_payloads_are_stored_once(tmp_path):
+    store = EvidenceStore(str(tmp_path))
+
+    first = store.put({"b": 1, "a": [1, 2]})
+    second = store.put({"a": [1, 2], "b": 1})
+
+    assert first == second
+    assert store.get(first) == {"a": [1, 2], "b": 1}
+    assert store.stats()["objects"] == 1
+
+
+def test_completed_run_is_rebuilt_as_delta_baseline(tmp_path):
+    store = EvidenceStore(str(tmp_path))
+    recorder = EvidenceRecorder("run-1", "Acme Pte Ltd", store)
+
+    recorder.record_search("Acme Pte Ltd fraud", RESULTS)
+    recorder.record_search("Acme Pte Ltd directors", RESULTS[1:])
+    snapshot = recorder.snapshot()
+    store.complete_run(snapshot.run_id, snapshot.company, snapshot.created_at, snapshot.queries)
+
+    baseline = store.latest_run("ACME pte ltd")
+    assert baseline.queries == ["Acme Pte Ltd fraud", "Acme Pte Ltd directors"]
+    assert evidence.diff(baseline, snapshot) == []
+    assert store.stats()["observations"] == 2
+
+
+def test_recent_observations_are_reused_across_runs(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "EVIDENCE_REUSE_SECONDS", 3600)
+    store = EvidenceStore(str(tmp_path))
+    store.record("run-1", "Acme Pte Ltd", evidence.FINANCE_TOOL, "ACME", {"marketCap": 5})
+    recorder = EvidenceRecorder("run-2", "Acme Pte Ltd", store)
+
+    with evidence.activate(recorder):
+        reused = evidence.reuse(evidence.FINANCE_TOOL, "ACME")
+        missing = evidence.reuse(evidence.FINANCE_TOOL, "OTHER")
+
+    assert reused == {"marketCap": 5} and missing is None
+    assert [o.run_id for o in store.observations("run-2")] == ["run-2"]
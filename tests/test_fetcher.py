@@ -0,0 +1,141 @@
+"""Tests for the concurrent page fetcher, against a local HTTP server."""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import deadlines
+import fetcher
+from fetcher import PageCache, PageFetcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the fixed routes the tests fetch and records what it saw."""
+
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for name, value in {"Content-Type": "text/plain", **(headers or {})}.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, dict(self.headers)))
+        if self.path == "/big":
+            self._send(200, b"registered office shared by many firms\n" * 30_000)
+        elif self.path.startswith("/slow"):
+            with server.lock:
+                server.active += 1
+                server.peak = max(server.peak, server.active)
+            time.sleep(0.2)
+            with server.lock:
+                server.active -= 1
+            self._send(200, b"slow page")
+        elif self.path == "/etag":
+            if self.headers.get("If-None-Match") == '"v1"':
+                self._send(304, headers={"ETag": '"v1"'})
+            else:
+                self._send(200, b"director: Jane Tan", headers={"ETag": '"v1"'})
+        elif self.path == "/hang":
+            time.sleep(3)
+            self._send(200, b"too late")
+        elif self.path == "/redirect":
+            self._send(302, headers={"Location": f"http://127.0.0.2:{server.server_port}/etag"})
+        else:
+            self._send(404)
+
+
+@pytest.fixture
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    httpd.daemon_threads = True
+    # Clients the tests cancel on purpose disconnect mid-response
+    httpd.handle_error = lambda request, client_address: None
+    httpd.lock = threading.Lock()
+    httpd.requests, httpd.active, httpd.peak = [], 0, 0
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _url(server, path):
+    return f"http://127.0.0.1:{server.server_port}{path}"
+
+
+def _local_fetcher(**kwargs):
+    return PageFetcher(allow_private_hosts=True, cache=None, timeout=5, **kwargs)
+
+
+def test_body_is_capped_at_max_bytes(server):
+    page, = _local_fetcher(max_bytes=10_000, token_budget=100_000).fetch([_url(server, "/big")])
+
+    assert page.error is None
+    assert 0 < len(page.text) <= 10_000
+
+
+def test_per_host_concurrency_is_bounded(server):
+    urls = [_url(server, f"/slow?{i}") for i in range(6)]
+
+    pages = _local_fetcher(max_concurrency=6, per_host_limit=2).fetch(urls)
+
+    assert all(page.error is None for page in pages)
+    assert server.peak == 2
+
+
+def test_cached_page_is_revalidated_with_etag(server, tmp_path):
+    page_fetcher = _local_fetcher(cache_ttl=0)
+    page_fetcher.cache = PageCache(str(tmp_path))
+
+    first, = page_fetcher.fetch([_url(server, "/etag")])
+    second, = page_fetcher.fetch([_url(server, "/etag")])
+
+    assert not first.from_cache
+    assert second.from_cache and second.text == first.text == "director: Jane Tan"
+    assert server.requests[-1][1].get("If-None-Match") == '"v1"'
+
+
+def test_deadline_cancels_fetches_in_flight(server):
+    started = time.monotonic()
+    with deadlines.activate(deadlines.from_seconds(0.3)):
+        page, = _local_fetcher().fetch([_url(server, "/hang")])
+
+    assert page.error.startswith("Cancelled")
+    assert time.monotonic() - started < 2
+
+
+@pytest.mark.parametrize("host", ["127.0.0.1", "localhost", "[::1]"])
+def test_private_hosts_are_refused_by_default(server, host):
+    page, = PageFetcher(cache=None).fetch([f"http://{host}:{server.server_port}/etag"])
+
+    assert page.error and "non-public address" in page.error
+    assert server.requests == []
+
+
+def test_redirect_target_is_checked_again(server, monkeypatch):
+    # Trust only the first hop: the redirect to 127.0.0.2 must still be refused
+    monkeypatch.setattr(fetcher, "is_public_address", lambda address: address == "127.0.0.1")
+
+    page, = PageFetcher(cache=None).fetch([_url(server, "/redirect")])
+
+    assert page.error and "127.0.0.2" in page.error
+    assert [path for path, _ in server.requests] == ["/redirect"]
+
+
+@pytest.mark.parametrize("address, public", [
+    ("8.8.8.8", True),
+    ("10.0.0.1", False),
+    ("169.254.169.254", False),
+    ("::ffff:127.0.0.1", False),
+    ("fe80::1%eth0", False),
+])
+def test_public_address_classification(address, public):
+    assert fetcher.is_public_address(address) is public
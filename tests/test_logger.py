@@ -0,0 +1,36 @@
+"""Tests for the logging pipeline."""
+import json
+import logging
+
+import logger
+from config import Config
+
+
+def test_records_are_enqueued_raw_and_formatted_by_the_listener(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "LOG_FORMAT", "json")
+    monkeypatch.setattr(Config, "LOG_LEVEL", "DEBUG")
+    log_file = tmp_path / "run.log"
+    test_logger = logger.setup_logger("ghost_office_hunter.test", str(log_file))
+    test_logger.propagate = False
+    listener = logger._listeners.pop()
+    try:
+        listener.stop()
+        with logger.log_context(run_id="run-1", company="Acme Pte Ltd"):
+            test_logger.debug("Checked %d sources for %s", 3, "Acme Pte Ltd")
+        test_logger.debug("Outside a run")
+
+        queued = [listener.queue.get_nowait() for _ in range(2)]
+        assert queued[0].args == (3, "Acme Pte Ltd") and not hasattr(queued[0], "message")
+        for record in queued:
+            listener.queue.put(record)
+        listener.start()
+        listener.stop()
+    finally:
+        for handler in listener.handlers:
+            handler.close()
+        logging.getLogger("ghost_office_hunter.test").handlers.clear()
+
+    lines = [json.loads(line) for line in log_file.read_text(encoding="utf-8").splitlines()]
+    assert lines[0]["message"] == "Checked 3 sources for Acme Pte Ltd"
+    assert (lines[0]["run_id"], lines[0]["company"]) == ("run-1", "Acme Pte Ltd")
+    assert lines[1]["run_id"] == "-"
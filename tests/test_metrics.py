@@ -0,0 +1,45 @@
+"""Tests for run-level metrics."""
+import pickle
+
+import metrics
+from metrics import Histogram, RunMetrics
+
+
+def test_histogram_quantiles_use_bucket_bounds():
+    histogram = Histogram(buckets=(0.1, 1.0, 10.0))
+    for value in (0.05, 0.5, 0.6, 4.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [1, 2, 1]
+    assert histogram.quantile(0.5) == 1.0
+    assert histogram.quantile(1.0) == 4.0
+
+
+def test_finished_runs_are_merged_into_the_registry(monkeypatch):
+    registry = RunMetrics(run_id="process")
+    monkeypatch.setattr(metrics, "REGISTRY", registry)
+    run_metrics = RunMetrics(run_id="run-1")
+
+    with metrics.activate(run_metrics):
+        metrics.current().record_cache("ddgs", True)
+        metrics.current().record_cache("ddgs", False)
+        metrics.current().observe("tool_latency_seconds", 0.2, tool="GhostHunterSearchTool")
+    metrics.current().increment("service_jobs_total", outcome="queued")
+
+    assert run_metrics.to_dict()["cache_hit_rate"] == 0.5
+    assert run_metrics.counter_value("service_jobs_total", outcome="queued") == 0
+    assert registry.counter_value("cache_requests_total", cache="ddgs", result="hit") == 1
+    assert registry.counter_value("service_jobs_total", outcome="queued") == 1
+
+
+def test_prometheus_exposition_and_pickling():
+    run_metrics = RunMetrics(run_id="run-1")
+    run_metrics.increment("tool_retries_total", tool='Search "DDGS"')
+    run_metrics.observe("run_duration_seconds", 3.0)
+
+    text = pickle.loads(pickle.dumps(run_metrics)).to_prometheus()
+
+    assert "# TYPE ghost_hunter_tool_retries_total counter" in text
+    assert 'ghost_hunter_tool_retries_total{tool="Search \\"DDGS\\""} 1' in text
+    assert 'ghost_hunter_run_duration_seconds_bucket{le="2.5"} 0' in text
+    assert 'ghost_hunter_run_duration_seconds_bucket{le="+Inf"} 1' in text
@@ -0,0 +1,58 @@
+"""Tests for the portfolio dataset."""
+import pytest
+
+import portfolio
+from benchmarks import stubs
+from config import Config
+from portfolio import PortfolioDataset
+
+REPORT = """# Investigation: Acme Pte Ltd
+
+**Risk Rating:** HIGH
+
+Acme Pte Ltd was fined for money laundering breaches. Source: https://news.example.com/acme
+"""
+
+ISOLATED_SETTINGS = (
+    "OUTPUT_DIR", "REPORT_DB", "EVIDENCE_DIR", "PORTFOLIO_DIR", "WATCHLIST_DB",
+    "SHARED_CACHE_DB", "FETCH_CACHE_DIR", "AAOIFI_CACHE_DIR",
+)
+
+
+def test_isolated_runs_write_their_portfolio_rows_under_the_temp_dir(tmp_path, monkeypatch):
+    for name in ISOLATED_SETTINGS:
+        monkeypatch.setattr(Config, name, getattr(Config, name))
+
+    stubs.isolate_state(str(tmp_path))
+    dataset = portfolio.get_portfolio()
+
+    assert all(str(getattr(Config, name)).startswith(str(tmp_path)) for name in ISOLATED_SETTINGS)
+    assert dataset.root == tmp_path / "portfolio"
+
+
+def test_append_load_and_compact(tmp_path):
+    dataset = PortfolioDataset(str(tmp_path), file_format="csv")
+    first = portfolio.extract_record("Acme Pte Ltd", REPORT, run_id="run-1", created_at=1.0)
+    second = {**first, "run_id": "run-2", "created_at": 2.0, "risk_rating": "LOW"}
+    other = portfolio.extract_record("Beta Pte Ltd", "", run_id="run-3", created_at=3.0)
+
+    dataset.append([first])
+    dataset.append([second, other])
+
+    frame = dataset.load()
+    assert list(frame["run_id"]) == ["run-1", "run-2", "run-3"]
+    assert frame.loc[0, "risk_rating"] == "HIGH"
+    assert frame.loc[0, "flags_adverse_media"] > 0
+    assert frame.loc[0, "report_sources"] == 1
+    assert list(dataset.load(latest_only=True)["run_id"]) == ["run-2", "run-3"]
+
+    assert dataset.compact(latest_only=True) == 2
+    assert len(dataset.parts()) == 1
+    assert list(dataset.load()["run_id"]) == ["run-2", "run-3"]
+
+
+def test_parquet_needs_pyarrow(tmp_path, monkeypatch):
+    monkeypatch.setattr(portfolio, "pyarrow", None)
+
+    with pytest.raises(RuntimeError, match="pyarrow"):
+        PortfolioDataset(str(tmp_path), file_format="parquet")
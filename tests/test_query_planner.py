@@ -0,0 +1,44 @@
+"""Tests for search query planning."""
+
+from query_planner import QueryPlanner
+from tools import GhostHunterSearchTool, SearchError
+
+
+def _run(planner, query, results):
+    planned, = planner.plan([query])
+    if planned.execute is not None:
+        planner.record(planned, results)
+    return planned
+
+
+def test_broader_query_is_not_served_from_a_narrower_one():
+    planner = QueryPlanner(budget=0)
+    _run(planner, "Acme Pte Ltd registered office address", [{"title": "address"}])
+
+    for query in ("Acme Pte Ltd", "Acme Pte Ltd address"):
+        assert planner.plan([query])[0].execute == query
+
+
+def test_reordered_query_with_filler_is_a_duplicate():
+    planner = QueryPlanner(budget=0)
+    results = [{"title": "fraud"}]
+    _run(planner, "Acme Pte Ltd fraud", results)
+
+    planned, = planner.plan(["latest news fraud Acme Pte Ltd"])
+
+    assert planned.execute is None and planned.results == results
+
+
+def test_failed_search_refunds_its_budget_slot(monkeypatch):
+    def failing_search(self, query, refresh=False):
+        raise SearchError("DDGS unavailable")
+
+    monkeypatch.setattr(GhostHunterSearchTool, "search", failing_search)
+    planner = QueryPlanner(budget=2)
+    tool = GhostHunterSearchTool(planner=planner)
+
+    output = tool._run("Acme Pte Ltd fraud; Beta Holdings liquidators")
+
+    assert output.count("DDGS unavailable") == 2
+    assert planner.executed == 0
+    assert "2 of 2 searches left" in output
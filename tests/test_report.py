@@ -0,0 +1,47 @@
+"""Tests for incremental report writing."""
+from types import SimpleNamespace
+
+from report import INCOMPLETE_SECTION, ReportWriter
+
+
+def test_sections_stream_to_the_partial_file_and_listeners(tmp_path):
+    seen = []
+    writer = ReportWriter(str(tmp_path / "acme.md"), on_section=lambda t, c: seen.append(t))
+
+    writer.task_callback(SimpleNamespace(agent="Registry Researcher", raw="Registry findings"))
+    partial = writer.partial_path.read_text(encoding="utf-8")
+    writer.append_section("Shariah Analyst", "PASS")
+
+    assert seen == ["Registry Researcher", "Shariah Analyst"]
+    assert "Registry findings" in partial and not (tmp_path / "acme.md").exists()
+
+    path = writer.finalize()
+
+    assert not writer.partial_path.exists()
+    report = open(path, encoding="utf-8").read()
+    assert report.index("Registry findings") < report.index("---") < report.index("PASS")
+    assert report == writer.render()
+
+
+def test_failing_listener_does_not_abort_the_run(tmp_path):
+    def broken(title, content):
+        raise RuntimeError("UI disconnected")
+
+    writer = ReportWriter(str(tmp_path / "acme.md"), on_section=broken)
+    writer.append_section("Registry Researcher", "Registry findings")
+
+    assert writer.sections == [("Registry Researcher", "Registry findings")]
+
+
+def test_sections_after_a_timeout_are_dropped(tmp_path):
+    writer = ReportWriter(str(tmp_path / "acme.md"), preamble="# Earlier report\n")
+    writer.append_section("Registry Researcher", "Registry findings")
+
+    writer.mark_incomplete("Deadline of 60s reached.")
+    writer.append_section("Shariah Analyst", "late output")
+    report = open(writer.finalize(), encoding="utf-8").read()
+
+    assert report.startswith("# Earlier report")
+    assert [title for title, _ in writer.sections] == ["Registry Researcher", INCOMPLETE_SECTION]
+    assert "late output" not in report
+    assert "Sections completed before the cut-off: Registry Researcher" in report
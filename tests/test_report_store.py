@@ -0,0 +1,63 @@
+"""Tests for the report store."""
+import pytest
+
+from report_store import ReportStore, compute_input_hash
+
+ACME_V1 = """# Investigation: Acme Pte Ltd
+
+**Risk Rating:** LOW
+
+No adverse media was found. The registered office is a serviced address.
+"""
+
+ACME_V2 = """# Investigation: Acme Pte Ltd
+
+**Risk Rating:** HIGH
+
+Acme Pte Ltd was struck off after liquidators found shell company transfers.
+"""
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ReportStore(str(tmp_path / "reports.db"))
+
+
+def test_versions_are_numbered_per_company(store):
+    inputs = compute_input_hash("Acme Pte Ltd", region="sg-en")
+    first = store.add("Acme Pte Ltd", ACME_V1, inputs, metrics={"tokens": 10})
+    second = store.add(
+        "  ACME pte ltd ", ACME_V2, compute_input_hash("Acme Pte Ltd", region="wt-wt")
+    )
+    other = store.add("Beta Pte Ltd", ACME_V1, compute_input_hash("Beta Pte Ltd"))
+
+    assert (first.version, second.version, other.version) == (1, 2, 1)
+    assert inputs == compute_input_hash("acme  PTE LTD", region="sg-en")
+    assert [r.version for r in store.history("Acme Pte Ltd")] == [2, 1]
+    assert store.latest("acme pte ltd").risk_rating == "HIGH"
+    assert store.find_by_input_hash(inputs).id == first.id
+    assert store.get_metrics(first.id) == {"tokens": 10}
+    assert store.get_body(second.id) == ACME_V2
+
+
+def test_full_text_search_ranks_and_highlights(store):
+    if not store.fts_enabled:
+        pytest.skip("SQLite built without FTS5")
+    store.add("Acme Pte Ltd", ACME_V1, "h1")
+    flagged = store.add("Acme Pte Ltd", ACME_V2, "h2")
+
+    results = store.search("liquidators")
+
+    assert [r.id for r in results] == [flagged.id]
+    assert "**liquidators**" in results[0].snippet
+    # Input that is not valid FTS syntax is searched as a phrase
+    assert [r.id for r in store.search('shell company"')] == [flagged.id]
+    assert len(store.search("")) == 2
+
+
+def test_search_falls_back_to_like_without_fts(store):
+    store.add("Acme Pte Ltd", ACME_V1, "h1")
+    store.fts_enabled = False
+
+    assert [r.company for r in store.search("serviced address")] == ["Acme Pte Ltd"]
+    assert store.search("liquidators") == []
@@ -0,0 +1,65 @@
+"""Tests for per-route model selection."""
+from types import SimpleNamespace
+
+import agents
+import metrics
+from config import RunSettings
+from metrics import RunMetrics
+
+
+class FakeLLM:
+    """LLM stand-in with cumulative token usage, like crewai's LLM."""
+
+    def __init__(self, model, prompt_tokens):
+        self.model = model
+        self.prompt_tokens = prompt_tokens
+
+    def call(self, messages):
+        return "answer"
+
+    def get_token_usage_summary(self):
+        return SimpleNamespace(
+            prompt_tokens=self.prompt_tokens, completion_tokens=10, successful_requests=1
+        )
+
+
+def test_unset_routes_fall_back_to_the_run_model():
+    settings = RunSettings(model_name="gpt-4o", research_model="gpt-4o-mini", synthesis_model="")
+
+    assert settings.model_for(agents.ROUTE_RESEARCH) == "gpt-4o-mini"
+    assert settings.model_for(agents.ROUTE_SYNTHESIS) == "gpt-4o"
+    assert settings.separate_synthesis
+    assert not RunSettings(model_name="gpt-4o", research_model="").separate_synthesis
+
+
+def test_function_calling_route_is_optional(monkeypatch):
+    monkeypatch.setenv("OPENAI_API_KEY", "test-key")
+    assert agents.build_function_calling_llm(RunSettings(function_calling_model="")) is None
+
+    llm = agents.build_function_calling_llm(RunSettings(function_calling_model="gpt-4o-mini"))
+
+    assert llm.model == "gpt-4o-mini"
+    assert llm.metrics_route == agents.ROUTE_FUNCTION_CALLING
+
+
+def test_latency_and_tokens_are_recorded_per_route():
+    run_metrics = RunMetrics()
+    research = metrics.instrument_llm(FakeLLM("gpt-4o-mini", 100), agents.ROUTE_RESEARCH)
+    synthesis = metrics.instrument_llm(FakeLLM("gpt-4o", 40), agents.ROUTE_SYNTHESIS)
+
+    with metrics.activate(run_metrics):
+        research.call([])
+    metrics.record_llm_usage(run_metrics, [research, synthesis, research])
+    research.prompt_tokens = 150
+    metrics.record_llm_usage(run_metrics, [research])
+
+    summary = run_metrics.to_dict()
+    assert summary["histograms"]["llm_latency_seconds"][0]["labels"] == {
+        "model": "gpt-4o-mini", "route": "research"
+    }
+    assert run_metrics.counter_value(
+        "llm_tokens_total", kind="prompt", route="research", model="gpt-4o-mini"
+    ) == 150
+    assert run_metrics.counter_value(
+        "llm_tokens_total", kind="prompt", route="synthesis", model="gpt-4o"
+    ) == 40
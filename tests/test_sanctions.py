@@ -0,0 +1,53 @@
+"""Tests for the sanctions/PEP screening index."""
+import csv
+
+import pytest
+
+from sanctions import SanctionsIndex, format_hits
+
+
+def _write_list(path, names):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["uid", "name", "type", "program"])
+        for i, name in enumerate(names):
+            writer.writerow([f"E{i}", name, "individual", "SDGT"])
+
+
+@pytest.fixture
+def common_names_index(tmp_path):
+    # 3,001 names where "muhammad" and "ali" are far above the frequent-key limit
+    names = ["Muhammad Ali"]
+    names += [f"Muhammad Ali Person{i}" for i in range(1000)]
+    names += [f"Muhammad Khan{i}" for i in range(1000)]
+    names += [f"Ali Hassan{i}" for i in range(1000)]
+    _write_list(tmp_path / "consolidated.csv", names)
+    return SanctionsIndex(str(tmp_path), reload_seconds=0)
+
+
+def test_exact_name_of_common_words_is_found(common_names_index):
+    hits = common_names_index.search("Muhammad Ali", min_score=0)
+
+    assert hits
+    assert hits[0].entry.name == "Muhammad Ali"
+    assert hits[0].score == 1.0
+
+
+def test_exact_match_ignores_case_accents_and_legal_suffixes(common_names_index):
+    hits = common_names_index.search("MUHAMMAD ALÍ LTD", min_score=0.9)
+
+    assert [hit.entry.name for hit in hits] == ["Muhammad Ali"]
+    assert "no match" not in format_hits("MUHAMMAD ALÍ LTD", hits)
+
+
+def test_unlisted_name_of_common_words_still_gets_candidates(common_names_index):
+    hits = common_names_index.search("Ali Muhammad", min_score=0)
+
+    assert hits
+    assert all({"muhammad", "ali"} <= set(hit.matched_name.lower().split()) for hit in hits)
+
+
+def test_rare_word_still_ranks_its_names_first(common_names_index):
+    hits = common_names_index.search("Muhammad Khan17", min_score=0.9)
+
+    assert hits[0].entry.name == "Muhammad Khan17"
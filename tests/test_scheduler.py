@@ -0,0 +1,60 @@
+"""Tests for the watchlist scheduler."""
+import time
+
+import pytest
+
+import main
+from report import INCOMPLETE_SECTION
+from scheduler import RateBudget, Scheduler, Watchlist
+
+
+@pytest.fixture
+def watchlist(tmp_path):
+    return Watchlist(str(tmp_path / "watchlist.db"))
+
+
+def _fake_investigation(tmp_path, incomplete):
+    def run_investigation(company_name, output_path=None, on_section=None, **options):
+        report_path = tmp_path / f"{company_name}.md"
+        report_path.write_text("**Risk Rating: HIGH**\n", encoding="utf-8")
+        if incomplete:
+            on_section(
+                INCOMPLETE_SECTION,
+                "## ⚠️ Incomplete Report — SEARCHES FAILED\n\n2 of 5 delta searches failed."
+            )
+        return str(report_path)
+    return run_investigation
+
+
+@pytest.mark.parametrize("incomplete", [False, True])
+def test_incomplete_runs_are_failures(watchlist, tmp_path, monkeypatch, incomplete):
+    monkeypatch.setattr(main, "run_investigation", _fake_investigation(tmp_path, incomplete))
+    watchlist.add("Acme Pte Ltd")
+
+    Scheduler(watchlist, workers=1, runs_per_hour=3600, poll_seconds=0.05).run(once=True)
+
+    entry, = watchlist.entries()
+    if incomplete:
+        assert entry.failures == 1 and entry.last_run_at is None and entry.not_before > time.time()
+    else:
+        assert entry.failures == 0 and entry.last_run_at is not None and entry.last_risk == "HIGH"
+
+
+def test_rate_budget_charges_earlier_starts():
+    now = time.time()
+    budget = RateBudget(per_hour=1, burst=2, starts=[now - 20, now - 10])
+
+    assert not budget.try_acquire()
+    assert budget.seconds_until_available() == pytest.approx(3600 - 20, abs=5)
+
+
+def test_rate_budget_survives_a_scheduler_restart(watchlist):
+    first = Scheduler(watchlist, workers=2, runs_per_hour=1)
+    for _ in range(2):
+        assert first.budget.try_acquire()
+        watchlist.record_start(time.time(), first.budget.refill_seconds)
+
+    restarted = Scheduler(watchlist, workers=2, runs_per_hour=1)
+
+    assert not restarted.budget.try_acquire()
+    assert restarted.budget.seconds_until_available() > 3000
@@ -0,0 +1,91 @@
+"""Tests for the DuckDuckGo search tool's upstream handling."""
+import pytest
+from ddgs.exceptions import DDGSException
+
+import circuit_breaker
+import tools
+from config import Config
+from tools import GhostHunterSearchTool, SearchError
+
+
+class ScriptedDDGS:
+    """DDGS stand-in that raises or returns what the test scripted."""
+
+    calls = 0
+    outcome = None
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def text(self, query, **kwargs):
+        ScriptedDDGS.calls += 1
+        if isinstance(ScriptedDDGS.outcome, Exception):
+            raise ScriptedDDGS.outcome
+        return ScriptedDDGS.outcome
+
+
+@pytest.fixture
+def search_tool(monkeypatch):
+    ScriptedDDGS.calls = 0
+    monkeypatch.setattr(tools, "DDGS", ScriptedDDGS)
+    monkeypatch.setattr(Config, "SHARED_CACHE_DB", "")
+    monkeypatch.setattr(Config, "CIRCUIT_BREAKER_ENABLED", True)
+    monkeypatch.setattr(circuit_breaker, "_breakers", {})
+    monkeypatch.setattr(
+        GhostHunterSearchTool, "_wait_before_retry", lambda self, attempt, delay: None
+    )
+    return GhostHunterSearchTool()
+
+
+def test_no_results_is_an_empty_answer(search_tool):
+    ScriptedDDGS.outcome = DDGSException(tools.DDGS_NO_RESULTS)
+
+    assert search_tool.search("obscure company pte ltd") == []
+    assert ScriptedDDGS.calls == 1
+
+
+def test_no_results_never_opens_the_circuit(search_tool):
+    ScriptedDDGS.outcome = DDGSException(tools.DDGS_NO_RESULTS)
+
+    for i in range(Config.CIRCUIT_MIN_CALLS * 2):
+        search_tool.search(f"obscure company {i}")
+
+    assert not circuit_breaker.is_open(circuit_breaker.DDGS)
+    assert circuit_breaker.get_breaker(circuit_breaker.DDGS).snapshot()["failures_in_window"] == 0
+
+
+def test_engine_errors_are_still_retried_and_counted(search_tool):
+    ScriptedDDGS.outcome = DDGSException("https://html.duckduckgo.com/html 202 Ratelimit")
+
+    with pytest.raises(SearchError):
+        search_tool.search("acme pte ltd")
+
+    assert ScriptedDDGS.calls > 1
+    assert circuit_breaker.get_breaker(circuit_breaker.DDGS).snapshot()["failures_in_window"] > 0
+
+
+@pytest.fixture
+def cached_search_tool(search_tool, monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, "SHARED_CACHE_DB", str(tmp_path / "shared.db"))
+    monkeypatch.setattr(Config, "EVIDENCE_REUSE_SECONDS", 0)
+    return search_tool
+
+
+def test_refresh_bypasses_and_updates_the_shared_cache(cached_search_tool):
+    ScriptedDDGS.outcome = [{"title": "old", "body": "", "href": "https://example.com/old"}]
+    cached_search_tool.search("acme pte ltd")
+    ScriptedDDGS.outcome = [{"title": "new", "body": "", "href": "https://example.com/new"}]
+
+    assert cached_search_tool.search("acme pte ltd")[0]["title"] == "old"
+    assert cached_search_tool.search("acme pte ltd", refresh=True)[0]["title"] == "new"
+    assert cached_search_tool.search("acme pte ltd")[0]["title"] == "new"
+    assert ScriptedDDGS.calls == 2
+
+
+def test_empty_results_are_not_cached(cached_search_tool):
+    ScriptedDDGS.outcome = []
+    assert cached_search_tool.search("acme pte ltd") == []
+    ScriptedDDGS.outcome = [{"title": "found", "body": "", "href": "https://example.com/found"}]
+
+    assert cached_search_tool.search("acme pte ltd")[0]["title"] == "found"
+    assert ScriptedDDGS.calls == 2
@@ -0,0 +1,185 @@
+"""Tests for the headless HTTP service."""
+import http.client
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import pytest
+
+import service
+from config import Config
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+class BlockingRunner:
+    """``run_investigation`` stand-in that reports one section, then waits to be released."""
+
+    def __init__(self):
+        self.release = threading.Event()
+        self.calls = []
+
+    def __call__(self, company_name, output_path, on_section=None, **kwargs):
+        self.calls.append(company_name)
+        on_section("Registry Research", f"## Registry Research\n\n{company_name} is registered.")
+        self.release.wait(10)
+        Path(output_path).write_text(f"# Report on {company_name}\n", encoding="utf-8")
+        return output_path
+
+
+@pytest.fixture
+def runner():
+    return BlockingRunner()
+
+
+@pytest.fixture
+def server(runner, tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, "OUTPUT_DIR", str(tmp_path))
+    monkeypatch.setattr(Config, "SERVICE_API_TOKEN", "")
+    manager = service.JobManager(workers=1, max_queue=0, runner=runner)
+    httpd = service.create_server(manager, "127.0.0.1", 0)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    runner.release.set()
+    httpd.shutdown()
+    httpd.server_close()
+    manager.shutdown()
+
+
+def _request(port, method, path, body=None, headers=None):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=30)
+    data = json.dumps(body).encode("utf-8") if body is not None else None
+    connection.request(method, path, body=data, headers=headers or {})
+    response = connection.getresponse()
+    payload = response.read()
+    connection.close()
+    content_type = response.getheader("Content-Type", "")
+    return response, json.loads(payload) if content_type == "application/json" else payload.decode()
+
+
+def _read_events(port, job_id):
+    """Collect SSE events until the job reports a final status."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=120)
+    connection.request("GET", f"/investigations/{job_id}/events")
+    response = connection.getresponse()
+    assert response.getheader("Content-Type") == "text/event-stream"
+    events, kind = [], None
+    for raw in response:
+        line = raw.decode("utf-8").rstrip("\n")
+        if line.startswith("event: "):
+            kind = line[len("event: "):]
+        elif line.startswith("data: "):
+            events.append((kind, json.loads(line[len("data: "):])))
+    connection.close()
+    return events
+
+
+def test_submit_returns_accepted_job(server, runner):
+    port = server.server_address[1]
+
+    response, body = _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+
+    assert response.status == 202
+    assert response.getheader("Location") == f"/investigations/{body['id']}"
+    assert body["company"] == "Acme Pte Ltd" and body["deduplicated"] is False
+    runner.release.set()
+    _read_events(port, body["id"])
+    response, status = _request(port, "GET", f"/investigations/{body['id']}")
+    assert status["status"] == service.SUCCEEDED
+    response, report = _request(port, "GET", status["report_url"])
+    assert response.status == 200 and report == "# Report on Acme Pte Ltd\n"
+
+
+def test_identical_submission_is_deduplicated(server, runner):
+    port = server.server_address[1]
+
+    _, first = _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+    response, second = _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+
+    assert response.status == 200
+    assert second["id"] == first["id"] and second["deduplicated"] is True
+    runner.release.set()
+    _read_events(port, first["id"])
+    assert runner.calls == ["Acme Pte Ltd"]
+
+
+def test_full_queue_answers_429_with_retry_after(server):
+    port = server.server_address[1]
+    _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+
+    response, body = _request(port, "POST", "/investigations", {"company": "Other Pte Ltd"})
+
+    assert response.status == 429
+    assert response.getheader("Retry-After") == str(Config.SERVICE_RETRY_AFTER)
+    assert "try again later" in body["error"]
+
+
+def test_event_stream_reports_sections_and_final_status(server, runner):
+    port = server.server_address[1]
+    _, job = _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+
+    threading.Timer(0.2, runner.release.set).start()
+    events = _read_events(port, job["id"])
+
+    assert [kind for kind, _ in events] == ["status", "status", "section", "status"]
+    assert events[2][1]["title"] == "Registry Research"
+    assert events[-1][1] == {"status": service.SUCCEEDED, "error": None}
+
+
+@pytest.mark.parametrize("length", ["-1", "abc"])
+def test_invalid_content_length_is_rejected(server, length):
+    connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1], timeout=5)
+    connection.putrequest("POST", "/investigations")
+    connection.putheader("Content-Length", length)
+    connection.endheaders()
+
+    response = connection.getresponse()
+
+    assert response.status == 400
+    assert json.loads(response.read()) == {"error": "invalid Content-Length"}
+    connection.close()
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_stub_mode_runs_the_real_pipeline_offline():
+    port = _free_port()
+    env = {
+        **os.environ,
+        "CREWAI_DISABLE_TELEMETRY": "true",
+        "OTEL_SDK_DISABLED": "true",
+        "SERVICE_API_TOKEN": "",
+    }
+    process = subprocess.Popen(
+        [sys.executable, "service.py", "--stub", "--port", str(port), "--workers", "1"],
+        cwd=REPO_ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        for _ in range(300):
+            try:
+                _request(port, "GET", "/health")
+                break
+            except OSError:
+                time.sleep(0.1)
+        _, job = _request(port, "POST", "/investigations", {"company": "Acme Pte Ltd"})
+        events = _read_events(port, job["id"])
+
+        assert events[-1][1] == {"status": service.SUCCEEDED, "error": None}
+        titles = [data["title"] for kind, data in events if kind == "section"]
+        assert titles and "Risk Rating" in events[-2][1]["content"]
+        response, report = _request(port, "GET", f"/investigations/{job['id']}/report")
+        assert response.status == 200
+        assert all(title in report for title in titles)
+    finally:
+        process.terminate()
+        process.wait(10)
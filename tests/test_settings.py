@@ -0,0 +1,48 @@
+"""Tests for per-run settings."""
+import dataclasses
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import tools
+from config import Config, RunSettings
+from tools import GhostHunterSearchTool
+
+
+class RecordingDDGS:
+    """DDGS stand-in echoing the options each query was run with."""
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def text(self, query, region, safesearch, max_results):
+        return [{
+            "title": query, "body": f"{region} {max_results}",
+            "href": f"https://example.com/{region}",
+        }]
+
+
+def test_settings_are_a_snapshot_of_the_config_defaults(monkeypatch):
+    monkeypatch.setattr(Config, "SEARCH_REGION", "sg-en")
+    settings = RunSettings(search_max_results=5)
+    monkeypatch.setattr(Config, "SEARCH_REGION", "us-en")
+
+    assert (settings.search_region, settings.search_max_results) == ("sg-en", 5)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        settings.search_region = "wt-wt"
+
+
+def test_concurrent_runs_search_with_their_own_settings(monkeypatch):
+    monkeypatch.setattr(tools, "DDGS", RecordingDDGS)
+    monkeypatch.setattr(Config, "SHARED_CACHE_DB", "")
+    monkeypatch.setattr(Config, "EVIDENCE_REUSE_SECONDS", 0)
+    regions = ["sg-en", "my-en", "id-en", "th-en"] * 5
+
+    def search(region):
+        tool = GhostHunterSearchTool(settings=RunSettings(search_region=region))
+        return tool.search("acme pte ltd")[0]["body"]
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        bodies = list(pool.map(search, regions))
+
+    assert bodies == [f"{region} {Config.SEARCH_MAX_RESULTS}" for region in regions]
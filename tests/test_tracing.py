@@ -0,0 +1,55 @@
+"""Tests for local span tracing."""
+import pytest
+
+import tracing
+from tracing import JsonlSpanExporter, Tracer
+
+
+def test_spans_nest_under_the_running_task(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(JsonlSpanExporter(trace_file))
+
+    with tracing.activate(tracer):
+        with tracing.span("run_investigation", company="Acme Pte Ltd"):
+            tracer.start_task("registry research")
+            with tracing.span("tool GhostHunterSearchTool"):
+                tracing.add_event("retry", attempt=2)
+            tracer.llm_call_started("call-1", start_ns=1, model="gpt-4o")
+            tracer.llm_call_finished("call-1", end_ns=2)
+            tracer.end_task()
+
+    spans = {s["name"]: s for s in tracing.load_spans(trace_file, tracer.trace_id)}
+    root = spans["run_investigation"]
+    task = spans["task registry research"]
+    assert root["parentSpanId"] == "" and task["parentSpanId"] == root["spanId"]
+    assert spans["tool GhostHunterSearchTool"]["parentSpanId"] == task["spanId"]
+    assert spans["tool GhostHunterSearchTool"]["events"][0]["name"] == "retry"
+    assert spans["llm.call"]["parentSpanId"] == task["spanId"]
+
+
+def test_failed_span_is_marked_and_spans_are_noops_without_a_tracer(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(JsonlSpanExporter(trace_file))
+
+    with tracing.span("untraced") as untraced:
+        assert untraced is None
+    with tracing.activate(tracer), pytest.raises(ValueError):
+        with tracing.span("ddgs.text"):
+            raise ValueError("bad response")
+
+    [span] = tracing.load_spans(trace_file)
+    assert span["status"]["code"] == "ERROR"
+    assert span["attributes"]["error.type"] == "ValueError"
+
+
+def test_chrome_trace_export(tmp_path):
+    trace_file = str(tmp_path / "trace.jsonl")
+    tracer = Tracer(JsonlSpanExporter(trace_file))
+    with tracer.span("run_investigation"):
+        pass
+
+    trace = tracing.to_chrome_trace(tracing.load_spans(trace_file))
+
+    phases = [event["ph"] for event in trace["traceEvents"]]
+    assert phases == ["X", "M"]
+    assert trace["traceEvents"][0]["dur"] >= 0
@@ -0,0 +1,84 @@
+"""Tests for rule-based triage scoring and selection."""
+import triage
+from tools import SearchError
+from triage import TriageResult, score_results, select_for_investigation, triage_company
+
+DIRECTORY_RESULTS = [
+    {
+        "title": "ACME PTE. LTD. (201912345A) - Singapore Company",
+        "body": "Acme Pte Ltd is a Live company incorporated on 3 May 2019. Registered office "
+                "address: 10 Anson Road #12-01, Singapore 079903. Principal activity: software.",
+        "href": "https://sgpgrid.example.com/acme",
+    },
+    {
+        "title": "Acme Pte Ltd - registered office address and directors",
+        "body": "View the registered office address, UEN and officers of Acme Pte Ltd.",
+        "href": "https://opengovsg.example.com/acme",
+    },
+    {
+        "title": "Acme Pte Ltd raises rates after bank's default risk review",
+        "body": "Acme Pte Ltd said late-payment penalty fees on its invoices are unchanged.",
+        "href": "https://news.example.com/acme-rates",
+    },
+]
+
+
+class ScriptedSearch:
+    """Search tool stand-in returning fixed results, or failing every query."""
+
+    def __init__(self, results=None, error=None):
+        self.results = results or []
+        self.error = error
+        self.queries = []
+
+    def search(self, query):
+        self.queries.append(query)
+        if self.error:
+            raise SearchError(self.error)
+        return self.results
+
+
+def test_clean_company_with_directory_results_scores_near_zero():
+    result = score_results("Acme Pte Ltd", DIRECTORY_RESULTS)
+
+    assert result.score < 1
+    assert result.hits == {}
+
+
+def test_red_flags_about_the_company_outrank_unrelated_ones():
+    flagged = [{
+        "title": "Acme Pte Ltd placed under liquidators",
+        "body": "Acme Pte Ltd was fined in an MAS penalty over money laundering controls.",
+    }]
+    unrelated = [{**flagged[0], "title": "Other firm placed under liquidators", "body": ""}]
+
+    about_company = score_results("Acme Pte Ltd", flagged)
+    about_others = score_results("Acme Pte Ltd", unrelated)
+
+    assert about_company.top_terms[0] in ("mas penalty", "money laundering")
+    assert about_company.score > about_others.score > 0
+    assert about_company.categories["adverse_media"] > 0
+
+
+def test_company_whose_searches_all_failed_is_marked():
+    search = ScriptedSearch(error="Ratelimit")
+
+    result = triage_company("Acme Pte Ltd", search)
+
+    assert len(search.queries) == len(triage.TRIAGE_QUERIES)
+    assert result.error == "Ratelimit" and result.score == 0
+
+
+def test_selection_keeps_unscreened_companies_and_applies_limits():
+    ranked = [
+        TriageResult("High Pte Ltd", score=30.0),
+        TriageResult("Mid Pte Ltd", score=12.0),
+        TriageResult("Low Pte Ltd", score=2.0),
+        TriageResult("Failed Pte Ltd", error="Ratelimit"),
+    ]
+
+    by_threshold = select_for_investigation(ranked, threshold=10)
+    by_rank = select_for_investigation(ranked, top_n=2)
+
+    assert [r.company for r in by_threshold] == ["High Pte Ltd", "Mid Pte Ltd", "Failed Pte Ltd"]
+    assert [r.company for r in by_rank] == ["High Pte Ltd", "Mid Pte Ltd"]
@@ -0,0 +1,52 @@
+"""Tests for the pre-warmed investigation worker pool."""
+import os
+import queue
+from concurrent.futures.process import BrokenProcessPool
+
+import pytest
+
+import main
+import metrics
+import worker_pool
+from worker_pool import InvestigationPool
+
+
+def _die(token, company_name, output_path, options):
+    # Stand-in for a worker killed mid-job (OOM kill, segfault)
+    os._exit(1)
+
+
+def _succeed(token, company_name, output_path, options):
+    worker_pool._sections.put((token, None, None))
+    return f"{company_name}.md", None, metrics.REGISTRY.drain()
+
+
+def test_failed_job_returns_its_metrics(monkeypatch):
+    def failing_investigation(company_name, output_path, on_section=None, **options):
+        metrics.REGISTRY.increment("investigations_total", outcome="failed")
+        raise ValueError("LLM unavailable")
+
+    sections = queue.Queue()
+    monkeypatch.setattr(worker_pool, "_sections", sections)
+    monkeypatch.setattr(main, "run_investigation", failing_investigation)
+    metrics.REGISTRY.drain()
+
+    report_path, error, job_metrics = worker_pool._run_job("t1", "Acme Pte Ltd", None, {})
+
+    assert report_path is None and isinstance(error, ValueError)
+    assert "investigations_total" in job_metrics.to_prometheus()
+    assert "investigations_total" not in metrics.REGISTRY.to_prometheus()
+    assert sections.get_nowait() == ("t1", None, None)
+
+
+def test_dead_worker_fails_its_job_and_the_pool_recovers(monkeypatch):
+    pool = InvestigationPool(workers=1, max_jobs_per_worker=0)
+    try:
+        monkeypatch.setattr(worker_pool, "_run_job", _die)
+        with pytest.raises(BrokenProcessPool):
+            pool.submit("Acme Pte Ltd").result(timeout=120)
+
+        monkeypatch.setattr(worker_pool, "_run_job", _succeed)
+        assert pool.submit("Beta Holdings").result(timeout=120) == "Beta Holdings.md"
+    finally:
+        pool.terminate()
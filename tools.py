@@ -1,17 +1,146 @@
 """Custom tools for Ghost Office Hunter."""
 from typing import List, Dict, Any, Optional
 import logging
-import time
+import re
 
 from crewai.tools import BaseTool
 from ddgs import DDGS
+from ddgs.exceptions import DDGSException
+import pandas as pd
+from pydantic import Field
 import yfinance as yf
 
-from config import Config
+import aaoifi
+import circuit_breaker
+import deadlines
+import director_graph
+import evidence
+import fetcher
+import metrics
+import sanctions
+import shared_cache
+import tracing
+from circuit_breaker import CircuitOpenError
+from config import Config, RunSettings
+from deadlines import DeadlineExceeded
 from logger import setup_logger
+from metrics import instrumented_tool
+from query_planner import split_queries
+from tracing import traced_tool
 
 logger = setup_logger()
 
+# Message of the DDGSException that ddgs raises for a query without any hits
+DDGS_NO_RESULTS = "No results found."
+
+
+class SearchError(Exception):
+    """Raised when a web search fails after all retries; the message is meant for the agent."""
+
+
+def format_search_results(results: List[Any]) -> str:
+    """
+    Format raw DDGS results for the agent.
+    
+    Args:
+        results: Result dicts (title, body, href) as returned by DDGS
+        
+    Returns:
+        Numbered, human-readable result listing
+    """
+    formatted_results = []
+    for i, result in enumerate(results, 1):
+        if isinstance(result, dict):
+            title = result.get('title', 'No title')
+            body = result.get('body', 'No description')
+            href = result.get('href', 'No URL')
+            formatted_results.append(
+                f"Result {i}:\n"
+                f"Title: {title}\n"
+                f"Description: {body}\n"
+                f"URL: {href}\n"
+            )
+        else:
+            # Handle case where result might be a string
+            formatted_results.append(f"Result {i}: {str(result)}\n")
+    
+    result_str = "\n".join(formatted_results)
+    return result_str if result_str else "No results found."
+
+
+def fetch_ticker_info(ticker_symbol: str) -> Dict[str, Any]:
+    """
+    Fetch a ticker's yfinance ``info`` payload.
+    
+    Checks this run's evidence, then the cross-process shared cache, before
+    calling yfinance.
+    
+    Args:
+        ticker_symbol: Stock ticker symbol
+        
+    Returns:
+        The raw ``info`` dict
+    """
+    cached = evidence.reuse(evidence.FINANCE_TOOL, ticker_symbol)
+    if cached is not None:
+        return cached
+    
+    def fetch() -> Dict[str, Any]:
+        with metrics.current().timer("upstream_latency_seconds", upstream="yfinance"), \
+                tracing.span("yfinance.info", ticker=ticker_symbol):
+            stock = yf.Ticker(ticker_symbol)
+            return circuit_breaker.call(
+                circuit_breaker.YFINANCE,
+                lambda: deadlines.call(lambda: dict(stock.info or {}), "yfinance.info"),
+                ignore=(DeadlineExceeded,)
+            )
+    
+    info = shared_cache.cached(
+        evidence.FINANCE_TOOL, ticker_symbol.upper(), Config.SHARED_CACHE_FUNDAMENTALS_TTL, fetch
+    )
+    evidence.record_observation(evidence.FINANCE_TOOL, ticker_symbol, info)
+    return info
+
+
+_shared_tools: Dict[type, BaseTool] = {}
+_reuse_tools = False
+
+
+def enable_tool_reuse() -> None:
+    """Hand out one shared instance per stateless tool class (see ``stateless_tool``)."""
+    global _reuse_tools
+    _reuse_tools = True
+
+
+def stateless_tool(tool_class: type) -> BaseTool:
+    """
+    Return an instance of a tool that keeps no per-run state.
+    
+    With reuse enabled (pool workers) the same instance is returned for every
+    run, with its CrewAI usage count reset; otherwise a new instance is built.
+    """
+    if not _reuse_tools:
+        return tool_class()
+    tool = _shared_tools.get(tool_class)
+    if tool is None:
+        tool = _shared_tools[tool_class] = tool_class()
+    tool.reset_usage_count()
+    return tool
+
+
+def _ratio_line(label: str, ratio: float, passed: Any) -> str:
+    """One AAOIFI ratio with its threshold and a ✓/✗ mark (? when it was not reported)."""
+    mark = "?" if pd.isna(passed) else ("✓" if passed else "✗")
+    return f"  {label}: {aaoifi.format_ratio(ratio)} (Threshold: <33%) {mark}"
+
+
+def deadline_message(error: DeadlineExceeded) -> str:
+    """Tool output telling the agent to stop researching once the deadline has passed."""
+    return (
+        f"{error}. No more time is available for research: stop calling tools and "
+        "write your final answer now from the evidence you already have."
+    )
+
 
 class GhostHunterSearchTool(BaseTool):
     """Custom search tool for web-based company investigation."""
@@ -20,63 +149,166 @@ class GhostHunterSearchTool(BaseTool):
     description: str = (
         "Search the web for company addresses, news, directors, and regulatory actions. "
         "Useful for finding red flags, adverse media, and ghost office indicators. "
-        "Returns relevant search results that can be analyzed for compliance risks."
+        "Returns relevant search results that can be analyzed for compliance risks. "
+        "To run several searches about the same subject at once, separate them with ';' "
+        "(e.g. 'Acme Pte Ltd fraud; Acme Pte Ltd liquidators')."
     )
+    settings: RunSettings = Field(default_factory=RunSettings, exclude=True)
+    # Optional query_planner.QueryPlanner deduplicating and budgeting the agent's searches
+    planner: Optional[Any] = Field(default=None, exclude=True)
 
+    @instrumented_tool
+    @traced_tool
     def _run(self, query: str) -> str:
         """
         Execute web search query using DuckDuckGo.
         
         Args:
-            query: Search query string
+            query: Search query string, or several separated by ';'
             
         Returns:
             Search results as string, or error message if search fails
         """
+        if self.planner is not None:
+            return self._run_planned(query)
+        
+        try:
+            results = self.search(query)
+        except SearchError as e:
+            return str(e)
+        except DeadlineExceeded as e:
+            return deadline_message(e)
+        
+        if not results:
+            logger.warning("No results found for query: %s", query)
+            return (
+                "No results found for this search query. Try different search terms "
+                "or check if the company name is spelled correctly."
+            )
+        
+        return format_search_results(results)
+
+    def _run_planned(self, text: str) -> str:
+        """Run the agent's queries through the planner and format every outcome."""
+        queries = split_queries(text) or [text]
+        sections = []
+        for planned in self.planner.plan(queries):
+            header = f"Search: {planned.query}"
+            if len(planned.covers) > 1:
+                header += f" (combines: {'; '.join(planned.covers)})"
+            if planned.execute is None and planned.results is None:
+                sections.append(f"{header}\n{planned.note}")
+                continue
+            results = planned.results
+            if results is None:
+                try:
+                    results = self.search(planned.execute)
+                except SearchError as e:
+                    self.planner.refund(planned)
+                    sections.append(f"{header}\n{e}")
+                    continue
+                except DeadlineExceeded as e:
+                    sections.append(f"{header}\n{deadline_message(e)}")
+                    break
+                self.planner.record(planned, results)
+            body = (
+                format_search_results(results) if results
+                else "No results found for this search query."
+            )
+            sections.append("\n".join(part for part in (header, planned.note, body) if part))
+        
+        budget_note = self.planner.budget_note()
+        if budget_note:
+            sections.append(budget_note)
+        return "\n\n".join(sections)
+
+    def search(self, query: str, refresh: bool = False) -> List[Dict[str, Any]]:
+        """
+        Execute a DuckDuckGo search with retries and return the raw results.
+        
+        Results are recorded as evidence for the active investigation. Results
+        already observed in this run, or cached by any local process, are reused
+        unless ``refresh`` is set.
+        
+        Args:
+            query: Search query string
+            refresh: Always query DDGS (e.g. to re-check for changes) and update the shared cache
+            
+        Returns:
+            List of result dicts (title, body, href); empty if nothing was found
+            
+        Raises:
+            SearchError: If the search fails after all retries
+            DeadlineExceeded: If the investigation deadline passes first
+        """
+        deadlines.check("search")
+        cached = None if refresh else evidence.reuse(evidence.SEARCH_TOOL, query)
+        if cached is not None:
+            logger.debug("Reusing stored evidence for query: %s", query)
+            return cached
+        
+        cache_key = shared_cache.make_key(
+            query, self.settings.search_region, self.settings.search_safesearch,
+            self.settings.search_max_results
+        )
+        results = shared_cache.cached(
+            evidence.SEARCH_TOOL, cache_key, Config.SHARED_CACHE_SEARCH_TTL,
+            lambda: self._search_upstream(query), refresh=refresh
+        )
+        evidence.record_search(query, results)
+        return results
+
+    def _search_upstream(self, query: str) -> List[Dict[str, Any]]:
+        """Call DDGS with retries; raises SearchError after the last attempt."""
         max_retries = 3
         retry_delay = 2  # seconds
         
         for attempt in range(max_retries):
             try:
-                logger.debug(f"Executing search query: {query} (attempt {attempt + 1}/{max_retries})")
+                logger.debug(
+                    "Executing search query: %s (attempt %d/%d)", query, attempt + 1, max_retries
+                )
                 
                 # DDGS API uses 'query' parameter (not 'keywords') in newer versions
                 # Also, DDGS().text() returns an iterator, so we need to convert it to a list
-                ddgs = DDGS()
-                results_iterator = ddgs.text(
-                    query=query,
-                    region=Config.SEARCH_REGION,
-                    safesearch=Config.SEARCH_SAFESEARCH,
-                    max_results=Config.SEARCH_MAX_RESULTS
-                )
+                with metrics.current().timer("upstream_latency_seconds", upstream="ddgs"), \
+                        tracing.span("ddgs.text", query=query, attempt=attempt + 1):
+                    ddgs = DDGS()
+                    
+                    def run_query() -> List[Dict[str, Any]]:
+                        try:
+                            results_iterator = ddgs.text(
+                                query=query,
+                                region=self.settings.search_region,
+                                safesearch=self.settings.search_safesearch,
+                                max_results=self.settings.search_max_results
+                            )
+                        except DDGSException as e:
+                            # A query without hits is an answer, not an upstream failure: it must
+                            # not be retried or count towards opening the DDGS circuit
+                            if type(e) is DDGSException and str(e) == DDGS_NO_RESULTS:
+                                return []
+                            raise
+                        # Convert iterator to list
+                        return list(results_iterator) if results_iterator else []
+                    
+                    # Stop waiting on DDGS once the investigation deadline passes, and fail
+                    # fast while the DDGS circuit is open
+                    results: List[Dict[str, Any]] = circuit_breaker.call(
+                        circuit_breaker.DDGS,
+                        lambda: deadlines.call(run_query, "ddgs.text"),
+                        ignore=(DeadlineExceeded,)
+                    )
                 
-                # Convert iterator to list
-                results: List[Dict[str, Any]] = list(results_iterator) if results_iterator else []
+                logger.debug("Search returned %d results", len(results))
+                return results
                 
-                if not results:
-                    logger.warning(f"No results found for query: {query}")
-                    return "No results found for this search query. Try different search terms or check if the company name is spelled correctly."
+            except DeadlineExceeded:
+                raise
                 
-                # Format results for better readability
-                formatted_results = []
-                for i, result in enumerate(results, 1):
-                    if isinstance(result, dict):
-                        title = result.get('title', 'No title')
-                        body = result.get('body', 'No description')
-                        href = result.get('href', 'No URL')
-                        formatted_results.append(
-                            f"Result {i}:\n"
-                            f"Title: {title}\n"
-                            f"Description: {body}\n"
-                            f"URL: {href}\n"
-                        )
-                    else:
-                        # Handle case where result might be a string
-                        formatted_results.append(f"Result {i}: {str(result)}\n")
-                
-                result_str = "\n".join(formatted_results)
-                logger.debug(f"Search returned {len(results)} results")
-                return result_str if result_str else "No results found."
+            except CircuitOpenError as e:
+                logger.warning("Skipping search for '%s': %s", query, e)
+                raise SearchError(str(e)) from e
                 
             except TypeError as e:
                 # API signature error - this shouldn't happen with the fix, but handle it
@@ -84,12 +316,11 @@ class GhostHunterSearchTool(BaseTool):
                     f"Search API error: The DuckDuckGo search API may have changed. "
                     f"Technical details: {str(e)}. Please check the ddgs library version."
                 )
-                logger.error(f"Search API error for query '{query}': {e}", exc_info=True)
-                if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                logger.error("Search API error for query '%s': %s", query, e, exc_info=True)
+                if attempt < max_retries - 1 and not circuit_breaker.is_open(circuit_breaker.DDGS):
+                    self._wait_before_retry(attempt, retry_delay)
                     continue
-                return error_msg
+                raise SearchError(error_msg) from e
                 
             except ConnectionError as e:
                 # Network connectivity issue
@@ -98,12 +329,11 @@ class GhostHunterSearchTool(BaseTool):
                     f"This may be due to network connectivity issues, firewall restrictions, or service unavailability. "
                     f"Please check your internet connection and try again."
                 )
-                logger.error(f"Network error for query '{query}': {e}", exc_info=True)
-                if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                logger.error("Network error for query '%s': %s", query, e, exc_info=True)
+                if attempt < max_retries - 1 and not circuit_breaker.is_open(circuit_breaker.DDGS):
+                    self._wait_before_retry(attempt, retry_delay)
                     continue
-                return error_msg
+                raise SearchError(error_msg) from e
                 
             except Exception as e:
                 error_type = type(e).__name__
@@ -113,20 +343,171 @@ class GhostHunterSearchTool(BaseTool):
                     f"This may be due to DuckDuckGo rate limiting, service changes, or network issues. "
                     f"Please try again later or use alternative search methods."
                 )
-                logger.error(f"Search error for query '{query}': {e}", exc_info=True)
-                if attempt < max_retries - 1:
-                    logger.info(f"Retrying in {retry_delay} seconds...")
-                    time.sleep(retry_delay)
+                logger.error("Search error for query '%s': %s", query, e, exc_info=True)
+                if attempt < max_retries - 1 and not circuit_breaker.is_open(circuit_breaker.DDGS):
+                    self._wait_before_retry(attempt, retry_delay)
                     continue
-                return error_msg
+                raise SearchError(error_msg) from e
         
         # If all retries failed
-        return (
+        raise SearchError(
             f"Search failed after {max_retries} attempts. "
             f"Technical constraints may include: DuckDuckGo rate limiting, network connectivity issues, "
             f"or service unavailability. Please try again later."
         )
 
+    def _wait_before_retry(self, attempt: int, retry_delay: float) -> None:
+        """Count, log and sleep before the next search attempt."""
+        metrics.current().increment("tool_retries_total", tool=type(self).__name__)
+        logger.info("Retrying in %s seconds...", retry_delay)
+        with tracing.span("retry.sleep", delay=retry_delay, attempt=attempt + 1):
+            deadlines.sleep(retry_delay, "search.retry")
+
+
+class GhostHunterPageFetchTool(BaseTool):
+    """Tool that reads the full text of web pages found by the search tool."""
+    
+    name: str = "Ghost Hunter Page Reader"
+    description: str = (
+        "Fetch and read the main text of one or more web pages (news articles, registry entries, "
+        "company websites). Pass URLs from search results separated by commas or newlines; "
+        "several pages are fetched in parallel. Use this to verify details that search snippets "
+        "only hint at."
+    )
+
+    @instrumented_tool
+    @traced_tool
+    def _run(self, urls: str) -> str:
+        """
+        Fetch pages concurrently and return their extracted text.
+        
+        Args:
+            urls: URLs separated by commas, whitespace or newlines
+            
+        Returns:
+            Extracted text of each page, or an error line per page that failed
+        """
+        requested = list(dict.fromkeys(u.strip() for u in re.split(r"[\s,]+", urls) if u.strip()))
+        if not requested:
+            return "No URLs provided. Pass one or more http(s) URLs separated by commas."
+        if len(requested) > Config.FETCH_MAX_URLS:
+            logger.info(
+                "Fetching only the first %d of %d URLs", Config.FETCH_MAX_URLS, len(requested)
+            )
+            requested = requested[:Config.FETCH_MAX_URLS]
+        
+        try:
+            deadlines.check("page_fetch")
+        except DeadlineExceeded as e:
+            return deadline_message(e)
+        
+        page_fetcher = fetcher.PageFetcher(cache=fetcher.get_page_cache())
+        pages = page_fetcher.fetch(requested)
+        logger.debug(
+            "Fetched %d pages (%d failed)", len(pages), sum(p.error is not None for p in pages)
+        )
+        return fetcher.format_pages(pages)
+
+
+class SanctionsScreeningTool(BaseTool):
+    """Tool that screens names against locally loaded sanctions and PEP lists."""
+    
+    name: str = "Ghost Hunter Sanctions Screener"
+    description: str = (
+        "Screen company and person names (the company, its directors, shareholders and related "
+        "entities) against the locally loaded consolidated sanctions and PEP lists. Pass one or "
+        "more names separated by semicolons or newlines. Returns scored possible matches with "
+        "list, programs and list ID; use this instead of web searches for sanctions status."
+    )
+
+    @instrumented_tool
+    @traced_tool
+    def _run(self, names: str) -> str:
+        """
+        Screen names with the local fuzzy matcher.
+        
+        Args:
+            names: Names separated by semicolons or newlines
+            
+        Returns:
+            Possible matches per name, or a clear result
+        """
+        requested = list(dict.fromkeys(n.strip() for n in re.split(r"[;\n]+", names) if n.strip()))
+        if not requested:
+            return "No names provided. Pass one or more names separated by semicolons."
+        
+        index = sanctions.get_index()
+        if index is None or not len(index):
+            return "No sanctions or PEP lists are loaded; sanctions screening is unavailable."
+        
+        results = index.screen_many(requested)
+        flagged = sum(1 for hits in results.values() if hits)
+        metrics.current().increment("sanctions_screenings_total", len(results))
+        metrics.current().increment("sanctions_matches_total", flagged)
+        # Keep the exact screening result for audit
+        evidence.record_observation(
+            evidence.SANCTIONS_TOOL,
+            "; ".join(requested),
+            {name: [hit.to_dict() for hit in hits] for name, hits in results.items()}
+        )
+        logger.info(
+            "Screened %d names against sanctions lists: %d possible matches", len(results), flagged
+        )
+        lists = ", ".join(index.stats()["files"])
+        return "\n".join(
+            [f"Screened against: {lists}"]
+            + [sanctions.format_hits(name, hits) for name, hits in results.items()]
+        )
+
+
+class DirectorNetworkTool(BaseTool):
+    """Tool that looks up a company's officers and network cluster in the local registry graph."""
+    
+    name: str = "Ghost Hunter Director Network"
+    description: str = (
+        "Look up a company in the local corporate registry officer data: its officers and how "
+        "many companies each of them sits on (nominee-director signal), its registered address "
+        "and how many companies share it, and the cluster of companies linked through shared "
+        "officers or addresses. Pass a company name, or prefix a person's name with 'director:' "
+        "to list the companies they sit on."
+    )
+
+    @instrumented_tool
+    @traced_tool
+    def _run(self, name: str) -> str:
+        """
+        Answer a company or director query from the precomputed graph.
+        
+        Args:
+            name: Company name, or ``director: <person name>``
+            
+        Returns:
+            Formatted network profile
+        """
+        name = name.strip().strip('"')
+        if not name:
+            return "No name provided. Pass a company name or 'director: <name>'."
+        
+        graph = director_graph.get_graph()
+        if graph is None:
+            return "No registry officer data is loaded; director network lookups are unavailable."
+        
+        if name.lower().startswith("director:"):
+            person = name.split(":", 1)[1].strip()
+            count = graph.director_company_count(person)
+            if not count:
+                return f"{person} does not appear as an officer in the registry data."
+            companies = graph.director_companies(person, limit=25)
+            more = f"\n  ... and {count - len(companies)} more" if count > len(companies) else ""
+            listing = "\n".join(f"  - {c}" for c in companies)
+            return f"{person} sits on {count} companies:\n" + listing + more
+        
+        profile = graph.company_profile(name)
+        if profile is None:
+            return f"{name} does not appear in the registry officer data."
+        evidence.record_observation(evidence.REGISTRY_TOOL, name, profile.to_row())
+        return director_graph.format_profile(profile)
+
 
 class ShariahComplianceTool(BaseTool):
     """Tool for checking Shariah compliance of stocks using AAOIFI financial ratios."""
@@ -139,6 +520,8 @@ class ShariahComplianceTool(BaseTool):
         "Use this tool when you need to verify if a publicly traded company complies with Shariah principles."
     )
 
+    @instrumented_tool
+    @traced_tool
     def _run(self, ticker_symbol: str) -> str:
         """
         Check a stock against AAOIFI Shariah compliance standards.
@@ -150,16 +533,15 @@ class ShariahComplianceTool(BaseTool):
             Formatted string with compliance status and financial ratios
         """
         try:
-            logger.info(f"Checking Shariah compliance for ticker: {ticker_symbol}")
+            logger.info("Checking Shariah compliance for ticker: %s", ticker_symbol)
             
             # Fetch stock data
-            stock = yf.Ticker(ticker_symbol)
-            info = stock.info
+            info = fetch_ticker_info(ticker_symbol)
             
             # Extract financial data
             market_cap = info.get('marketCap')
-            total_debt = info.get('totalDebt', 0)
-            total_cash = info.get('totalCash', 0)
+            total_debt = info.get('totalDebt')
+            total_cash = info.get('totalCash')
             
             # Validate market cap
             if not market_cap or market_cap == 0:
@@ -167,46 +549,81 @@ class ShariahComplianceTool(BaseTool):
                 logger.warning(error_msg)
                 return error_msg
             
-            # Calculate ratios
-            debt_ratio = (total_debt / market_cap) * 100 if market_cap > 0 else 0
-            cash_ratio = (total_cash / market_cap) * 100 if market_cap > 0 else 0
+            # Calculate ratios; unreported debt or cash is unknown, not zero
+            debt_ratio = total_debt / market_cap * 100 if total_debt is not None else float("nan")
+            cash_ratio = total_cash / market_cap * 100 if total_cash is not None else float("nan")
             
-            # Apply AAOIFI thresholds (<33%)
-            debt_pass = debt_ratio < 33.0
-            cash_pass = cash_ratio < 33.0
-            overall_status = "PASS" if (debt_pass and cash_pass) else "FAIL"
+            # Apply AAOIFI thresholds (<33%); a single known failing ratio is enough to FAIL
+            debt_pass = None if pd.isna(debt_ratio) else debt_ratio < 33.0
+            cash_pass = None if pd.isna(cash_ratio) else cash_ratio < 33.0
+            if debt_pass is False or cash_pass is False:
+                snapshot_status = "FAIL"
+            elif debt_pass and cash_pass:
+                snapshot_status = "PASS"
+            else:
+                snapshot_status = aaoifi.UNKNOWN
+            overall_status = snapshot_status
+            status_basis = "current market cap snapshot"
             
-            # Format results
-            result = {
-                "Ticker": ticker_symbol,
-                "Status": overall_status,
-                "Debt_Ratio": f"{debt_ratio:.2f}%",
-                "Debt_Threshold": "<33%",
-                "Debt_Pass": "✓" if debt_pass else "✗",
-                "Cash_Ratio": f"{cash_ratio:.2f}%",
-                "Cash_Threshold": "<33%",
-                "Cash_Pass": "✓" if cash_pass else "✗",
-                "Market_Cap": f"${market_cap:,.0f}"
-            }
+            # AAOIFI practice uses a trailing average market cap; prefer it when the
+            # latest quarter reports both debt and cash
+            quarter_lines: List[str] = []
+            history_lines: List[str] = []
+            window_days = Config.AAOIFI_MARKET_CAP_WINDOW_DAYS
+            try:
+                history = aaoifi.ratio_history(ticker_symbol, window_days)
+            except DeadlineExceeded:
+                raise
+            except Exception as e:
+                logger.warning("AAOIFI ratio history unavailable for %s: %s", ticker_symbol, e)
+            else:
+                if not history.empty:
+                    latest = history.iloc[-1]
+                    quarter = f"{pd.Timestamp(history.index[-1]):%Y-%m-%d}"
+                    quarter_status = str(latest["status"])
+                    if quarter_status != aaoifi.UNKNOWN:
+                        overall_status = quarter_status
+                        status_basis = (
+                            f"latest quarter {quarter}, "
+                            f"trailing {window_days}-day average market cap"
+                        )
+                    quarter_lines = [
+                        f"Latest Quarter Ratios ({quarter}, "
+                        f"trailing {window_days}-day average market cap): {quarter_status}",
+                        _ratio_line("Debt Ratio", latest["debt_ratio"], latest["debt_pass"]),
+                        _ratio_line("Cash Ratio", latest["cash_ratio"], latest["cash_pass"]),
+                        "",
+                    ]
+                    history_lines = ["", aaoifi.format_ratio_history(history, window_days)]
             
             # Format output string
             output_lines = [
                 f"=== Shariah Compliance Check for {ticker_symbol} ===",
-                f"Overall Status: {overall_status}",
+                f"Overall Status: {overall_status} (based on {status_basis})",
                 "",
-                "Financial Ratios (AAOIFI Standards):",
-                f"  Debt Ratio: {result['Debt_Ratio']} (Threshold: {result['Debt_Threshold']}) {result['Debt_Pass']}",
-                f"  Cash Ratio: {result['Cash_Ratio']} (Threshold: {result['Cash_Threshold']}) {result['Cash_Pass']}",
+                *quarter_lines,
+                f"Current Snapshot Ratios (current market cap): {snapshot_status}",
+                _ratio_line("Debt Ratio", debt_ratio, debt_pass),
+                _ratio_line("Cash Ratio", cash_ratio, cash_pass),
                 "",
-                f"Market Capitalization: {result['Market_Cap']}",
+                f"Market Capitalization: ${market_cap:,.0f}",
+                *history_lines,
                 "",
                 "Note: Both ratios must be below 33% to PASS Shariah compliance."
             ]
             
             output = "\n".join(output_lines)
-            logger.info(f"Shariah compliance check completed for {ticker_symbol}: {overall_status}")
+            logger.info(
+                "Shariah compliance check completed for %s: %s", ticker_symbol, overall_status
+            )
             return output
             
+        except DeadlineExceeded as e:
+            return deadline_message(e)
+            
+        except CircuitOpenError as e:
+            return str(e)
+            
         except Exception as e:
             error_msg = f"Error checking Shariah compliance for {ticker_symbol}: {str(e)}. The ticker symbol may be invalid or financial data may not be available."
             logger.error(error_msg, exc_info=True)
@@ -224,6 +641,8 @@ class ShariahBusinessActivityTool(BaseTool):
         "Use this tool to get the business description that needs to be checked against Shariah principles."
     )
 
+    @instrumented_tool
+    @traced_tool
     def _run(self, ticker_symbol: str) -> str:
         """
         Fetch business summary from yfinance for Shariah compliance analysis.
@@ -235,11 +654,10 @@ class ShariahBusinessActivityTool(BaseTool):
             Formatted string with business summary and company information
         """
         try:
-            logger.info(f"Fetching business summary for ticker: {ticker_symbol}")
+            logger.info("Fetching business summary for ticker: %s", ticker_symbol)
             
             # Fetch stock data
-            stock = yf.Ticker(ticker_symbol)
-            info = stock.info
+            info = fetch_ticker_info(ticker_symbol)
             
             # Extract business information
             company_name = info.get('longName') or info.get('shortName', ticker_symbol)
@@ -278,9 +696,15 @@ class ShariahBusinessActivityTool(BaseTool):
             ]
             
             output = "\n".join(output_lines)
-            logger.info(f"Business summary fetched for {ticker_symbol}")
+            logger.info("Business summary fetched for %s", ticker_symbol)
             return output
             
+        except DeadlineExceeded as e:
+            return deadline_message(e)
+            
+        except CircuitOpenError as e:
+            return str(e)
+            
         except Exception as e:
             error_msg = (
                 f"Error fetching business summary for {ticker_symbol}: {str(e)}. "
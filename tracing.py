@@ -0,0 +1,427 @@
+"""Local span tracing for Ghost Office Hunter.
+
+Spans are written as JSON lines (one finished span per line, using OTLP field
+names) to ``Config.TRACE_FILE``; no collector is required. Run this module to
+convert a trace into Chrome trace-event format for flame-chart viewers such as
+Perfetto or ``chrome://tracing``::
+
+    python tracing.py traces/spans.jsonl --output trace.json
+"""
+import argparse
+import contextvars
+import functools
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from config import Config
+from logger import setup_logger
+
+logger = setup_logger()
+
+
+def _new_id(nbytes: int) -> str:
+    """Return a random lowercase hex identifier."""
+    return os.urandom(nbytes).hex()
+
+
+def _now_ns() -> int:
+    """Current wall-clock time in nanoseconds."""
+    return time.time_ns()
+
+
+@dataclass
+class Span:
+    """A single timed operation within a trace."""
+
+    name: str
+    trace_id: str
+    parent_id: Optional[str] = None
+    span_id: str = field(default_factory=lambda: _new_id(8))
+    start_ns: int = field(default_factory=_now_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    events: List[Dict[str, Any]] = field(default_factory=list)
+    status: str = "OK"
+    thread: str = field(default_factory=lambda: threading.current_thread().name)
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Attach an attribute to the span."""
+        self.attributes[key] = value
+
+    def add_event(self, name: str, **attributes: Any) -> None:
+        """Record a point-in-time event on the span."""
+        self.events.append({"name": name, "timeUnixNano": _now_ns(), "attributes": attributes})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize using OTLP/JSON field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent_id or "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns or _now_ns(),
+            "attributes": self.attributes,
+            "events": self.events,
+            "status": {"code": self.status},
+            "thread": self.thread,
+        }
+
+
+class JsonlSpanExporter:
+    """Append finished spans to a local JSON lines file."""
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Write one span."""
+        line = json.dumps(span.to_dict(), default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_current_tracer: contextvars.ContextVar[Optional["Tracer"]] = contextvars.ContextVar(
+    "ghost_hunter_tracer", default=None
+)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar(
+    "ghost_hunter_span", default=None
+)
+
+# Agent id -> tracer, for CrewAI events that are not delivered in the run's context
+_tracers_by_agent: Dict[str, "Tracer"] = {}
+_tracers_lock = threading.Lock()
+
+
+class Tracer:
+    """
+    Trace for a single investigation.
+
+    The root span covers ``run_investigation``; task spans are opened and closed
+    from crew callbacks, and tool/LLM spans nest under whichever task is running.
+    """
+
+    def __init__(self, exporter: Optional[JsonlSpanExporter] = None):
+        self.trace_id = _new_id(16)
+        self.exporter = exporter
+        self.root: Optional[Span] = None
+        self.task_span: Optional[Span] = None
+        self._agent_ids: List[str] = []
+        self._pending_llm: Dict[str, Span] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def enabled(self) -> bool:
+        """Whether finished spans are exported anywhere."""
+        return self.exporter is not None
+
+    def _parent_id(self) -> Optional[str]:
+        current = _current_span.get()
+        # The root span stays current for the whole run; spans opened during a task
+        # belong under that task instead
+        if current is not None and current.trace_id == self.trace_id and current is not self.root:
+            return current.span_id
+        if self.task_span is not None:
+            return self.task_span.span_id
+        return self.root.span_id if self.root else None
+
+    def _finish(self, span: Span, end_ns: Optional[int] = None) -> None:
+        span.end_ns = end_ns or _now_ns()
+        if self.exporter is not None:
+            try:
+                self.exporter.export(span)
+            except OSError as e:
+                logger.warning("Could not export span %s: %s", span.name, e)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Open a span nested under the current span, task or root."""
+        span = Span(
+            name=name, trace_id=self.trace_id, parent_id=self._parent_id(), attributes=attributes
+        )
+        if self.root is None:
+            self.root = span
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.status = "ERROR"
+            span.set_attribute("error.type", type(e).__name__)
+            raise
+        finally:
+            _current_span.reset(token)
+            self._finish(span)
+
+    def start_task(self, name: str, **attributes: Any) -> None:
+        """Open the span for the task that is about to run."""
+        with self._lock:
+            parent = self.root.span_id if self.root else None
+            self.task_span = Span(
+                name=f"task {name}", trace_id=self.trace_id, parent_id=parent,
+                attributes=attributes
+            )
+
+    def end_task(self, **attributes: Any) -> None:
+        """Close the currently running task span."""
+        with self._lock:
+            span, self.task_span = self.task_span, None
+        if span is not None:
+            span.attributes.update(attributes)
+            self._finish(span)
+
+    def bind_agents(self, agents: List[Any]) -> None:
+        """Route CrewAI LLM events for ``agents`` to this tracer."""
+        if not self.enabled:
+            return
+        with _tracers_lock:
+            for agent in agents:
+                agent_id = str(getattr(agent, "id", ""))
+                if agent_id:
+                    _tracers_by_agent[agent_id] = self
+                    self._agent_ids.append(agent_id)
+
+    def close(self) -> None:
+        """Close any dangling task span and release agent bindings."""
+        self.end_task(status="incomplete")
+        with _tracers_lock:
+            for agent_id in self._agent_ids:
+                if _tracers_by_agent.get(agent_id) is self:
+                    del _tracers_by_agent[agent_id]
+        self._agent_ids.clear()
+
+    def llm_call_started(self, key: str, start_ns: int, **attributes: Any) -> None:
+        """Open an LLM span from an out-of-context event."""
+        if self.task_span:
+            parent = self.task_span.span_id
+        else:
+            parent = self.root.span_id if self.root else None
+        span = Span(
+            name="llm.call", trace_id=self.trace_id, parent_id=parent, start_ns=start_ns,
+            attributes=attributes
+        )
+        with self._lock:
+            self._pending_llm[key] = span
+
+    def llm_call_finished(
+        self, key: str, end_ns: int, status: str = "OK", **attributes: Any
+    ) -> None:
+        """Close the LLM span opened under ``key``."""
+        with self._lock:
+            span = self._pending_llm.pop(key, None)
+        if span is None:
+            return
+        span.status = status
+        span.attributes.update(attributes)
+        self._finish(span, end_ns)
+
+
+def create_tracer() -> Tracer:
+    """Create a tracer exporting to ``Config.TRACE_FILE`` (or a no-op tracer if unset)."""
+    exporter = JsonlSpanExporter(Config.TRACE_FILE) if Config.TRACE_FILE else None
+    if exporter is not None:
+        install_crewai_listeners()
+    return Tracer(exporter)
+
+
+def current_tracer() -> Optional[Tracer]:
+    """Return the tracer of the active run, if any."""
+    return _current_tracer.get()
+
+
+@contextmanager
+def activate(tracer: Tracer) -> Iterator[Tracer]:
+    """Make ``tracer`` the active tracer for the enclosed block."""
+    token = _current_tracer.set(tracer)
+    try:
+        yield tracer
+    finally:
+        _current_tracer.reset(token)
+        tracer.close()
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """Open a span on the active tracer; a no-op outside a traced run."""
+    tracer = _current_tracer.get()
+    if tracer is None or not tracer.enabled:
+        yield None
+        return
+    with tracer.span(name, **attributes) as s:
+        yield s
+
+
+def add_event(name: str, **attributes: Any) -> None:
+    """Record an event on the current span, if any."""
+    current = _current_span.get()
+    if current is not None:
+        current.add_event(name, **attributes)
+
+
+def traced_tool(func: Callable[..., str]) -> Callable[..., str]:
+    """Decorator wrapping a tool ``_run`` call in a span named after its class."""
+
+    @functools.wraps(func)
+    def wrapper(self, *args: Any, **kwargs: Any) -> str:
+        tool_input = args[0] if args else next(iter(kwargs.values()), "")
+        with span(f"tool {type(self).__name__}", input=str(tool_input)[:200]):
+            return func(self, *args, **kwargs)
+
+    return wrapper
+
+
+_listeners_installed = False
+
+
+def install_crewai_listeners() -> bool:
+    """
+    Subscribe to CrewAI LLM call events so each LLM call becomes a span.
+
+    CrewAI may deliver events outside the run's context, so spans are routed to
+    the tracer that registered the emitting agent via ``Tracer.bind_agents``.
+
+    Returns:
+        True if the listeners are installed
+    """
+    global _listeners_installed
+    if _listeners_installed:
+        return True
+    try:
+        from crewai.events import (
+            crewai_event_bus,
+            LLMCallCompletedEvent,
+            LLMCallFailedEvent,
+            LLMCallStartedEvent,
+        )
+    except ImportError:
+        logger.debug("CrewAI event bus not available; LLM calls will not be traced")
+        return False
+
+    def event_ns(event: Any) -> int:
+        timestamp = getattr(event, "timestamp", None)
+        return int(timestamp.timestamp() * 1e9) if timestamp else _now_ns()
+
+    def resolve(event: Any) -> Optional[Tracer]:
+        with _tracers_lock:
+            return _tracers_by_agent.get(str(getattr(event, "agent_id", "") or ""))
+
+    def call_key(event: Any) -> str:
+        return str(getattr(event, "call_id", None) or getattr(event, "agent_id", ""))
+
+    @crewai_event_bus.on(LLMCallStartedEvent)
+    def on_llm_started(source: Any, event: Any) -> None:
+        tracer = resolve(event)
+        if tracer:
+            tracer.llm_call_started(
+                call_key(event),
+                event_ns(event),
+                model=getattr(event, "model", None),
+                agent=getattr(event, "agent_role", None),
+                task=getattr(event, "task_name", None),
+            )
+
+    @crewai_event_bus.on(LLMCallCompletedEvent)
+    def on_llm_completed(source: Any, event: Any) -> None:
+        tracer = resolve(event)
+        if tracer:
+            tracer.llm_call_finished(call_key(event), event_ns(event))
+
+    @crewai_event_bus.on(LLMCallFailedEvent)
+    def on_llm_failed(source: Any, event: Any) -> None:
+        tracer = resolve(event)
+        if tracer:
+            tracer.llm_call_finished(
+                call_key(event), event_ns(event), status="ERROR",
+                error=str(getattr(event, "error", ""))
+            )
+
+    _listeners_installed = True
+    return True
+
+
+def load_spans(path: str, trace_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """Read spans from a JSONL trace file, optionally filtered to one trace."""
+    spans = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            record = json.loads(line)
+            if trace_id is None or record["traceId"] == trace_id:
+                spans.append(record)
+    return spans
+
+
+def to_chrome_trace(spans: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Convert spans into Chrome trace-event format.
+
+    Each trace becomes a process and each span a complete ("X") event, so
+    flame-chart viewers show the run → task → tool/LLM nesting.
+    """
+    events = []
+    pids: Dict[str, int] = {}
+    for record in spans:
+        pid = pids.setdefault(record["traceId"], len(pids) + 1)
+        start_us = record["startTimeUnixNano"] / 1000
+        events.append({
+            "name": record["name"],
+            "ph": "X",
+            "ts": start_us,
+            "dur": (record["endTimeUnixNano"] - record["startTimeUnixNano"]) / 1000,
+            "pid": pid,
+            "tid": record.get("thread", "main"),
+            "args": {
+                **record.get("attributes", {}), "status": record.get("status", {}).get("code")
+            },
+        })
+        for event in record.get("events", []):
+            events.append({
+                "name": event["name"],
+                "ph": "i",
+                "s": "t",
+                "ts": event["timeUnixNano"] / 1000,
+                "pid": pid,
+                "tid": record.get("thread", "main"),
+                "args": event.get("attributes", {}),
+            })
+    for trace_id, pid in pids.items():
+        events.append({
+            "name": "process_name", "ph": "M", "pid": pid, "args": {"name": f"trace {trace_id}"}
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main() -> int:
+    """Convert a JSONL span file into a Chrome trace file."""
+    parser = argparse.ArgumentParser(
+        description="Convert Ghost Office Hunter spans to Chrome trace format"
+    )
+    parser.add_argument("spans", help="Path to the JSONL span file")
+    parser.add_argument("--trace-id", default=None, help="Only include this trace")
+    parser.add_argument(
+        "--output", "-o", default="trace.json", help="Output file (default: trace.json)"
+    )
+    args = parser.parse_args()
+
+    spans = load_spans(args.spans, args.trace_id)
+    if not spans:
+        print("No spans found", file=sys.stderr)
+        return 1
+    Path(args.output).write_text(json.dumps(to_chrome_trace(spans)), encoding="utf-8")
+    print(f"Wrote {len(spans)} spans to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,226 @@
+"""Rule-based triage for screening large company lists.
+
+Each company gets a small, fixed set of web searches whose results are scored
+against the weighted red-flag lexicons in ``red_flags``. No LLM is involved, so
+thousands of entities can be ranked in the time a handful of full CrewAI
+investigations would take; only the highest-scoring ones are then passed on to
+``run_investigation``.
+"""
+import csv
+import math
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+from config import RunSettings
+from logger import log_context, setup_logger
+from red_flags import find_red_flags, term_category, term_weight
+from tools import GhostHunterSearchTool, SearchError
+
+logger = setup_logger()
+
+# Searches run for every company; kept small so triage costs a few requests per entity
+TRIAGE_QUERIES = (
+    '"{company}" fraud OR investigation OR sanctions OR arrest',
+    '"{company}" liquidators OR bankruptcy OR "MAS penalty" OR "regulatory action"',
+    '"{company}" Singapore registered office address',
+)
+
+# Occurrences of the same term beyond this count add nothing to the score
+MAX_HITS_PER_TERM = 3
+
+# Results that do not mention the company count at this fraction of their weight
+UNRELATED_RESULT_WEIGHT = 0.25
+
+
+@dataclass
+class TriageResult:
+    """Pre-score of one company."""
+
+    company: str
+    score: float = 0.0
+    hits: Dict[str, int] = field(default_factory=dict)
+    results: int = 0
+    error: Optional[str] = None
+
+    @property
+    def categories(self) -> Dict[str, float]:
+        """Score contribution per lexicon category."""
+        totals: Dict[str, float] = {}
+        for term, count in self.hits.items():
+            category = term_category(term)
+            points = term_weight(term) * min(count, MAX_HITS_PER_TERM)
+            totals[category] = totals.get(category, 0.0) + points
+        return totals
+
+    @property
+    def top_terms(self) -> List[str]:
+        """Terms ordered by their contribution to the score."""
+        return sorted(
+            self.hits,
+            key=lambda t: term_weight(t) * min(self.hits[t], MAX_HITS_PER_TERM),
+            reverse=True
+        )
+
+
+def _mentions_company(text: str, company: str) -> bool:
+    """Whether a result mentions the company's distinctive name tokens."""
+    generic = {
+        "pte", "ltd", "limited", "inc", "llc", "corp", "co", "group", "holdings", "the", "and"
+    }
+    tokens = [t for t in company.lower().replace(".", " ").split() if t not in generic]
+    text = text.lower()
+    return bool(tokens) and all(t in text for t in tokens)
+
+
+def score_results(company: str, results: List[Dict[str, Any]]) -> TriageResult:
+    """
+    Score search results for a company against the red-flag lexicons.
+
+    Each result contributes its distinct lexicon hits; results that do not
+    mention the company are down-weighted. Repeated hits of a term are capped
+    and the total is log-dampened so a single noisy article cannot dominate.
+
+    Args:
+        company: Company name
+        results: DDGS result dicts (title, body, href)
+
+    Returns:
+        TriageResult with the score and aggregated term hits
+    """
+    hits: Counter = Counter()
+    weighted: Counter = Counter()
+    for result in results:
+        if not isinstance(result, dict):
+            continue
+        text = f"{result.get('title', '')} {result.get('body', '')}"
+        factor = 1.0 if _mentions_company(text, company) else UNRELATED_RESULT_WEIGHT
+        for term in find_red_flags(text):
+            hits[term] += 1
+            weighted[term] += factor
+
+    score = sum(
+        term_weight(term) * min(count, MAX_HITS_PER_TERM) for term, count in weighted.items()
+    )
+    return TriageResult(
+        company=company,
+        score=round(math.log1p(score) * 10, 2),
+        hits=dict(hits),
+        results=len(results)
+    )
+
+
+def triage_company(company: str, search_tool: GhostHunterSearchTool) -> TriageResult:
+    """
+    Run the fixed triage searches for one company and score the results.
+
+    Args:
+        company: Company name
+        search_tool: Search tool used for the queries
+
+    Returns:
+        TriageResult; ``error`` is set if every search failed
+    """
+    results: List[Dict[str, Any]] = []
+    errors = []
+    with log_context(company=company):
+        for template in TRIAGE_QUERIES:
+            query = template.format(company=company)
+            try:
+                results.extend(search_tool.search(query))
+            except SearchError as e:
+                logger.warning("Triage search failed for '%s': %s", query, e)
+                errors.append(str(e))
+
+    triaged = score_results(company, results)
+    if errors and len(errors) == len(TRIAGE_QUERIES):
+        triaged.error = errors[-1]
+    return triaged
+
+
+def triage(
+    companies: List[str],
+    max_workers: int = 8,
+    settings: Optional[RunSettings] = None,
+    on_result: Optional[Callable[[TriageResult], None]] = None
+) -> List[TriageResult]:
+    """
+    Pre-score companies concurrently and rank them, highest score first.
+
+    Args:
+        companies: Company names to screen
+        max_workers: Maximum concurrent companies being searched
+        settings: Search settings
+        on_result: Optional callback invoked as each company is scored
+
+    Returns:
+        Triage results sorted by descending score (failed companies last)
+    """
+    search_tool = GhostHunterSearchTool(settings=settings or RunSettings())
+    ranked: List[TriageResult] = []
+    started = time.perf_counter()
+
+    with ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="triage") as pool:
+        futures = {
+            pool.submit(triage_company, company, search_tool): company for company in companies
+        }
+        for done, future in enumerate(as_completed(futures), 1):
+            result = future.result()
+            ranked.append(result)
+            if on_result:
+                on_result(result)
+            if done % 100 == 0:
+                logger.info("Triaged %d/%d companies", done, len(companies))
+
+    logger.info("Triage of %d companies took %.1fs", len(companies), time.perf_counter() - started)
+    return sorted(ranked, key=lambda r: (r.error is None, r.score), reverse=True)
+
+
+def select_for_investigation(
+    ranked: List[TriageResult],
+    top_n: Optional[int] = None,
+    threshold: Optional[float] = None
+) -> List[TriageResult]:
+    """
+    Choose which triaged companies get a full investigation.
+
+    Args:
+        ranked: Results as returned by ``triage``
+        top_n: Keep at most this many of the highest-scoring companies
+        threshold: Keep only companies scoring at least this much
+
+    Returns:
+        Selected results in rank order. Companies whose searches all failed pass
+        the threshold, since they could not be screened out.
+    """
+    selected = [
+        r for r in ranked
+        if r.error is not None or threshold is None or r.score >= threshold
+    ]
+    if top_n is not None:
+        selected = selected[:top_n]
+    return selected
+
+
+def write_triage_csv(ranked: List[TriageResult], path: str) -> str:
+    """
+    Write the ranking to a CSV file.
+
+    Returns:
+        Path of the written file
+    """
+    output = Path(path)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["rank", "company", "score", "results", "top_terms", "error"])
+        for rank, result in enumerate(ranked, 1):
+            writer.writerow([
+                rank, result.company, result.score, result.results,
+                "; ".join(f"{t} x{result.hits[t]}" for t in result.top_terms[:5]),
+                result.error or ""
+            ])
+    return str(output)
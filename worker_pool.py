@@ -0,0 +1,305 @@
+"""Pre-warmed investigation worker pool for Ghost Office Hunter.
+
+Starting an investigation in a fresh process pays for importing CrewAI and
+LiteLLM, validating configuration, building LLM clients and loading the local
+sanctions and registry indexes. ``InvestigationPool`` pays this once per worker
+process: the initializer imports everything, validates the configuration,
+enables client and tool reuse and warms the caches, and each worker then runs
+investigations from the pool's queue one at a time. Workers are replaced after
+``WORKER_MAX_JOBS`` investigations so memory growth stays bounded.
+
+Report sections stream back to the submitting process while a job runs, and
+each worker's metrics are merged into the parent's ``metrics.REGISTRY`` when a
+job finishes (successfully or not), so batch summaries and the service's
+``/metrics`` stay complete. A worker that dies mid-job (OOM kill, segfault)
+fails the jobs of the broken executor with ``BrokenProcessPool`` instead of
+leaving their futures unresolved; the next submission starts fresh workers.
+
+Used by ``python main.py --batch companies.txt --pool`` and
+``python service.py --pool``.
+"""
+import logging
+import multiprocessing
+import pickle
+import signal
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import metrics
+from config import Config, RunSettings
+from logger import setup_logger
+
+logger = setup_logger()
+
+# Section queue of the worker process, set by the initializer
+_sections: Optional[Any] = None
+
+
+def _init_worker(sections: Any, log_level: int) -> None:
+    """Pool initializer: pay every one-time cost before the first job arrives."""
+    global _sections
+    _sections = sections
+    # Ctrl-C is handled by the parent, which then terminates the pool
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    logger.setLevel(log_level)
+    start = time.perf_counter()
+
+    import agents
+    import director_graph
+    import main  # noqa: F401 - imports CrewAI and every tool module once
+    import sanctions
+    import tools
+
+    agents.enable_client_reuse()
+    tools.enable_tool_reuse()
+    # An initializer that raises makes the pool respawn workers forever, so warm-up
+    # problems are logged and left to surface in the jobs themselves
+    try:
+        Config.validate()
+        settings = RunSettings()
+        for route in (agents.ROUTE_RESEARCH, agents.ROUTE_SHARIAH, agents.ROUTE_SYNTHESIS):
+            agents.build_llm(settings, route)
+        agents.build_function_calling_llm(settings)
+        for tool_class in (
+            tools.GhostHunterPageFetchTool,
+            tools.ShariahComplianceTool,
+            tools.ShariahBusinessActivityTool,
+        ):
+            tools.stateless_tool(tool_class)
+        sanctions.get_index()
+        director_graph.get_graph()
+    except Exception as e:
+        logger.error("Investigation worker warm-up failed: %s", e)
+    logger.info("Investigation worker %d ready in %.1fs", multiprocessing.current_process().pid,
+                time.perf_counter() - start)
+
+
+def _warm_up() -> None:
+    """No-op job that makes the executor start a worker (running ``_init_worker``)."""
+
+
+def _run_job(
+    token: str, company_name: str, output_path: Optional[str], options: Dict[str, Any]
+) -> Tuple[Optional[str], Optional[Exception], Any]:
+    """
+    Run one investigation in a worker.
+
+    Returns:
+        Tuple of (report path, error, the worker's metrics for this job); failures
+        are returned rather than raised so their metrics reach the parent as well
+    """
+    from main import run_investigation
+
+    def on_section(title: str, content: str) -> None:
+        _sections.put((token, title, content))
+
+    try:
+        report_path = run_investigation(company_name, output_path, on_section=on_section, **options)
+    except Exception as e:
+        # Exceptions cross the process boundary pickled; keep the message if the type cannot be
+        try:
+            pickle.loads(pickle.dumps(e))
+            error = e
+        except Exception:
+            error = RuntimeError(f"{type(e).__name__}: {e}")
+        return None, error, metrics.REGISTRY.drain()
+    finally:
+        # End marker: the parent completes the job only after every section arrived
+        _sections.put((token, None, None))
+    return report_path, None, metrics.REGISTRY.drain()
+
+
+@dataclass
+class _PendingJob:
+    future: Future
+    on_section: Optional[Callable[[str, str], None]]
+    # (report path, error) once the worker answered
+    outcome: Optional[Tuple[Optional[str], Optional[BaseException]]] = None
+    sections_done: bool = False
+
+
+class InvestigationPool:
+    """Long-lived pool of pre-warmed worker processes running investigations."""
+
+    def __init__(self, workers: Optional[int] = None, max_jobs_per_worker: Optional[int] = None):
+        """
+        Args:
+            workers: Worker processes (default ``Config.WORKER_POOL_SIZE``)
+            max_jobs_per_worker: Investigations before a worker is replaced
+                (default ``Config.WORKER_MAX_JOBS``; 0 never replaces workers)
+        """
+        self.workers = workers or Config.WORKER_POOL_SIZE
+        self.max_jobs_per_worker = (
+            Config.WORKER_MAX_JOBS if max_jobs_per_worker is None else max_jobs_per_worker
+        )
+        # Spawned workers do not inherit locks, threads or sockets from the parent
+        self._context = multiprocessing.get_context("spawn")
+        self._sections = self._context.Queue()
+        self._pending: Dict[str, _PendingJob] = {}
+        self._lock = threading.Lock()
+        self._executor_lock = threading.Lock()
+        self._executor = self._new_executor()
+        self._listener = threading.Thread(
+            target=self._dispatch_sections, name="pool-sections", daemon=True
+        )
+        self._listener.start()
+        logger.info(
+            "Investigation pool started: %d workers, %s jobs per worker",
+            self.workers, self.max_jobs_per_worker or "unlimited"
+        )
+
+    def submit(
+        self,
+        company_name: str,
+        output_path: Optional[str] = None,
+        on_section: Optional[Callable[[str, str], None]] = None,
+        **options: Any
+    ) -> Future:
+        """
+        Queue an investigation.
+
+        Args:
+            company_name: Company to investigate
+            output_path: Report path (default: derived from the company name)
+            on_section: Called in this process with (title, content) as sections complete
+            **options: Further ``run_investigation`` keyword arguments (picklable)
+
+        Returns:
+            Future resolving to the report path
+        """
+        token = uuid.uuid4().hex
+        future: Future = Future()
+        with self._lock:
+            self._pending[token] = _PendingJob(future, on_section)
+        try:
+            job = self._submit_job(token, company_name, output_path, options)
+        except BaseException:
+            with self._lock:
+                self._pending.pop(token, None)
+            raise
+        job.add_done_callback(lambda done: self._finish(token, done))
+        return future
+
+    def run(self, company_name: str, output_path: Optional[str] = None, **options: Any) -> str:
+        """Run an investigation on the pool and wait for it (``run_investigation``'s signature)."""
+        return self.submit(company_name, output_path, **options).result()
+
+    def _new_executor(self) -> ProcessPoolExecutor:
+        executor = ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=self._context,
+            initializer=_init_worker,
+            initargs=(self._sections, logger.getEffectiveLevel() or logging.INFO),
+            max_tasks_per_child=self.max_jobs_per_worker or None
+        )
+        # Workers are spawned on demand; one no-op per worker starts (and warms) them all now
+        for _ in range(self.workers):
+            executor.submit(_warm_up)
+        return executor
+
+    def _submit_job(
+        self, token: str, company_name: str, output_path: Optional[str], options: Dict[str, Any]
+    ) -> Future:
+        """Hand a job to the executor, replacing it first if a dead worker broke it."""
+        with self._executor_lock:
+            try:
+                return self._executor.submit(_run_job, token, company_name, output_path, options)
+            except BrokenProcessPool:
+                logger.warning(
+                    "Investigation pool was broken by a dead worker; starting new workers"
+                )
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = self._new_executor()
+                return self._executor.submit(_run_job, token, company_name, output_path, options)
+
+    def _finish(self, token: str, done: Future) -> None:
+        if done.cancelled():
+            error = RuntimeError("Investigation pool terminated")
+        else:
+            error = done.exception()
+        # The job never reported back: its worker died, or its arguments could not be pickled
+        lost = error is not None
+        if lost:
+            report_path = None
+            if isinstance(error, BrokenProcessPool):
+                logger.error("Investigation worker died: %s", error)
+        else:
+            report_path, error, worker_metrics = done.result()
+            metrics.REGISTRY.merge(worker_metrics)
+        with self._lock:
+            job = self._pending.get(token)
+            if job is None:
+                return
+            job.outcome = (report_path, error)
+            # No end marker follows from a worker that never finished the job
+            job.sections_done = job.sections_done or lost
+        self._maybe_complete(token)
+
+    def _dispatch_sections(self) -> None:
+        while True:
+            message = self._sections.get()
+            if message is None:
+                return
+            token, title, content = message
+            with self._lock:
+                job = self._pending.get(token)
+            if job is None:
+                continue
+            if title is None:
+                job.sections_done = True
+                self._maybe_complete(token)
+            elif job.on_section is not None:
+                try:
+                    job.on_section(title, content)
+                except Exception as e:
+                    logger.warning("Section callback failed: %s", e)
+
+    def _maybe_complete(self, token: str) -> None:
+        with self._lock:
+            job = self._pending.get(token)
+            if job is None or job.outcome is None or not job.sections_done:
+                return
+            del self._pending[token]
+        report_path, error = job.outcome
+        if error is None:
+            job.future.set_result(report_path)
+        else:
+            job.future.set_exception(error)
+
+    def close(self) -> None:
+        """Finish queued jobs, then stop the workers."""
+        self._executor.shutdown(wait=True)
+        self._sections.put(None)
+        self._listener.join(timeout=5)
+
+    def terminate(self) -> None:
+        """Stop the workers immediately, abandoning running jobs."""
+        # ProcessPoolExecutor only stops idle workers; running ones are killed directly
+        with self._executor_lock:
+            executor = self._executor
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        # A killed worker can die holding the queue's write lock; never wait on it at exit
+        self._sections.cancel_join_thread()
+        self._sections.put(None)
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        for job in pending.values():
+            if not job.future.done():
+                job.future.set_exception(RuntimeError("Investigation pool terminated"))
+
+    def __enter__(self) -> "InvestigationPool":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.terminate()